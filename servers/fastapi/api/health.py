@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.database import get_async_session
+from services.warmup import WARMUP
+
+HEALTH_ROUTER = APIRouter(prefix="/health", tags=["Health"])
+
+
+@HEALTH_ROUTER.get("")
+async def get_liveness():
+    return {"status": "ok"}
+
+
+@HEALTH_ROUTER.get("/ready")
+async def get_readiness(sql_session: AsyncSession = Depends(get_async_session)):
+    """
+    Ready once the database answers and the background warm-up has finished.
+    Lists which subsystems are warm, with 503 while any is still loading.
+    """
+    readiness = WARMUP.snapshot()
+    try:
+        await sql_session.execute(text("SELECT 1"))
+        readiness["database"] = "ok"
+    except Exception as e:
+        readiness["ready"] = False
+        readiness["database"] = str(e)
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
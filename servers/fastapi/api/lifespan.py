@@ -1,23 +1,57 @@
 from contextlib import asynccontextmanager
+import importlib
 import os
 
 from fastapi import FastAPI
 
+from api.v1.ppt.endpoints.presentation import run_queued_presentation_generation
 from services.database import create_db_and_tables
-from utils.get_env import get_app_data_directory_env
+from services.icon_finder_service import ICON_FINDER_SERVICE
+from services.presentation_generation_queue import PRESENTATION_GENERATION_QUEUE
+from services.temp_file_service import TEMP_FILE_SERVICE
+from services.tracing import TRACING
+from services.warmup import WARMUP
+from utils.get_env import (
+    get_app_data_directory_env,
+    get_disable_api_generation_worker_env,
+)
 from utils.model_availability import (
     check_llm_and_image_provider_api_or_model_availability,
 )
 
 
+def import_docling():
+    importlib.import_module("docling.document_converter")
+
+
+WARMUP.register("icon_search", ICON_FINDER_SERVICE.warm_up)
+WARMUP.register("document_parsing", import_docling)
+
+
 @asynccontextmanager
 async def app_lifespan(_: FastAPI):
     """
     Lifespan context manager for FastAPI application.
     Initializes the application data directory and checks LLM model availability.
+    Runs queued async presentation generation tasks until shutdown, unless they
+    are left to separate worker processes.
+    Slow subsystems are warmed up in the background, see /health/ready.
+    Temp files of stopped processes are deleted in the background too.
 
     """
     os.makedirs(get_app_data_directory_env(), exist_ok=True)
+    TEMP_FILE_SERVICE.move_aside_base_dir()
+    # Not a warm-up, it runs with WARMUP_ON_STARTUP=false too
+    TEMP_FILE_SERVICE.cleanup_old_base_dirs_in_background()
     await create_db_and_tables()
     await check_llm_and_image_provider_api_or_model_availability()
+    run_generation_worker = get_disable_api_generation_worker_env() != "true"
+    if run_generation_worker:
+        PRESENTATION_GENERATION_QUEUE.start(run_queued_presentation_generation)
+    WARMUP.start()
     yield
+    await WARMUP.stop()
+    if run_generation_worker:
+        await PRESENTATION_GENERATION_QUEUE.stop()
+    # Exports the spans still buffered
+    TRACING.shutdown()
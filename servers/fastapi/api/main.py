@@ -1,19 +1,31 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from api.health import HEALTH_ROUTER
 from api.lifespan import app_lifespan
-from api.middlewares import UserConfigEnvUpdateMiddleware
+from api.metrics import METRICS_ROUTER
+from api.middlewares import (
+    PrometheusMetricsMiddleware,
+    TracingMiddleware,
+    UserConfigEnvUpdateMiddleware,
+)
 from api.v1.ppt.router import API_V1_PPT_ROUTER
 from api.v1.webhook.router import API_V1_WEBHOOK_ROUTER
 from api.v1.mock.router import API_V1_MOCK_ROUTER
+from services.database import sql_engine
+from services.prometheus_metrics import PROMETHEUS_METRICS
+from services.tracing import TRACING
 
 
 app = FastAPI(lifespan=app_lifespan)
 
 
 # Routers
+app.include_router(HEALTH_ROUTER)
 app.include_router(API_V1_PPT_ROUTER)
 app.include_router(API_V1_WEBHOOK_ROUTER)
 app.include_router(API_V1_MOCK_ROUTER)
+if PROMETHEUS_METRICS.enabled:
+    app.include_router(METRICS_ROUTER)
 
 # Middlewares
 origins = ["*"]
@@ -26,3 +38,11 @@ app.add_middleware(
 )
 
 app.add_middleware(UserConfigEnvUpdateMiddleware)
+
+if PROMETHEUS_METRICS.enabled:
+    app.add_middleware(PrometheusMetricsMiddleware)
+    PROMETHEUS_METRICS.instrument_engine(sql_engine)
+
+TRACING.setup()
+if TRACING.enabled:
+    app.add_middleware(TracingMiddleware)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from services.database import get_async_session
+from services.prometheus_metrics import PROMETHEUS_METRICS
+
+METRICS_ROUTER = APIRouter(tags=["Metrics"])
+
+
+@METRICS_ROUTER.get("/metrics", include_in_schema=False)
+async def get_prometheus_metrics(
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    # Queue depth is shared by every worker, so it is read from the database
+    counts = await sql_session.execute(
+        select(
+            AsyncPresentationGenerationTaskModel.status,
+            func.count(AsyncPresentationGenerationTaskModel.id),
+        )
+        .where(
+            AsyncPresentationGenerationTaskModel.status.in_(["pending", "processing"])
+        )
+        .group_by(AsyncPresentationGenerationTaskModel.status)
+    )
+    PROMETHEUS_METRICS.set_queue_depth(dict(counts.all()))
+
+    return Response(
+        content=PROMETHEUS_METRICS.generate_latest(),
+        media_type=PROMETHEUS_METRICS.content_type,
+    )
@@ -1,6 +1,11 @@
+import time
+
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from services.llm_client import LLM_CLIENT_REGISTRY
+from services.prometheus_metrics import PROMETHEUS_METRICS
+from services.tracing import TRACING
 from utils.get_env import get_can_change_keys_env
 from utils.user_config import update_env_with_user_config
 
@@ -9,4 +14,44 @@ class UserConfigEnvUpdateMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         if get_can_change_keys_env() != "false":
             update_env_with_user_config()
+            # Pooled provider clients are rebuilt if keys or urls changed
+            LLM_CLIENT_REGISTRY.invalidate_stale()
         return await call_next(request)
+
+
+class PrometheusMetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        started_at = time.perf_counter()
+        status_code = 500
+        PROMETHEUS_METRICS.http_requests_in_flight.inc()
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            PROMETHEUS_METRICS.http_requests_in_flight.dec()
+            # Route templates keep ids out of the labels
+            route = request.scope.get("route")
+            PROMETHEUS_METRICS.observe_http_request(
+                request.method,
+                route.path if route else "unmatched",
+                status_code,
+                time.perf_counter() - started_at,
+            )
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        with TRACING.server_span(
+            f"{request.method} {request.url.path}",
+            dict(request.headers),
+            **{"http.method": request.method, "http.target": request.url.path},
+        ) as span:
+            response = await call_next(request)
+            # Route templates keep ids out of span names
+            route = request.scope.get("route")
+            if route:
+                span.update_name(f"{request.method} {route.path}")
+                span.set_attribute("http.route", route.path)
+            span.set_attribute("http.status_code", response.status_code)
+            return response
@@ -17,11 +17,15 @@ IMAGES_ROUTER = APIRouter(prefix="/images", tags=["Images"])
 
 @IMAGES_ROUTER.get("/generate")
 async def generate_image(
-    prompt: str, sql_session: AsyncSession = Depends(get_async_session)
+    prompt: str,
+    bypass_cache: bool = False,
+    sql_session: AsyncSession = Depends(get_async_session),
 ):
     images_directory = get_images_directory()
     image_prompt = ImagePrompt(prompt=prompt)
-    image_generation_service = ImageGenerationService(images_directory)
+    image_generation_service = ImageGenerationService(
+        images_directory, use_cache=not bypass_cache
+    )
 
     image = await image_generation_service.generate_image(image_prompt)
     if not isinstance(image, ImageAsset):
@@ -14,6 +14,7 @@ from models.sse_response import (
     SSECompleteResponse,
     SSEErrorResponse,
     SSEResponse,
+    SSESlideReadyResponse,
     SSEStatusResponse,
 )
 from services.temp_file_service import TEMP_FILE_SERVICE
@@ -21,6 +22,7 @@ from services.database import get_async_session
 from services.documents_loader import DocumentsLoader
 from utils.llm_calls.generate_presentation_outlines import generate_ppt_outline
 from utils.ppt_utils import get_presentation_title_from_outlines
+from utils.streaming_json_parser import ANY, StreamingJSONParser
 
 OUTLINES_ROUTER = APIRouter(prefix="/outlines", tags=["Outlines"])
 
@@ -50,6 +52,7 @@ async def stream_outlines(
                 additional_context = "\n\n".join(documents)
 
         presentation_outlines_text = ""
+        outlines_parser = StreamingJSONParser(paths=[("slides", ANY)])
 
         n_slides_to_generate = presentation.n_slides
         if presentation.include_table_of_contents:
@@ -83,10 +86,17 @@ async def stream_outlines(
 
             presentation_outlines_text += chunk
 
+            # Slides are pushed as soon as they are complete
+            for (_, index), slide in outlines_parser.feed(chunk):
+                if index < n_slides_to_generate:
+                    yield SSESlideReadyResponse(index=index, slide=slide).to_string()
+
         try:
-            presentation_outlines_json = dict(
-                dirtyjson.loads(presentation_outlines_text)
-            )
+            presentation_outlines_json = outlines_parser.get_value()
+            if not isinstance(presentation_outlines_json, dict):
+                presentation_outlines_json = dict(
+                    dirtyjson.loads(presentation_outlines_text)
+                )
         except Exception as e:
             traceback.print_exc()
             yield SSEErrorResponse(
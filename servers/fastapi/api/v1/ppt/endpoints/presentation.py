@@ -7,7 +7,7 @@ import random
 import traceback
 from typing import Annotated, List, Literal, Optional, Tuple
 import dirtyjson
-from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Path
+from fastapi import APIRouter, Body, Depends, HTTPException, Path
 from fastapi.responses import StreamingResponse
 from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -27,7 +27,7 @@ from enums.tone import Tone
 from enums.verbosity import Verbosity
 from models.pptx_models import PptxPresentationModel
 from pydantic import BaseModel
-from models.presentation_layout import PresentationLayoutModel
+from models.presentation_layout import PresentationLayoutModel, SlideLayoutModel
 from models.presentation_structure_model import PresentationStructureModel
 from models.presentation_with_slides import (
     PresentationWithSlides,
@@ -41,6 +41,7 @@ from services.image_generation_service import ImageGenerationService
 from utils.dict_utils import deep_update
 from utils.export_utils import export_presentation
 from utils.llm_calls.generate_presentation_outlines import generate_ppt_outline
+from models.sql.image_asset import ImageAsset
 from models.sql.slide import SlideModel
 from models.sse_response import SSECompleteResponse, SSEErrorResponse, SSEResponse
 
@@ -48,7 +49,28 @@ from services.database import get_async_session
 from services.temp_file_service import TEMP_FILE_SERVICE
 from services.concurrent_service import CONCURRENT_SERVICE
 from models.sql.presentation import PresentationModel
+from services.llm_worker_pool import LLMWorkerPool, get_llm_worker_pool_size
 from services.pptx_presentation_creator import PptxPresentationCreator
+from services.presentation_generation_checkpoint import (
+    PresentationGenerationCheckpoint,
+)
+from services.presentation_generation_metrics import (
+    PRESENTATION_GENERATION_STAGE_TRACKER,
+    PresentationGenerationMetrics,
+    count_in_generation_stage,
+    generation_stage,
+)
+from services.presentation_generation_queue import (
+    PRESENTATION_GENERATION_QUEUE,
+    PresentationGenerationWaiting,
+)
+from services.prometheus_metrics import PROMETHEUS_METRICS
+from services.tracing import TRACING
+from services.presentation_generation_pipeline import (
+    PresentationGenerationPipeline,
+    get_presentation_pipeline_window,
+    is_presentation_pipeline_enabled,
+)
 from models.sql.async_presentation_generation_status import (
     AsyncPresentationGenerationTaskModel,
 )
@@ -58,7 +80,9 @@ from utils.llm_calls.generate_presentation_structure import (
 )
 from utils.llm_calls.generate_slide_content import (
     get_slide_content_from_type_and_outline,
+    submit_slide_content_to_batch_api,
 )
+from utils.llm_calls.select_slide_layout import select_slide_layout
 from utils.ppt_utils import (
     get_presentation_title_from_outlines,
     select_toc_or_list_slide_layout_index,
@@ -67,6 +91,7 @@ from utils.process_slides import (
     process_slide_add_placeholder_assets,
     process_slide_and_fetch_assets,
 )
+from utils.streaming_json_parser import ANY, StreamingJSONParser
 import uuid
 
 
@@ -489,12 +514,258 @@ async def check_if_api_request_is_valid(
     return (presentation_id,)
 
 
-async def generate_presentation_handler(
+async def generate_presentation_structure_with_toc(
+    request: GeneratePresentationRequest,
+    async_status: Optional[AsyncPresentationGenerationTaskModel],
+    sql_session: AsyncSession,
+    layout_model: PresentationLayoutModel,
+    presentation_outlines: PresentationOutlineModel,
+    total_outlines: int,
+    using_slides_markdown: bool,
+) -> PresentationStructureModel:
+    # Table of contents outlines are inserted into presentation_outlines
+    total_slide_layouts = len(layout_model.slides)
+
+    # Updating async status
+    if async_status:
+        async_status.message = "Selecting layout for each slide"
+        async_status.updated_at = datetime.now()
+        sql_session.add(async_status)
+        await sql_session.commit()
+
+    # Generate Structure
+    if layout_model.ordered:
+        presentation_structure = layout_model.to_presentation_structure()
+    else:
+        presentation_structure: PresentationStructureModel = (
+            await generate_presentation_structure(
+                presentation_outlines,
+                layout_model,
+                request.instructions,
+                using_slides_markdown,
+                use_cache=not request.bypass_llm_cache,
+            )
+        )
+
+    presentation_structure.slides = presentation_structure.slides[:total_outlines]
+    for index in range(total_outlines):
+        random_slide_index = random.randint(0, total_slide_layouts - 1)
+        if index >= total_outlines:
+            presentation_structure.slides.append(random_slide_index)
+            continue
+        if presentation_structure.slides[index] >= total_slide_layouts:
+            presentation_structure.slides[index] = random_slide_index
+
+    # Injecting table of contents to the presentation structure and outlines
+    if request.include_table_of_contents and not using_slides_markdown:
+        n_toc_slides = request.n_slides - total_outlines
+        toc_slide_layout_index = select_toc_or_list_slide_layout_index(layout_model)
+        if toc_slide_layout_index != -1:
+            outline_index = 1 if request.include_title_slide else 0
+            for i in range(n_toc_slides):
+                outlines_to = outline_index + 10
+                if total_outlines == outlines_to:
+                    outlines_to -= 1
+
+                presentation_structure.slides.insert(
+                    i + 1 if request.include_title_slide else i,
+                    toc_slide_layout_index,
+                )
+                toc_outline = "Table of Contents\n\n"
+
+                for outline in presentation_outlines.slides[
+                    outline_index:outlines_to
+                ]:
+                    page_number = (
+                        outline_index - i + n_toc_slides + 1
+                        if request.include_title_slide
+                        else outline_index - i + n_toc_slides
+                    )
+                    toc_outline += f"Slide page number: {page_number}\n Slide Content: {outline.content[:100]}\n\n"
+                    outline_index += 1
+
+                outline_index += 1
+
+                presentation_outlines.slides.insert(
+                    i + 1 if request.include_title_slide else i,
+                    SlideOutlineModel(
+                        content=toc_outline,
+                    ),
+                )
+
+    return presentation_structure
+
+
+async def generate_slides_in_stages(
     request: GeneratePresentationRequest,
     presentation_id: uuid.UUID,
     async_status: Optional[AsyncPresentationGenerationTaskModel],
-    sql_session: AsyncSession = Depends(get_async_session),
-):
+    sql_session: AsyncSession,
+    layout_model: PresentationLayoutModel,
+    presentation_outlines: PresentationOutlineModel,
+    total_outlines: int,
+    using_slides_markdown: bool,
+    use_batch_api: bool,
+    image_generation_service: ImageGenerationService,
+    checkpoint: PresentationGenerationCheckpoint,
+) -> Tuple[PresentationStructureModel, List[SlideModel], List[ImageAsset]]:
+    # Selects layouts for the whole deck at once, then generates slides with a worker pool
+    saved_structure = checkpoint.get_structure()
+    if saved_structure:
+        presentation_structure, saved_outlines = saved_structure
+        # Includes the table of contents outlines
+        presentation_outlines.slides = saved_outlines.slides
+    else:
+        with generation_stage("layouts"):
+            presentation_structure = await generate_presentation_structure_with_toc(
+                request,
+                async_status,
+                sql_session,
+                layout_model,
+                presentation_outlines,
+                total_outlines,
+                using_slides_markdown,
+            )
+        await checkpoint.save_structure(presentation_structure, presentation_outlines)
+
+    slide_layout_indices = presentation_structure.slides
+    slide_layouts = [layout_model.slides[idx] for idx in slide_layout_indices]
+
+    # Slides are submitted to the batch API once. The job then stops without its
+    # lease and runs again from the checkpoint when the batch has ended
+    if use_batch_api and not checkpoint.has_batch_requests:
+        if async_status:
+            async_status.message = "Submitting slides to batch API"
+            async_status.updated_at = datetime.now()
+            sql_session.add(async_status)
+            await sql_session.commit()
+
+        indices = [
+            index
+            for index in range(len(slide_layouts))
+            if not checkpoint.get_slide_content(index)
+        ]
+        batch_requests = await asyncio.gather(
+            *[
+                submit_slide_content_to_batch_api(
+                    slide_layouts[index],
+                    presentation_outlines.slides[index],
+                    request.language,
+                    request.tone.value,
+                    request.verbosity.value,
+                    request.instructions,
+                )
+                for index in indices
+            ]
+        )
+        # Slides that couldn't be submitted are generated with real-time calls
+        await checkpoint.save_batch_requests(
+            {
+                index: batch_request
+                for index, batch_request in zip(indices, batch_requests)
+                if batch_request
+            }
+        )
+        if checkpoint.get_batch_requests():
+            raise PresentationGenerationWaiting("Waiting for slides from batch API")
+
+    # Updating async status
+    if async_status:
+        async_status.message = "Generating slides"
+        async_status.updated_at = datetime.now()
+        sql_session.add(async_status)
+        await sql_session.commit()
+
+    # 7. Generate slide content with a bounded worker pool, then build slides and fetch assets
+
+    generated_assets: List[ImageAsset] = []
+    async_assets_generation_tasks: List[asyncio.Task] = []
+
+    async def fetch_slide_assets(slide: SlideModel) -> List[ImageAsset]:
+        with generation_stage("slide_assets"):
+            assets = await process_slide_and_fetch_assets(
+                image_generation_service, slide
+            )
+        await checkpoint.save_slide_assets(slide.index, slide.content, assets)
+        return assets
+
+    async def generate_slide(index: int) -> SlideModel:
+        slide_layout = slide_layouts[index]
+        saved_content = checkpoint.get_slide_content(index)
+        if saved_content:
+            _, slide_content = saved_content
+        else:
+            print(f"Generating slide {index} with layout {slide_layout.id}")
+            with generation_stage("slide_content"):
+                slide_content = await get_slide_content_from_type_and_outline(
+                    slide_layout,
+                    presentation_outlines.slides[index],
+                    request.language,
+                    request.tone.value,
+                    request.verbosity.value,
+                    request.instructions,
+                    use_cache=not request.bypass_llm_cache,
+                    batch_request=checkpoint.get_batch_request(index),
+                )
+                count_in_generation_stage(slides=1)
+            await checkpoint.save_slide_content(
+                index, slide_layout_indices[index], slide_content
+            )
+
+        slide = SlideModel(
+            presentation=presentation_id,
+            layout_group=layout_model.name,
+            layout=slide_layout.id,
+            index=index,
+            speaker_note=slide_content.get("__speaker_note__"),
+            content=slide_content,
+        )
+
+        saved_assets = checkpoint.get_slide_assets(index)
+        if saved_assets:
+            slide.content, assets = saved_assets
+            generated_assets.extend(assets)
+        else:
+            # Fetch assets while the pool keeps generating content for other slides
+            async_assets_generation_tasks.append(
+                asyncio.create_task(fetch_slide_assets(slide))
+            )
+        return slide
+
+    # Keep as many calls in flight as the provider allows,
+    # results of batched slides are all read at once
+    pool_size = len(slide_layouts) if use_batch_api else get_llm_worker_pool_size()
+    try:
+        slides: List[SlideModel] = await LLMWorkerPool(pool_size).map(
+            generate_slide, range(len(slide_layouts))
+        )
+    except BaseException:
+        for task in async_assets_generation_tasks:
+            task.cancel()
+        raise
+
+    if async_status:
+        async_status.message = "Fetching assets for slides"
+        async_status.updated_at = datetime.now()
+        sql_session.add(async_status)
+        await sql_session.commit()
+
+    # Wait for asset tasks, most of them have been running during content generation
+    generated_assets_list = await asyncio.gather(*async_assets_generation_tasks)
+    for assets_list in generated_assets_list:
+        generated_assets.extend(assets_list)
+
+    return presentation_structure, slides, generated_assets
+
+
+async def generate_and_save_presentation(
+    request: GeneratePresentationRequest,
+    presentation_id: uuid.UUID,
+    async_status: Optional[AsyncPresentationGenerationTaskModel],
+    sql_session: AsyncSession,
+    checkpoint: PresentationGenerationCheckpoint,
+) -> PresentationModel:
+    pipeline: Optional[PresentationGenerationPipeline] = None
     try:
         using_slides_markdown = False
 
@@ -502,7 +773,65 @@ async def generate_presentation_handler(
             using_slides_markdown = True
             request.n_slides = len(request.slides_markdown)
 
-        if not using_slides_markdown:
+        # Batch APIs can take hours, so they are only used for async generation
+        use_batch_api = request.use_batch_api and async_status is not None
+
+        # Parse Layouts
+        layout_model = await get_layout_by_name(request.template)
+        total_slide_layouts = len(layout_model.slides)
+
+        image_generation_service = ImageGenerationService(
+            get_images_directory(), use_cache=not request.bypass_image_cache
+        )
+
+        # Slides are generated while outlines stream, unless the table of contents
+        # needs every outline first or all slides go into one provider batch
+        if (
+            is_presentation_pipeline_enabled()
+            and not request.include_table_of_contents
+            and not use_batch_api
+        ):
+
+            async def select_layout(index: int, outline: SlideOutlineModel) -> int:
+                if layout_model.ordered:
+                    return index
+                return await select_slide_layout(
+                    layout_model,
+                    outline,
+                    index,
+                    request.n_slides,
+                    request.instructions,
+                    use_cache=not request.bypass_llm_cache,
+                )
+
+            async def generate_content(
+                slide_layout: SlideLayoutModel, outline: SlideOutlineModel
+            ) -> dict:
+                return await get_slide_content_from_type_and_outline(
+                    slide_layout,
+                    outline,
+                    request.language,
+                    request.tone.value,
+                    request.verbosity.value,
+                    request.instructions,
+                    use_cache=not request.bypass_llm_cache,
+                )
+
+            pipeline = PresentationGenerationPipeline(
+                presentation_id,
+                layout_model,
+                image_generation_service,
+                select_layout,
+                generate_content,
+                get_presentation_pipeline_window(),
+                checkpoint,
+            )
+
+        saved_outlines = checkpoint.get_outlines()
+        if saved_outlines:
+            presentation_outlines, total_outlines = saved_outlines
+
+        elif not using_slides_markdown:
             additional_context = ""
 
             # Updating async status
@@ -513,9 +842,10 @@ async def generate_presentation_handler(
                 await sql_session.commit()
 
             if request.files:
-                documents_loader = DocumentsLoader(file_paths=request.files)
-                await documents_loader.load_documents()
-                documents = documents_loader.documents
+                with generation_stage("documents"):
+                    documents_loader = DocumentsLoader(file_paths=request.files)
+                    await documents_loader.load_documents()
+                    documents = documents_loader.documents
                 if documents:
                     additional_context = "\n\n".join(documents)
 
@@ -534,37 +864,51 @@ async def generate_presentation_handler(
                     (request.n_slides - needed_toc_count) / 10
                 )
 
-            presentation_outlines_text = ""
-            async for chunk in generate_ppt_outline(
-                request.content,
-                n_slides_to_generate,
-                request.language,
-                additional_context,
-                request.tone.value,
-                request.verbosity.value,
-                request.instructions,
-                request.include_title_slide,
-                request.web_search,
-            ):
-
-                if isinstance(chunk, HTTPException):
-                    raise chunk
-
-                presentation_outlines_text += chunk
-
-            try:
-                presentation_outlines_json = dict(
-                    dirtyjson.loads(presentation_outlines_text)
-                )
-            except Exception:
-                traceback.print_exc()
-                raise HTTPException(
-                    status_code=400,
-                    detail="Failed to generate presentation outlines. Please try again.",
+            with generation_stage("outlines"):
+                presentation_outlines_text = ""
+                outlines_parser = StreamingJSONParser(paths=[("slides", ANY)])
+                async for chunk in generate_ppt_outline(
+                    request.content,
+                    n_slides_to_generate,
+                    request.language,
+                    additional_context,
+                    request.tone.value,
+                    request.verbosity.value,
+                    request.instructions,
+                    request.include_title_slide,
+                    request.web_search,
+                ):
+
+                    if isinstance(chunk, HTTPException):
+                        raise chunk
+
+                    presentation_outlines_text += chunk
+
+                    # Start generating each slide as soon as its outline is complete
+                    for (_, index), slide in outlines_parser.feed(chunk):
+                        if (
+                            pipeline
+                            and index < n_slides_to_generate
+                            and isinstance(slide, dict)
+                            and isinstance(slide.get("content"), str)
+                        ):
+                            pipeline.add_outline(index, SlideOutlineModel(**slide))
+
+                try:
+                    presentation_outlines_json = outlines_parser.get_value()
+                    if not isinstance(presentation_outlines_json, dict):
+                        presentation_outlines_json = dict(
+                            dirtyjson.loads(presentation_outlines_text)
+                        )
+                except Exception:
+                    traceback.print_exc()
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Failed to generate presentation outlines. Please try again.",
+                    )
+                presentation_outlines = PresentationOutlineModel(
+                    **presentation_outlines_json
                 )
-            presentation_outlines = PresentationOutlineModel(
-                **presentation_outlines_json
-            )
             total_outlines = n_slides_to_generate
 
         else:
@@ -577,78 +921,49 @@ async def generate_presentation_handler(
             )
             total_outlines = len(request.slides_markdown)
 
-        # Updating async status
-        if async_status:
-            async_status.message = "Selecting layout for each slide"
-            async_status.updated_at = datetime.now()
-            sql_session.add(async_status)
-            await sql_session.commit()
+        if not saved_outlines:
+            await checkpoint.save_outlines(presentation_outlines, total_outlines)
 
         print("-" * 40)
         print(f"Generated {total_outlines} outlines for the presentation")
 
-        # Parse Layouts
-        layout_model = await get_layout_by_name(request.template)
-        total_slide_layouts = len(layout_model.slides)
-
-        # Generate Structure
-        if layout_model.ordered:
-            presentation_structure = layout_model.to_presentation_structure()
-        else:
-            presentation_structure: PresentationStructureModel = (
-                await generate_presentation_structure(
-                    presentation_outlines,
-                    layout_model,
-                    request.instructions,
-                    using_slides_markdown,
-                )
-            )
+        if pipeline:
+            # Updating async status
+            if async_status:
+                async_status.message = "Generating slides"
+                async_status.updated_at = datetime.now()
+                sql_session.add(async_status)
+                await sql_session.commit()
 
-        presentation_structure.slides = presentation_structure.slides[:total_outlines]
-        for index in range(total_outlines):
-            random_slide_index = random.randint(0, total_slide_layouts - 1)
-            if index >= total_outlines:
-                presentation_structure.slides.append(random_slide_index)
-                continue
-            if presentation_structure.slides[index] >= total_slide_layouts:
-                presentation_structure.slides[index] = random_slide_index
-
-        # Injecting table of contents to the presentation structure and outlines
-        if request.include_table_of_contents and not using_slides_markdown:
-            n_toc_slides = request.n_slides - total_outlines
-            toc_slide_layout_index = select_toc_or_list_slide_layout_index(layout_model)
-            if toc_slide_layout_index != -1:
-                outline_index = 1 if request.include_title_slide else 0
-                for i in range(n_toc_slides):
-                    outlines_to = outline_index + 10
-                    if total_outlines == outlines_to:
-                        outlines_to -= 1
-
-                    presentation_structure.slides.insert(
-                        i + 1 if request.include_title_slide else i,
-                        toc_slide_layout_index,
-                    )
-                    toc_outline = "Table of Contents\n\n"
-
-                    for outline in presentation_outlines.slides[
-                        outline_index:outlines_to
-                    ]:
-                        page_number = (
-                            outline_index - i + n_toc_slides + 1
-                            if request.include_title_slide
-                            else outline_index - i + n_toc_slides
-                        )
-                        toc_outline += f"Slide page number: {page_number}\n Slide Content: {outline.content[:100]}\n\n"
-                        outline_index += 1
+            # Outlines that were not picked up while streaming
+            for index, outline in enumerate(
+                presentation_outlines.slides[:total_outlines]
+            ):
+                pipeline.add_outline(index, outline)
 
-                    outline_index += 1
+            slide_layout_indices, slides, generated_assets = await pipeline.finish()
+            presentation_structure = PresentationStructureModel(
+                slides=slide_layout_indices
+            )
 
-                    presentation_outlines.slides.insert(
-                        i + 1 if request.include_title_slide else i,
-                        SlideOutlineModel(
-                            content=toc_outline,
-                        ),
-                    )
+        else:
+            (
+                presentation_structure,
+                slides,
+                generated_assets,
+            ) = await generate_slides_in_stages(
+                request,
+                presentation_id,
+                async_status,
+                sql_session,
+                layout_model,
+                presentation_outlines,
+                total_outlines,
+                using_slides_markdown,
+                use_batch_api,
+                image_generation_service,
+                checkpoint,
+            )
 
         # Create PresentationModel
         presentation = PresentationModel(
@@ -665,142 +980,135 @@ async def generate_presentation_handler(
             instructions=request.instructions,
         )
 
-        # Updating async status
-        if async_status:
-            async_status.message = "Generating slides"
-            async_status.updated_at = datetime.now()
-            sql_session.add(async_status)
-            await sql_session.commit()
-
-        image_generation_service = ImageGenerationService(get_images_directory())
-        async_assets_generation_tasks = []
-
-        # 7. Generate slide content concurrently (batched), then build slides and fetch assets
-        slides: List[SlideModel] = []
+        # 8. Save PresentationModel and Slides
+        with generation_stage("save"):
+            sql_session.add(presentation)
+            sql_session.add_all(slides)
+            sql_session.add_all(generated_assets)
+            await checkpoint.commit_presentation(sql_session)
+        return presentation
+
+    except BaseException:
+        if pipeline:
+            pipeline.cancel()
+        raise
 
-        slide_layout_indices = presentation_structure.slides
-        slide_layouts = [layout_model.slides[idx] for idx in slide_layout_indices]
 
-        # Schedule slide content generation and asset fetching in batches of 10
-        batch_size = 10
-        for start in range(0, len(slide_layouts), batch_size):
-            end = min(start + batch_size, len(slide_layouts))
+def record_generation_metrics(
+    metrics: PresentationGenerationMetrics,
+    async_status: Optional[AsyncPresentationGenerationTaskModel],
+    failed: bool = False,
+):
+    PRESENTATION_GENERATION_STAGE_TRACKER.record(metrics, failed)
+    metrics_dict = metrics.to_dict()
+    print(f"Presentation generation metrics: {json.dumps(metrics_dict)}")
+    PROMETHEUS_METRICS.record_generation(metrics_dict, failed)
+    if async_status:
+        async_status.metrics = metrics_dict
+        PROMETHEUS_METRICS.record_generation_task(
+            "failed" if failed else "completed"
+        )
 
-            print(f"Generating slides from {start} to {end}")
 
-            # Generate contents for this batch concurrently
-            content_tasks = [
-                get_slide_content_from_type_and_outline(
-                    slide_layouts[i],
-                    presentation_outlines.slides[i],
-                    request.language,
-                    request.tone.value,
-                    request.verbosity.value,
-                    request.instructions,
-                )
-                for i in range(start, end)
-            ]
-            batch_contents: List[dict] = await asyncio.gather(*content_tasks)
-
-            # Build slides for this batch
-            batch_slides: List[SlideModel] = []
-            for offset, slide_content in enumerate(batch_contents):
-                i = start + offset
-                slide_layout = slide_layouts[i]
-                slide = SlideModel(
-                    presentation=presentation_id,
-                    layout_group=layout_model.name,
-                    layout=slide_layout.id,
-                    index=i,
-                    speaker_note=slide_content.get("__speaker_note__"),
-                    content=slide_content,
+async def generate_presentation_handler(
+    request: GeneratePresentationRequest,
+    presentation_id: uuid.UUID,
+    async_status: Optional[AsyncPresentationGenerationTaskModel],
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    # Stages of this generation, including slides generated in other tasks
+    metrics = PresentationGenerationMetrics()
+    with metrics.measure(), PROMETHEUS_METRICS.track_generation(), TRACING.span(
+        "presentation.generate",
+        presentation_id=str(presentation_id),
+        n_slides=request.n_slides,
+    ):
+        # Stages completed by an earlier attempt of this task are not repeated
+        checkpoint = PresentationGenerationCheckpoint(async_status)
+        try:
+            presentation = None
+            if checkpoint.is_presentation_saved:
+                presentation = await sql_session.get(PresentationModel, presentation_id)
+            if not presentation:
+                presentation = await generate_and_save_presentation(
+                    request, presentation_id, async_status, sql_session, checkpoint
                 )
-                slides.append(slide)
-                batch_slides.append(slide)
-
-            # Start asset fetch tasks for just-generated slides so they run while next batch is processed
-            asset_tasks = [
-                process_slide_and_fetch_assets(image_generation_service, slide)
-                for slide in batch_slides
-            ]
-            async_assets_generation_tasks.extend(asset_tasks)
-
-        if async_status:
-            async_status.message = "Fetching assets for slides"
-            async_status.updated_at = datetime.now()
-            sql_session.add(async_status)
-            await sql_session.commit()
 
-        # Run all asset tasks concurrently while batches may still be generating content
-        generated_assets_list = await asyncio.gather(*async_assets_generation_tasks)
-        generated_assets = []
-        for assets_list in generated_assets_list:
-            generated_assets.extend(assets_list)
+            if async_status:
+                async_status.message = "Exporting presentation"
+                async_status.updated_at = datetime.now()
+                sql_session.add(async_status)
 
-        # 8. Save PresentationModel and Slides
-        sql_session.add(presentation)
-        sql_session.add_all(slides)
-        sql_session.add_all(generated_assets)
-        await sql_session.commit()
+            # 9. Export
+            with generation_stage("export"):
+                presentation_and_path = await export_presentation(
+                    presentation_id,
+                    presentation.title or str(uuid.uuid4()),
+                    request.export_as,
+                )
 
-        if async_status:
-            async_status.message = "Exporting presentation"
-            async_status.updated_at = datetime.now()
-            sql_session.add(async_status)
+            response = PresentationPathAndEditPath(
+                **presentation_and_path.model_dump(),
+                edit_path=f"/presentation?id={presentation_id}",
+            )
 
-        # 9. Export
-        presentation_and_path = await export_presentation(
-            presentation_id, presentation.title or str(uuid.uuid4()), request.export_as
-        )
+            record_generation_metrics(metrics, async_status)
+            if async_status:
+                async_status.message = "Presentation generation completed"
+                async_status.status = "completed"
+                async_status.data = response.model_dump(mode="json")
+                async_status.updated_at = datetime.now()
+                await PRESENTATION_GENERATION_QUEUE.save_final_status(
+                    sql_session, async_status
+                )
 
-        response = PresentationPathAndEditPath(
-            **presentation_and_path.model_dump(),
-            edit_path=f"/presentation?id={presentation_id}",
-        )
+            # Triggering webhook on success
+            CONCURRENT_SERVICE.run_task(
+                None,
+                WebhookService.send_webhook,
+                WebhookEvent.PRESENTATION_GENERATION_COMPLETED,
+                response.model_dump(mode="json"),
+            )
 
-        if async_status:
-            async_status.message = "Presentation generation completed"
-            async_status.status = "completed"
-            async_status.data = response.model_dump(mode="json")
-            async_status.updated_at = datetime.now()
-            sql_session.add(async_status)
-            await sql_session.commit()
+            return response
 
-        # Triggering webhook on success
-        CONCURRENT_SERVICE.run_task(
-            None,
-            WebhookService.send_webhook,
-            WebhookEvent.PRESENTATION_GENERATION_COMPLETED,
-            response.model_dump(mode="json"),
-        )
+        except PresentationGenerationWaiting:
+            # The queue runs the task again once its batches have ended
+            await checkpoint.flush()
+            raise
 
-        return response
+        except Exception as e:
+            if not isinstance(e, HTTPException):
+                traceback.print_exc()
+                e = HTTPException(
+                    status_code=500, detail="Presentation generation failed"
+                )
 
-    except Exception as e:
-        if not isinstance(e, HTTPException):
-            traceback.print_exc()
-            e = HTTPException(status_code=500, detail="Presentation generation failed")
+            api_error_model = APIErrorModel.from_exception(e)
+            record_generation_metrics(metrics, async_status, failed=True)
 
-        api_error_model = APIErrorModel.from_exception(e)
+            # Triggering webhook on failure
+            CONCURRENT_SERVICE.run_task(
+                None,
+                WebhookService.send_webhook,
+                WebhookEvent.PRESENTATION_GENERATION_FAILED,
+                api_error_model.model_dump(mode="json"),
+            )
 
-        # Triggering webhook on failure
-        CONCURRENT_SERVICE.run_task(
-            None,
-            WebhookService.send_webhook,
-            WebhookEvent.PRESENTATION_GENERATION_FAILED,
-            api_error_model.model_dump(mode="json"),
-        )
+            # Slides finished before the failure are kept for a retry
+            await checkpoint.flush()
 
-        if async_status:
-            async_status.status = "error"
-            async_status.message = "Presentation generation failed"
-            async_status.updated_at = datetime.now()
-            async_status.error = api_error_model.model_dump(mode="json")
-            sql_session.add(async_status)
-            await sql_session.commit()
+            if async_status:
+                async_status.status = "error"
+                async_status.message = "Presentation generation failed"
+                async_status.updated_at = datetime.now()
+                async_status.error = api_error_model.model_dump(mode="json")
+                await PRESENTATION_GENERATION_QUEUE.save_final_status(
+                    sql_session, async_status
+                )
 
-        else:
-            raise e
+            else:
+                raise e
 
 
 @PRESENTATION_ROUTER.post("/generate", response_model=PresentationPathAndEditPath)
@@ -823,28 +1131,14 @@ async def generate_presentation_sync(
 )
 async def generate_presentation_async(
     request: GeneratePresentationRequest,
-    background_tasks: BackgroundTasks,
     sql_session: AsyncSession = Depends(get_async_session),
 ):
     try:
         (presentation_id,) = await check_if_api_request_is_valid(request, sql_session)
 
-        async_status = AsyncPresentationGenerationTaskModel(
-            status="pending",
-            message="Queued for generation",
-            data=None,
-        )
-        sql_session.add(async_status)
-        await sql_session.commit()
-
-        background_tasks.add_task(
-            generate_presentation_handler,
-            request,
-            presentation_id,
-            async_status=async_status,
-            sql_session=sql_session,
+        return await PRESENTATION_GENERATION_QUEUE.enqueue(
+            sql_session, presentation_id, request, request.priority
         )
-        return async_status
 
     except Exception as e:
         if not isinstance(e, HTTPException):
@@ -854,6 +1148,39 @@ async def generate_presentation_async(
         raise e
 
 
+async def run_queued_presentation_generation(
+    async_status: AsyncPresentationGenerationTaskModel,
+    sql_session: AsyncSession,
+):
+    request = GeneratePresentationRequest(**async_status.request)
+
+    # An unsaved presentation shouldn't have rows, but any left behind are removed
+    # so saving it again can't hit existing ids. Checked on every run, as resumed
+    # tasks start their attempts over
+    checkpoint = PresentationGenerationCheckpoint(async_status)
+    if not checkpoint.is_presentation_saved:
+        asset_ids = checkpoint.get_asset_ids()
+        if asset_ids:
+            await sql_session.execute(
+                delete(ImageAsset).where(ImageAsset.id.in_(asset_ids))
+            )
+        await sql_session.execute(
+            delete(SlideModel).where(
+                SlideModel.presentation == async_status.presentation_id
+            )
+        )
+        await sql_session.execute(
+            delete(PresentationModel).where(
+                PresentationModel.id == async_status.presentation_id
+            )
+        )
+        await sql_session.commit()
+
+    await generate_presentation_handler(
+        request, async_status.presentation_id, async_status, sql_session
+    )
+
+
 @PRESENTATION_ROUTER.get(
     "/status/{id}", response_model=AsyncPresentationGenerationTaskModel
 )
@@ -869,6 +1196,66 @@ async def check_async_presentation_generation_status(
     return status
 
 
+@PRESENTATION_ROUTER.get("/generation/metrics", response_model=dict)
+async def get_presentation_generation_metrics():
+    # Presentations generated by this process, queue workers keep their own
+    return PRESENTATION_GENERATION_STAGE_TRACKER.snapshot()
+
+
+@PRESENTATION_ROUTER.post(
+    "/cancel/{id}", response_model=AsyncPresentationGenerationTaskModel
+)
+async def cancel_async_presentation_generation(
+    id: str = Path(description="ID of the presentation generation task"),
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    async_status = await sql_session.get(AsyncPresentationGenerationTaskModel, id)
+    if not async_status:
+        raise HTTPException(
+            status_code=404, detail="No presentation generation task found"
+        )
+    if not await PRESENTATION_GENERATION_QUEUE.cancel(sql_session, async_status):
+        raise HTTPException(
+            status_code=400,
+            detail="Presentation generation task has already finished",
+        )
+    return async_status
+
+
+@PRESENTATION_ROUTER.post(
+    "/resume/{id}", response_model=AsyncPresentationGenerationTaskModel
+)
+async def resume_async_presentation_generation(
+    id: str = Path(description="ID of the presentation generation task"),
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    async_status = await sql_session.get(AsyncPresentationGenerationTaskModel, id)
+    if not async_status:
+        raise HTTPException(
+            status_code=404, detail="No presentation generation task found"
+        )
+    if async_status.status not in ["error", "cancelled"]:
+        raise HTTPException(
+            status_code=400,
+            detail="Only failed or cancelled presentation generation tasks can be resumed",
+        )
+    if not async_status.request:
+        raise HTTPException(
+            status_code=400,
+            detail="This presentation generation task can't be resumed",
+        )
+
+    completed_stages = PresentationGenerationCheckpoint(
+        async_status
+    ).get_completed_stages()
+    message = "Queued for resuming"
+    if completed_stages:
+        message += f" after {', '.join(completed_stages)}"
+    return await PRESENTATION_GENERATION_QUEUE.requeue(
+        sql_session, async_status, message
+    )
+
+
 @PRESENTATION_ROUTER.post("/edit", response_model=PresentationPathAndEditPath)
 async def edit_presentation_with_new_content(
     data: Annotated[EditPresentationRequest, Body()],
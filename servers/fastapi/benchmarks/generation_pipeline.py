@@ -0,0 +1,265 @@
+"""
+End to end benchmark of presentation generation: generate_presentation_handler
+runs against stub LLM, image and Next.js services, with no network needed.
+Reports throughput, p50/p95 latency and peak RSS for each deck size and
+number of concurrent jobs.
+
+    python -m benchmarks.generation_pipeline --slides 5 20 50 --jobs 1 4
+
+Icon search runs on a few stub icons with a word count embedding instead of
+the embedding model, which would be downloaded on the first run.
+"""
+
+import argparse
+import asyncio
+from contextlib import nullcontext, redirect_stdout
+import json
+import math
+import os
+import resource
+import tempfile
+import threading
+import time
+from typing import List, Optional
+import uuid
+
+from benchmarks.stub_services import StubServicesConfig, StubServicesProcess
+
+
+# Bold icons shipped in static/icons, ranked by the words they share with a query
+STUB_ICONS = {
+    "icons": [
+        {"name": "chart-bar-bold", "tags": "chart graph growth"},
+        {"name": "money-bold", "tags": "money cash revenue"},
+        {"name": "leaf-bold", "tags": "leaf nature energy"},
+        {"name": "rocket-bold", "tags": "rocket launch"},
+        {"name": "user-bold", "tags": "user person team"},
+    ]
+}
+STUB_ICON_WORDS = ["chart", "money", "leaf", "rocket", "person"]
+
+
+def embed_words(documents: List[str]) -> list:
+    # One dimension per known word, deterministic and without a model
+    return [
+        [float(document.count(word)) + 0.01 for word in STUB_ICON_WORDS]
+        for document in documents
+    ]
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class PeakMemorySampler:
+    """Samples the resident memory of this process until stopped."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def get_rss(self) -> int:
+        try:
+            with open("/proc/self/statm") as file:
+                return int(file.read().split()[1]) * self._page_size
+        except OSError:
+            # Peak of the whole run where /proc is not available, in KiB on Linux
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.get_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "PeakMemorySampler":
+        self.peak = self.get_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.get_rss())
+
+
+def set_environment(directory: str, stub_url: str, port: int):
+    """Points the app at the stub services, before any of it is imported."""
+    os.environ.update(
+        {
+            "APP_DATA_DIRECTORY": directory,
+            "TEMP_DIRECTORY": os.path.join(directory, "temp"),
+            "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'fastapi.db')}",
+            "LLM": "custom",
+            "CUSTOM_LLM_URL": f"{stub_url}/v1",
+            "CUSTOM_LLM_API_KEY": "stub",
+            "CUSTOM_MODEL": "stub-model",
+            "IMAGE_PROVIDER": "dall-e-3",
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"{stub_url}/v1",
+            "NEXTJS_PORT": str(port),
+            "TOOL_CALLS": "false",
+            "DISABLE_THINKING": "true",
+            "WEB_GROUNDING": "false",
+        }
+    )
+    for each in ("LLM_FALLBACK_PROVIDERS", "DISABLE_IMAGE_GENERATION"):
+        os.environ.pop(each, None)
+
+
+def use_stub_icon_search(directory: str):
+    import utils.process_slides
+    from services.icon_finder_service import IconFinderService
+
+    icons_path = os.path.join(directory, "icons.json")
+    with open(icons_path, "w") as file:
+        json.dump(STUB_ICONS, file)
+    utils.process_slides.ICON_FINDER_SERVICE = IconFinderService(
+        icons_path, os.path.join(directory, "icons_index"), embed_words
+    )
+
+
+async def run_scenario(n_slides: int, jobs: int, decks: int, args) -> dict:
+    from api.v1.ppt.endpoints.presentation import generate_presentation_handler
+    from models.generate_presentation_request import GeneratePresentationRequest
+    from services.database import async_session_maker
+    from services.presentation_generation_metrics import (
+        PRESENTATION_GENERATION_STAGE_TRACKER,
+    )
+
+    request = GeneratePresentationRequest(
+        content="Quarterly review of a renewable energy company",
+        n_slides=n_slides,
+        export_as=args.export_as,
+        bypass_llm_cache=True,
+    )
+    slots = asyncio.Semaphore(jobs)
+    latencies: List[float] = []
+    failures = 0
+
+    async def generate():
+        nonlocal failures
+        async with slots:
+            started_at = time.perf_counter()
+            try:
+                async with async_session_maker() as session:
+                    await generate_presentation_handler(
+                        request.model_copy(), uuid.uuid4(), None, session
+                    )
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started_at)
+
+    PRESENTATION_GENERATION_STAGE_TRACKER.reset()
+    with PeakMemorySampler() as memory:
+        started_at = time.perf_counter()
+        with open(os.devnull, "w") as devnull, (
+            nullcontext() if args.verbose else redirect_stdout(devnull)
+        ):
+            await asyncio.gather(*(generate() for _ in range(decks)))
+        duration = time.perf_counter() - started_at
+
+    stages = PRESENTATION_GENERATION_STAGE_TRACKER.snapshot()["stages"]
+    return {
+        "slides": n_slides,
+        "jobs": jobs,
+        "decks": decks,
+        "failed": failures,
+        "duration": round(duration, 3),
+        "decks_per_minute": round(len(latencies) / duration * 60, 2),
+        "slides_per_second": round(len(latencies) * n_slides / duration, 2),
+        "p50": round(percentile(latencies, 50), 3) if latencies else None,
+        "p95": round(percentile(latencies, 95), 3) if latencies else None,
+        "peak_rss_mb": round(memory.peak / 2**20, 1),
+        "stages": {
+            name: round(stage["duration"] / max(len(latencies) + failures, 1), 3)
+            for name, stage in stages.items()
+        },
+    }
+
+
+async def run_benchmark(args) -> List[dict]:
+    from services.database import create_db_and_tables
+
+    await create_db_and_tables()
+
+    # Not measured, the first generation loads models and warms connection pools
+    for _ in range(args.warmup):
+        await run_scenario(min(args.slides), 1, 1, args)
+
+    results = []
+    print(
+        f"{'slides':>6} {'jobs':>4} {'decks':>5} {'failed':>6} {'decks/min':>9} "
+        f"{'slides/s':>8} {'p50':>8} {'p95':>8} {'peak RSS':>9}"
+    )
+    for n_slides in args.slides:
+        for jobs in args.jobs:
+            decks = args.decks or jobs * 2
+            result = await run_scenario(n_slides, jobs, decks, args)
+            results.append(result)
+            p50 = f"{result['p50']:.2f}s" if result["p50"] is not None else "-"
+            p95 = f"{result['p95']:.2f}s" if result["p95"] is not None else "-"
+            print(
+                f"{n_slides:>6} {jobs:>4} {decks:>5} {result['failed']:>6} "
+                f"{result['decks_per_minute']:>9.2f} "
+                f"{result['slides_per_second']:>8.2f} {p50:>8} {p95:>8} "
+                f"{result['peak_rss_mb']:>7.1f}MB"
+            )
+    return results
+
+
+def main(args):
+    with tempfile.TemporaryDirectory(prefix="presenton-benchmark-") as directory:
+        config = StubServicesConfig(
+            llm_latency=args.llm_latency,
+            llm_tokens_per_second=args.llm_tokens_per_second,
+            llm_output_tokens=args.llm_output_tokens,
+            jitter=args.jitter,
+            image_latency=args.image_latency,
+            database_path=os.path.join(directory, "fastapi.db"),
+            seed=args.seed,
+        )
+        with StubServicesProcess(config) as stub_services:
+            set_environment(directory, stub_services.url, stub_services.port)
+            use_stub_icon_search(directory)
+            print(
+                f"Stub LLM: {args.llm_latency}s to first token, "
+                f"{args.llm_tokens_per_second} tokens/s, jitter {args.jitter}; "
+                f"stub images: {args.image_latency}s"
+            )
+            results = asyncio.run(run_benchmark(args))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"config": config.model_dump(), "results": results}, file)
+        print(f"Results written to {args.output}")
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument(
+        "--jobs", type=int, nargs="+", default=[1, 4], help="Concurrent generations"
+    )
+    parser.add_argument(
+        "--decks", type=int, help="Decks generated per run, twice the jobs by default"
+    )
+    parser.add_argument("--export-as", choices=["pptx", "pdf"], default="pptx")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--llm-output-tokens", type=int)
+    parser.add_argument("--image-latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show generation logs")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
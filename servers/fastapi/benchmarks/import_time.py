@@ -0,0 +1,151 @@
+"""
+Import time of the FastAPI app, the time before the server can answer
+anything. Each run imports it in a fresh interpreter with python -X importtime
+and reports the wall time and the slowest modules and packages.
+
+    python -m benchmarks.import_time --runs 5 --max-seconds 3
+
+Exits with an error when the median is over --max-seconds, or more than
+--max-growth slower than a report given with --compare.
+"""
+
+import argparse
+from collections import defaultdict
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+from benchmarks.load_test import get_git_commit
+
+
+def parse_importtime(stderr: str) -> List[tuple[str, int, int]]:
+    """Module, self and cumulative microseconds of each line of -X importtime."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run_import(module: str) -> tuple[float, List[tuple[str, int, int]]]:
+    started_at = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+    )
+    duration = time.perf_counter() - started_at
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1:]
+        raise RuntimeError(f"Importing {module} failed: {''.join(error)}")
+    return duration, parse_importtime(process.stderr)
+
+
+def get_package_times(modules: List[tuple[str, int, int]]) -> dict[str, float]:
+    """Seconds spent importing each top level package, its own modules only."""
+    packages = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    return {name: us / 1e6 for name, us in packages.items()}
+
+
+def run_benchmark(args) -> dict:
+    durations = []
+    package_times = defaultdict(list)
+    module_times = defaultdict(list)
+    for _ in range(args.runs):
+        duration, modules = run_import(args.module)
+        durations.append(duration)
+        for name, seconds in get_package_times(modules).items():
+            package_times[name].append(seconds)
+        for name, _, cumulative_us in modules:
+            module_times[name].append(cumulative_us / 1e6)
+
+    def get_slowest(times: dict[str, list]) -> dict[str, float]:
+        medians = {name: statistics.median(each) for name, each in times.items()}
+        slowest = sorted(medians.items(), key=lambda each: -each[1])[: args.top]
+        return {name: round(seconds, 3) for name, seconds in slowest}
+
+    return {
+        "module": args.module,
+        "git_commit": get_git_commit(),
+        "runs": args.runs,
+        "median": round(statistics.median(durations), 3),
+        "min": round(min(durations), 3),
+        "max": round(max(durations), 3),
+        "packages": get_slowest(package_times),
+        "modules": get_slowest(module_times),
+    }
+
+
+def print_report(report: dict):
+    print(
+        f"import {report['module']}: median {report['median']:.2f}s "
+        f"(min {report['min']:.2f}s, max {report['max']:.2f}s, "
+        f"{report['runs']} runs)"
+    )
+    print("\nSlowest packages, own modules only")
+    for name, seconds in report["packages"].items():
+        print(f"  {name:<50} {seconds:>7.3f}s")
+    print("\nSlowest modules, with their imports")
+    for name, seconds in report["modules"].items():
+        print(f"  {name:<50} {seconds:>7.3f}s")
+
+
+def main(args) -> int:
+    report = run_benchmark(args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    failed = False
+    if args.max_seconds and report["median"] > args.max_seconds:
+        print(f"\nImport took {report['median']:.2f}s, over {args.max_seconds}s")
+        failed = True
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        growth = report["median"] / baseline["median"] - 1
+        print(
+            f"\nCompared with {baseline.get('git_commit') or args.compare}: "
+            f"{baseline['median']:.2f}s -> {report['median']:.2f}s ({growth:+.1%})"
+        )
+        for name, seconds in report["packages"].items():
+            before = baseline["packages"].get(name)
+            if before is None or seconds - before > 0.05:
+                print(f"  {name:<50} {before or 0:>7.3f}s -> {seconds:.3f}s")
+        if growth > args.max_growth:
+            print(f"Import is {growth:.0%} slower, over {args.max_growth:.0%}")
+            failed = True
+    return 1 if failed else 0
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="api.main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Modules to list")
+    parser.add_argument("--max-seconds", type=float, help="Maximum median import")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--compare", help="Report of an earlier run to compare with")
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=0.2,
+        help="Maximum slowdown against --compare, as a fraction",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
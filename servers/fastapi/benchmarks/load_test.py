@@ -0,0 +1,552 @@
+"""
+Load test of one API instance against the stub services. Simulated users run
+a weighted mix of scenarios (outline streaming, sync and async generation,
+slide edit, export and PPTX import) for a while at each number of users.
+Reports throughput, error rate and latency percentiles of every scenario at
+every step, and compares them with the report of an earlier run.
+
+    python -m benchmarks.load_test --users 1 4 16 --duration 60
+    python -m benchmarks.load_test --users 8 --output report.json --compare base.json
+
+Without --url the API and the stub services are started locally. With --url
+the instance must already use stub services, see benchmarks/stub_services.py.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+from pptx import Presentation
+
+from benchmarks.generation_pipeline import percentile, set_environment
+from benchmarks.stub_services import (
+    StubServicesConfig,
+    StubServicesProcess,
+    get_free_port,
+)
+
+
+PPTX_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+)
+
+DEFAULT_WEIGHTS = {
+    "outlines": 3,
+    "generate": 1,
+    "generate_async": 1,
+    "slide_edit": 3,
+    "export": 2,
+    "pptx_import": 1,
+}
+
+
+class LoadTestError(Exception):
+    def __init__(self, message: str, detail: str = ""):
+        super().__init__(message)
+        self.detail = detail
+
+
+async def raise_for_status(response: aiohttp.ClientResponse):
+    if response.status >= 400:
+        detail = (await response.text())[:200]
+        raise LoadTestError(
+            f"{response.method} {response.url.path}: {response.status}", detail
+        )
+
+
+class LoadTestStats:
+    """Latency and errors of every scenario run during one step."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Counter] = {}
+
+    def record(self, scenario: str, latency: float, error: Optional[str] = None):
+        if error:
+            self.errors.setdefault(scenario, Counter())[error] += 1
+        else:
+            self.latencies.setdefault(scenario, []).append(latency)
+
+    def summarize(self, duration: float) -> dict:
+        summary = {}
+        for scenario in sorted({*self.latencies, *self.errors}):
+            latencies = self.latencies.get(scenario, [])
+            errors = self.errors.get(scenario, Counter())
+            n_errors = sum(errors.values())
+            requests = len(latencies) + n_errors
+            summary[scenario] = {
+                "requests": requests,
+                "errors": n_errors,
+                "error_rate": round(n_errors / requests, 4),
+                "throughput": round(len(latencies) / duration, 3),
+                "p50": round(percentile(latencies, 50), 3) if latencies else None,
+                "p95": round(percentile(latencies, 95), 3) if latencies else None,
+                "p99": round(percentile(latencies, 99), 3) if latencies else None,
+                "max": round(max(latencies), 3) if latencies else None,
+                "top_errors": dict(errors.most_common(3)),
+            }
+        return summary
+
+
+class LoadTestClient:
+    """Calls of the API used by the scenarios."""
+
+    def __init__(self, session: aiohttp.ClientSession, args):
+        self.session = session
+        self.args = args
+        self.presentation_id: Optional[str] = None
+        self.slide_ids: List[str] = []
+        self.pptx = get_sample_pptx()
+
+    async def post_json(self, path: str, body: dict) -> dict:
+        async with self.session.post(f"/api/v1/ppt{path}", json=body) as response:
+            await raise_for_status(response)
+            return await response.json()
+
+    async def get_json(self, path: str) -> dict:
+        async with self.session.get(f"/api/v1/ppt{path}") as response:
+            await raise_for_status(response)
+            return await response.json()
+
+    def get_generate_request(self) -> dict:
+        return {
+            "content": "Quarterly review of a renewable energy company",
+            "n_slides": self.args.slides,
+            "export_as": self.args.export_as,
+            "bypass_llm_cache": True,
+        }
+
+    async def prepare(self, n_slides: int):
+        """Presentations edited and exported by the scenarios."""
+        while len(self.slide_ids) < n_slides:
+            response = await self.post_json(
+                "/presentation/generate", self.get_generate_request()
+            )
+            self.presentation_id = response["presentation_id"]
+            presentation = await self.get_json(
+                f"/presentation/{self.presentation_id}"
+            )
+            self.slide_ids.extend(slide["id"] for slide in presentation["slides"])
+
+
+def get_sample_pptx() -> bytes:
+    presentation = Presentation()
+    for index in range(5):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = f"Quarter {index + 1}"
+        slide.placeholders[1].text = "Revenue grew while costs stayed flat"
+    buffer = io.BytesIO()
+    presentation.save(buffer)
+    return buffer.getvalue()
+
+
+# ? Scenarios
+async def run_outlines(client: LoadTestClient):
+    presentation = await client.post_json(
+        "/presentation/create",
+        {
+            "content": "Quarterly review of a renewable energy company",
+            "n_slides": client.args.slides,
+            "language": "English",
+        },
+    )
+    async with client.session.get(
+        f"/api/v1/ppt/outlines/stream/{presentation['id']}"
+    ) as response:
+        await raise_for_status(response)
+        async for line in response.content:
+            if not line.startswith(b"data: "):
+                continue
+            data = json.loads(line[len(b"data: ") :])
+            if data["type"] == "error":
+                raise LoadTestError("Outline stream failed", data["detail"])
+            if data["type"] == "complete":
+                return
+    raise LoadTestError("Outline stream ended before completing")
+
+
+async def run_generate(client: LoadTestClient):
+    await client.post_json("/presentation/generate", client.get_generate_request())
+
+
+async def run_generate_async(client: LoadTestClient):
+    task = await client.post_json(
+        "/presentation/generate/async", client.get_generate_request()
+    )
+    while task["status"] in ("pending", "processing"):
+        await asyncio.sleep(client.args.poll_interval)
+        task = await client.get_json(f"/presentation/status/{task['id']}")
+    if task["status"] != "completed":
+        raise LoadTestError(
+            f"Async generation {task['status']}", task.get("message") or ""
+        )
+
+
+async def run_slide_edit(client: LoadTestClient):
+    # Edited slides get a new id, a slide is edited by one user at a time
+    slide_id = client.slide_ids.pop(random.randrange(len(client.slide_ids)))
+    try:
+        slide = await client.post_json(
+            "/slide/edit",
+            {"id": slide_id, "prompt": "Make this slide more concise"},
+        )
+        slide_id = slide["id"]
+    finally:
+        client.slide_ids.append(slide_id)
+
+
+async def run_export(client: LoadTestClient):
+    await client.post_json(
+        "/presentation/export",
+        {"id": client.presentation_id, "export_as": client.args.export_as},
+    )
+
+
+async def run_pptx_import(client: LoadTestClient):
+    form = aiohttp.FormData()
+    form.add_field(
+        "pptx_file",
+        client.pptx,
+        filename="quarterly-review.pptx",
+        content_type=PPTX_CONTENT_TYPE,
+    )
+    async with client.session.post(
+        "/api/v1/ppt/pptx-slides/process", data=form
+    ) as response:
+        await raise_for_status(response)
+        await response.read()
+
+
+SCENARIOS: Dict[str, Callable[[LoadTestClient], Awaitable[None]]] = {
+    "outlines": run_outlines,
+    "generate": run_generate,
+    "generate_async": run_generate_async,
+    "slide_edit": run_slide_edit,
+    "export": run_export,
+    "pptx_import": run_pptx_import,
+}
+
+
+async def run_user(
+    client: LoadTestClient,
+    weights: Dict[str, float],
+    stats: LoadTestStats,
+    stop_at: float,
+    rng: random.Random,
+    think_time: float,
+):
+    names, scenario_weights = zip(*weights.items())
+    while time.monotonic() < stop_at:
+        scenario = rng.choices(names, scenario_weights)[0]
+        started_at = time.perf_counter()
+        error = None
+        try:
+            await SCENARIOS[scenario](client)
+        except LoadTestError as e:
+            error = str(e)
+        except Exception as e:
+            error = e.__class__.__name__
+        stats.record(scenario, time.perf_counter() - started_at, error)
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+async def run_step(client: LoadTestClient, users: int, weights, args) -> dict:
+    stats = LoadTestStats()
+    started_at = time.monotonic()
+    stop_at = started_at + args.duration
+    rng = random.Random(args.seed + users)
+
+    async def start_user(index: int):
+        # Users start spread over the ramp up
+        await asyncio.sleep(args.ramp_up * index / users)
+        user_rng = random.Random(rng.random())
+        await run_user(client, weights, stats, stop_at, user_rng, args.think_time)
+
+    # Scenarios still running at the end are waited for and counted
+    await asyncio.gather(*(start_user(index) for index in range(users)))
+    duration = time.monotonic() - started_at
+    return {
+        "users": users,
+        "duration": round(duration, 3),
+        "scenarios": stats.summarize(duration),
+    }
+
+
+def get_step_totals(step: dict) -> dict:
+    scenarios = step["scenarios"].values()
+    requests = sum(each["requests"] for each in scenarios)
+    errors = sum(each["errors"] for each in scenarios)
+    return {
+        "throughput": sum(each["throughput"] for each in scenarios),
+        "error_rate": errors / requests if requests else 0.0,
+    }
+
+
+def print_step(step: dict):
+    print(f"\n{step['users']} users, {step['duration']:.0f}s")
+    print(
+        f"  {'scenario':<15} {'requests':>8} {'errors':>7} {'req/s':>7} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    )
+
+    def seconds(value):
+        return f"{value:.2f}s" if value is not None else "-"
+
+    for name, each in step["scenarios"].items():
+        print(
+            f"  {name:<15} {each['requests']:>8} {each['errors']:>7} "
+            f"{each['throughput']:>7.2f} {seconds(each['p50']):>8} "
+            f"{seconds(each['p95']):>8} {seconds(each['p99']):>8} "
+            f"{seconds(each['max']):>8}"
+        )
+        for error, count in each["top_errors"].items():
+            print(f"    {count} x {error}")
+
+
+def print_capacity(steps: List[dict], args):
+    """
+    Largest step that kept errors and the p95 of every scenario within
+    bounds, relative to the first step.
+    """
+    baseline = steps[0]["scenarios"]
+    sustained = None
+    for step in steps:
+        totals = get_step_totals(step)
+        within_p95 = all(
+            each["p95"] is None
+            or baseline.get(name, {}).get("p95") is None
+            or each["p95"] <= baseline[name]["p95"] * args.max_p95_growth
+            for name, each in step["scenarios"].items()
+        )
+        if totals["error_rate"] > args.max_error_rate or not within_p95:
+            break
+        sustained = step
+    if sustained:
+        print(
+            f"\nSustained {sustained['users']} users at "
+            f"{get_step_totals(sustained)['throughput']:.2f} req/s "
+            f"(errors <= {args.max_error_rate:.0%}, p95 <= "
+            f"{args.max_p95_growth}x of {steps[0]['users']} users)"
+        )
+    else:
+        print("\nNo step stayed within the error and latency bounds")
+
+
+def print_comparison(report: dict, baseline: dict):
+    print(f"\nCompared with {baseline.get('git_commit') or 'baseline'}")
+    baseline_steps = {step["users"]: step for step in baseline["steps"]}
+    for step in report["steps"]:
+        previous = baseline_steps.get(step["users"])
+        if not previous:
+            continue
+        for name, each in step["scenarios"].items():
+            before = previous["scenarios"].get(name)
+            if not before:
+                continue
+            changes = []
+            for key in ("throughput", "p95"):
+                if each[key] and before[key]:
+                    change = (each[key] - before[key]) / before[key]
+                    changes.append(f"{key} {change:+.1%}")
+            errors = f"errors {before['error_rate']:.1%} -> {each['error_rate']:.1%}"
+            print(
+                f"  {step['users']:>4} users {name:<15} "
+                f"{', '.join(changes)}, {errors}"
+            )
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class AppServerProcess:
+    """Runs the API with server.py, logging to a file."""
+
+    def __init__(self, port: int, log_path: str):
+        self.port = port
+        self.log_path = log_path
+        self._process = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "AppServerProcess":
+        self._log = open(self.log_path, "w")
+        self._process = subprocess.Popen(
+            [sys.executable, "server.py", "--port", str(self.port)],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=os.environ.copy(),
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+        started_at = time.monotonic()
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    return self
+            except OSError:
+                timed_out = time.monotonic() - started_at > 120
+                if self._process.poll() is not None or timed_out:
+                    self.__exit__()
+                    raise RuntimeError(f"API didn't start, see {self.log_path}")
+                time.sleep(0.1)
+
+    def __exit__(self, *args):
+        self._process.terminate()
+        self._process.wait()
+        self._log.close()
+
+
+async def run_load_test(url: str, weights: Dict[str, float], args) -> dict:
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(
+        url, timeout=timeout, connector=connector
+    ) as session:
+        client = LoadTestClient(session, args)
+        if {"slide_edit", "export"} & set(weights):
+            # Every user can edit a slide of its own
+            await client.prepare(max(args.users))
+
+        steps = []
+        for users in args.users:
+            step = await run_step(client, users, weights, args)
+            steps.append(step)
+            print_step(step)
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": get_git_commit(),
+        "config": {
+            "weights": weights,
+            "slides": args.slides,
+            "duration": args.duration,
+            "think_time": args.think_time,
+            "llm_latency": args.llm_latency,
+            "image_latency": args.image_latency,
+        },
+        "steps": steps,
+    }
+
+
+def parse_weights(values: Optional[List[str]]) -> Dict[str, float]:
+    if not values:
+        return dict(DEFAULT_WEIGHTS)
+    weights = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(
+                f"Unknown scenario {name}, use one of {', '.join(SCENARIOS)}"
+            )
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def main(args):
+    weights = parse_weights(args.scenario)
+    if args.url:
+        report = asyncio.run(run_load_test(args.url, weights, args))
+    else:
+        with tempfile.TemporaryDirectory(prefix="presenton-load-test-") as directory:
+            config = StubServicesConfig(
+                llm_latency=args.llm_latency,
+                llm_tokens_per_second=args.llm_tokens_per_second,
+                jitter=args.jitter,
+                image_latency=args.image_latency,
+                database_path=os.path.join(directory, "fastapi.db"),
+                seed=args.seed,
+            )
+            with StubServicesProcess(config) as stub_services:
+                set_environment(directory, stub_services.url, stub_services.port)
+                # Keys come from the environment, not the user config
+                os.environ["CAN_CHANGE_KEYS"] = "false"
+                with AppServerProcess(
+                    get_free_port(),
+                    os.path.join(directory, "server.log"),
+                ) as server:
+                    report = asyncio.run(run_load_test(server.url, weights, args))
+
+    print_capacity(report["steps"], args)
+    if args.compare:
+        with open(args.compare) as file:
+            print_comparison(report, json.load(file))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="API to load, started locally if not given")
+    parser.add_argument(
+        "--users",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16],
+        help="Concurrent users of each step",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=60, help="Seconds of each step"
+    )
+    parser.add_argument(
+        "--ramp-up", type=float, default=5, help="Seconds to start all users"
+    )
+    parser.add_argument(
+        "--think-time", type=float, default=1, help="Mean pause between scenarios"
+    )
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        help="Scenarios to run with their weights, e.g. outlines=3 slide_edit=1",
+    )
+    parser.add_argument(
+        "--slides", type=int, default=5, help="Slides of generated decks"
+    )
+    parser.add_argument("--export-as", choices=["pptx", "pdf"], default="pptx")
+    parser.add_argument("--poll-interval", type=float, default=1)
+    parser.add_argument(
+        "--timeout", type=float, default=600, help="Seconds before a call fails"
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--image-latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--max-p95-growth",
+        type=float,
+        default=3,
+        help="p95 growth over the first step still counted as sustained",
+    )
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--compare", help="Report of an earlier run to compare with")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,82 @@
+"""
+Wall time of slide content generation against a stub LLM with randomized
+latency, comparing fixed batches of 10 slides with the LLM worker pool.
+
+    python -m benchmarks.slide_content_scheduling --concurrency 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, List
+
+from services.llm_worker_pool import LLMWorkerPool
+
+
+class StubLLM:
+    """
+    Slide content calls with log-normal latency, the long tail of real providers.
+    At most concurrency calls are served at once, like a provider limit.
+    """
+
+    def __init__(self, median: float, sigma: float, concurrency: int, seed: int):
+        self.median = median
+        self.sigma = sigma
+        self._slots = asyncio.Semaphore(concurrency)
+        self._random = random.Random(seed)
+
+    async def generate_slide_content(self, index: int) -> dict:
+        latency = self.median * self._random.lognormvariate(0, self.sigma)
+        async with self._slots:
+            await asyncio.sleep(latency)
+        return {"index": index}
+
+
+async def run_in_batches(
+    generate: Callable[[int], Awaitable[dict]], n_slides: int, batch_size: int
+) -> List[dict]:
+    # Previous behaviour, every batch waits for its slowest slide
+    results = []
+    for start in range(0, n_slides, batch_size):
+        end = min(start + batch_size, n_slides)
+        results.extend(await asyncio.gather(*map(generate, range(start, end))))
+    return results
+
+
+async def run_in_pool(
+    generate: Callable[[int], Awaitable[dict]], n_slides: int, pool_size: int
+) -> List[dict]:
+    return await LLMWorkerPool(pool_size).map(generate, range(n_slides))
+
+
+async def measure(run, n_slides: int, size: int, args) -> float:
+    llm = StubLLM(args.median, args.sigma, args.concurrency, args.seed + n_slides)
+    started_at = time.perf_counter()
+    await run(llm.generate_slide_content, n_slides, size)
+    return time.perf_counter() - started_at
+
+
+async def main(args):
+    print(
+        f"Stub LLM: median {args.median}s, sigma {args.sigma}, "
+        f"{args.concurrency} concurrent calls"
+    )
+    print(f"{'slides':>8} {'batches of 10':>15} {'worker pool':>13} {'speedup':>9}")
+    for n_slides in args.slides:
+        batched = await measure(run_in_batches, n_slides, 10, args)
+        pooled = await measure(run_in_pool, n_slides, args.concurrency, args)
+        print(
+            f"{n_slides:>8} {batched:>14.2f}s {pooled:>12.2f}s "
+            f"{batched / pooled:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, nargs="+", default=[5, 10, 20, 50, 100])
+    parser.add_argument("--median", type=float, default=0.5)
+    parser.add_argument("--sigma", type=float, default=0.6)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,403 @@
+"""
+Local stand in for the services a presentation generation calls: an OpenAI
+compatible LLM and image API and the Next.js layout and export routes.
+LLM responses are generated from the requested JSON schema with configurable
+latency, so generation runs deterministically without network.
+
+Run standalone with:
+    python -m benchmarks.stub_services --port 8766 --database /tmp/presenton/fastapi.db
+and point CUSTOM_LLM_URL and OPENAI_BASE_URL to http://127.0.0.1:8766/v1 and
+NEXTJS_PORT to 8766.
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import multiprocessing
+import os
+import random
+import re
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from PIL import Image
+from pydantic import BaseModel
+import uvicorn
+
+from tests.stubs.llm_batch_server import sample_from_schema
+
+
+class StubServicesConfig(BaseModel):
+    # Seconds until the first token of every LLM response
+    llm_latency: float = 0.2
+    llm_tokens_per_second: float = 200.0
+    # Output tokens of every LLM response, about a token per 4 characters if unset
+    llm_output_tokens: Optional[int] = None
+    # Sigma of the log-normal factor applied to LLM and image latencies
+    jitter: float = 0.0
+    image_latency: float = 0.5
+    image_size: int = 512
+    export_latency: float = 0.0
+    # SQLite database of the generation, read to build PPTX models like Next.js
+    database_path: Optional[str] = None
+    seed: int = 0
+
+
+def get_image_schema(prompt_length: int = 10) -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            "__image_prompt__": {"type": "string", "minLength": prompt_length},
+            "__image_url__": {"type": "string"},
+        },
+        "required": ["__image_prompt__", "__image_url__"],
+    }
+
+
+def get_icon_schema() -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            "__icon_query__": {"type": "string", "minLength": 5},
+            "__icon_url__": {"type": "string"},
+        },
+        "required": ["__icon_query__", "__icon_url__"],
+    }
+
+
+def get_text_schema(min_length: int, max_length: int) -> dict:
+    return {"type": "string", "minLength": min_length, "maxLength": max_length}
+
+
+# Mix of the slides of built in templates: images, icons and plain text
+STUB_LAYOUT = {
+    "name": "general",
+    "ordered": False,
+    "slides": [
+        {
+            "id": "general:intro-slide",
+            "name": "Intro Slide",
+            "description": "Title, description and a large image",
+            "json_schema": {
+                "type": "object",
+                "properties": {
+                    "title": get_text_schema(10, 60),
+                    "description": get_text_schema(50, 200),
+                    "image": get_image_schema(30),
+                },
+                "required": ["title", "description", "image"],
+            },
+        },
+        {
+            "id": "general:bullet-icons",
+            "name": "Bullets with Icons",
+            "description": "Title and three to four bullets with an icon each",
+            "json_schema": {
+                "type": "object",
+                "properties": {
+                    "title": get_text_schema(10, 60),
+                    "bullets": {
+                        "type": "array",
+                        "minItems": 3,
+                        "maxItems": 4,
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": get_text_schema(5, 40),
+                                "description": get_text_schema(40, 120),
+                                "icon": get_icon_schema(),
+                            },
+                            "required": ["title", "description", "icon"],
+                        },
+                    },
+                },
+                "required": ["title", "bullets"],
+            },
+        },
+        {
+            "id": "general:image-and-text",
+            "name": "Image and Text",
+            "description": "Title, a paragraph and an image beside it",
+            "json_schema": {
+                "type": "object",
+                "properties": {
+                    "title": get_text_schema(10, 60),
+                    "body": get_text_schema(100, 400),
+                    "image": get_image_schema(30),
+                },
+                "required": ["title", "body", "image"],
+            },
+        },
+    ],
+}
+
+
+def get_stub_image_b64(size: int) -> str:
+    image = Image.radial_gradient("L").resize((size, size)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def get_response_content(body: dict) -> str:
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") != "json_schema":
+        return "stub " * 50
+    content = sample_from_schema(response_format["json_schema"]["schema"])
+
+    # Layouts are picked in turn, not only the first one
+    n_layouts = len(STUB_LAYOUT["slides"])
+    if isinstance(content, dict) and isinstance(content.get("slides"), list):
+        if all(isinstance(each, int) for each in content["slides"]):
+            content["slides"] = [i % n_layouts for i in range(len(content["slides"]))]
+    if isinstance(content, dict) and isinstance(content.get("index"), int):
+        prompt = body["messages"][-1]["content"]
+        slide = re.search(r"layout index for slide (\d+)", prompt)
+        content["index"] = (int(slide.group(1)) - 1) % n_layouts if slide else 0
+    return json.dumps(content)
+
+
+def get_input_tokens(body: dict) -> int:
+    return sum(len(str(each.get("content") or "")) for each in body["messages"]) // 4
+
+
+def get_pptx_model(database_path: Optional[str], presentation_id: str) -> dict:
+    """
+    Text boxes with the strings of every slide and pictures with its images,
+    like the PPTX model Next.js renders from the slides.
+    """
+    rows = []
+    if database_path and os.path.exists(database_path):
+        with sqlite3.connect(database_path) as connection:
+            rows = connection.execute(
+                'SELECT content FROM slides WHERE presentation = ? ORDER BY "index"',
+                (uuid.UUID(presentation_id).hex,),
+            ).fetchall()
+
+    slides = []
+    for (content,) in rows:
+        texts, images = [], []
+
+        def collect(value):
+            if isinstance(value, dict):
+                image_url = value.get("__image_url__")
+                if image_url and os.path.exists(image_url):
+                    images.append(image_url)
+                for key, each in value.items():
+                    if not key.startswith("__"):
+                        collect(each)
+            elif isinstance(value, list):
+                for each in value:
+                    collect(each)
+            elif isinstance(value, str):
+                texts.append(value)
+
+        collect(json.loads(content))
+        shapes = [
+            {
+                "shape_type": "textbox",
+                "position": {"left": 64, "top": 64, "width": 640, "height": 560},
+                "paragraphs": [
+                    {"text": text, "font": {"size": 16}} for text in texts[:12]
+                ],
+            }
+        ]
+        for index, image in enumerate(images):
+            shapes.append(
+                {
+                    "shape_type": "picture",
+                    "position": {
+                        "left": 736,
+                        "top": 64 + index * 300,
+                        "width": 480,
+                        "height": 280,
+                    },
+                    "border_radius": [12, 12, 12, 12],
+                    "picture": {"is_network": False, "path": image},
+                }
+            )
+        slides.append({"shapes": shapes})
+    return {"name": "stub", "slides": slides}
+
+
+def create_app(config: StubServicesConfig) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    image_b64 = get_stub_image_b64(config.image_size)
+
+    def with_jitter(seconds: float) -> float:
+        if not config.jitter:
+            return seconds
+        return seconds * rng.lognormvariate(0, config.jitter)
+
+    # ? LLM
+    @app.get("/v1/models")
+    async def list_models():
+        return {
+            "object": "list",
+            "data": [{"id": "stub-model", "object": "model", "owned_by": "stub"}],
+        }
+
+    @app.post("/v1/chat/completions")
+    async def create_chat_completion(request: Request):
+        body = await request.json()
+        content = get_response_content(body)
+        input_tokens = get_input_tokens(body)
+        output_tokens = config.llm_output_tokens or max(1, len(content) // 4)
+        latency = with_jitter(config.llm_latency)
+        generation_time = output_tokens / config.llm_tokens_per_second
+        usage = {
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency + generation_time)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+
+        def get_chunk(delta: dict, finish_reason=None, with_usage=False) -> str:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body["model"],
+                "choices": (
+                    []
+                    if with_usage
+                    else [
+                        {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                    ]
+                ),
+            }
+            if with_usage:
+                chunk["usage"] = usage
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        async def stream():
+            await asyncio.sleep(latency)
+            n_chunks = min(output_tokens, 32)
+            chunk_size = -(-len(content) // n_chunks)
+            for start in range(0, len(content), chunk_size):
+                await asyncio.sleep(generation_time / n_chunks)
+                delta = content[start : start + chunk_size]
+                yield get_chunk({"role": "assistant", "content": delta})
+            yield get_chunk({}, finish_reason="stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield get_chunk({}, with_usage=True)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    # ? Images
+    @app.post("/v1/images/generations")
+    async def create_image():
+        await asyncio.sleep(with_jitter(config.image_latency))
+        return {"created": int(time.time()), "data": [{"b64_json": image_b64}]}
+
+    # ? Next.js
+    @app.get("/api/template")
+    async def get_template():
+        return STUB_LAYOUT
+
+    @app.get("/api/presentation_to_pptx_model")
+    async def get_presentation_to_pptx_model(id: str):
+        await asyncio.sleep(config.export_latency)
+        return await asyncio.to_thread(get_pptx_model, config.database_path, id)
+
+    @app.post("/api/export-as-pdf")
+    async def export_as_pdf(request: Request):
+        body = await request.json()
+        await asyncio.sleep(config.export_latency)
+        directory = os.path.dirname(config.database_path or "/tmp/presenton/")
+        path = os.path.join(directory, f"{body['title']}.pdf")
+        with open(path, "wb") as file:
+            file.write(b"%PDF-1.4\n%%EOF\n")
+        return JSONResponse({"success": True, "path": path})
+
+    return app
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _run_server(config: StubServicesConfig, port: int):
+    uvicorn.run(create_app(config), host="127.0.0.1", port=port, log_level="error")
+
+
+class StubServicesProcess:
+    """
+    Runs the stub services in their own process, so they don't add to the
+    CPU time and memory of the generation being measured.
+    """
+
+    def __init__(self, config: StubServicesConfig, port: int = 0):
+        self.config = config
+        self.port = port or get_free_port()
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_run_server, args=(config, self.port), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "StubServicesProcess":
+        self._process.start()
+        started_at = time.monotonic()
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    return self
+            except OSError:
+                if not self._process.is_alive() or time.monotonic() - started_at > 30:
+                    raise RuntimeError("Stub services didn't start")
+                time.sleep(0.05)
+
+    def __exit__(self, *args):
+        self._process.terminate()
+        self._process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--database", help="SQLite database of the generation")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--image-latency", type=float, default=0.5)
+    args = parser.parse_args()
+    _run_server(
+        StubServicesConfig(
+            llm_latency=args.llm_latency,
+            llm_tokens_per_second=args.llm_tokens_per_second,
+            image_latency=args.image_latency,
+            database_path=args.database,
+        ),
+        args.port,
+    )
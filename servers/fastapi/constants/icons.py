@@ -0,0 +1,5 @@
+# Seconds icon searches wait for others to share an embedding batch with
+DEFAULT_ICON_SEARCH_BATCH_WINDOW = 0.005
+DEFAULT_ICON_SEARCH_MAX_BATCH_SIZE = 64
+DEFAULT_ICON_SEARCH_CACHE_MAX_ENTRIES = 4096
+DEFAULT_ICON_SEARCH_CACHE_TTL = 24 * 60 * 60
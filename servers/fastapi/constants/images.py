@@ -0,0 +1,3 @@
+# Opt-in cache of AI generated images
+DEFAULT_IMAGE_CACHE_MAX_SIZE_MB = 1024
+DEFAULT_IMAGE_CACHE_MAX_AGE = 30 * 24 * 60 * 60
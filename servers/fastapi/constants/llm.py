@@ -4,3 +4,39 @@ OPENAI_URL = "https://api.openai.com/v1"
 DEFAULT_OPENAI_MODEL = "gpt-4.1"
 DEFAULT_GOOGLE_MODEL = "models/gemini-2.5-flash"
 DEFAULT_ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
+
+# Provider client connection pool
+DEFAULT_LLM_MAX_CONNECTIONS = 100
+DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_LLM_KEEPALIVE_EXPIRY = 30.0
+
+# Structured response cache
+DEFAULT_LLM_RESPONSE_CACHE_TTL = 24 * 60 * 60
+DEFAULT_LLM_RESPONSE_CACHE_MAX_ENTRIES = 512
+DEFAULT_LLM_RESPONSE_CACHE_MAX_DISK_ENTRIES = 10000
+
+# Provider rate limits and adaptive concurrency
+DEFAULT_LLM_MAX_CONCURRENCY = 16
+DEFAULT_LLM_MIN_CONCURRENCY = 1
+DEFAULT_LLM_OUTPUT_TOKENS_ESTIMATE = 1000
+LLM_CONCURRENCY_DECREASE_FACTOR = 0.5
+LLM_CONCURRENCY_DECREASE_COOLDOWN = 5.0
+
+# Retries and hedged requests
+DEFAULT_LLM_MAX_RETRIES = 3
+DEFAULT_LLM_RETRY_BASE_DELAY = 1.0
+DEFAULT_LLM_RETRY_MAX_DELAY = 30.0
+DEFAULT_LLM_RETRY_DEADLINE = 120.0
+DEFAULT_LLM_HEDGE_PERCENTILE = 0.95
+DEFAULT_LLM_HEDGE_MIN_SAMPLES = 20
+LLM_LATENCY_WINDOW_SIZE = 200
+
+# Provider failover
+DEFAULT_LLM_CIRCUIT_BREAKER_THRESHOLD = 5
+DEFAULT_LLM_CIRCUIT_BREAKER_RESET_TIMEOUT = 30.0
+
+# Provider batch APIs
+DEFAULT_LLM_BATCH_MAX_REQUESTS = 1000
+DEFAULT_LLM_BATCH_FLUSH_INTERVAL = 30.0
+DEFAULT_LLM_BATCH_POLL_INTERVAL = 30.0
+DEFAULT_LLM_BATCH_TIMEOUT = 24 * 60 * 60
@@ -1 +1,10 @@
 DEFAULT_TEMPLATES = ["general", "modern", "standard", "swift"]
+
+# Async generation job queue
+DEFAULT_PRESENTATION_QUEUE_MAX_CONCURRENCY = 4
+DEFAULT_PRESENTATION_QUEUE_MAX_ATTEMPTS = 3
+DEFAULT_PRESENTATION_QUEUE_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_PRESENTATION_QUEUE_POLL_INTERVAL = 2.0
+
+# Generation checkpoints
+DEFAULT_PRESENTATION_CHECKPOINT_SAVE_INTERVAL = 1.0
@@ -40,3 +40,19 @@ class GeneratePresentationRequest(BaseModel):
     trigger_webhook: bool = Field(
         default=False, description="Whether to trigger subscribed webhooks"
     )
+    bypass_llm_cache: bool = Field(
+        default=False,
+        description="Whether to skip the LLM response cache and always call the LLM",
+    )
+    bypass_image_cache: bool = Field(
+        default=False,
+        description="Whether to skip the image cache and always generate new images",
+    )
+    use_batch_api: bool = Field(
+        default=False,
+        description="Whether to generate slide content through the LLM provider's batch API. Cheaper but can take hours, only used for async generation",
+    )
+    priority: int = Field(
+        default=0,
+        description="Priority in the async generation queue, higher priority tasks are generated first",
+    )
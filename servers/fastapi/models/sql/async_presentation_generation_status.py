@@ -20,3 +20,20 @@ class AsyncPresentationGenerationTaskModel(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     data: Optional[dict] = Field(sa_column=Column(JSON), default=None)
+
+    # Job queue
+    presentation_id: Optional[uuid.UUID] = Field(default=None)
+    request: Optional[dict] = Field(sa_column=Column(JSON), default=None, exclude=True)
+    priority: int = Field(default=0)
+    attempts: int = Field(default=0)
+    leased_by: Optional[str] = Field(default=None, exclude=True)
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    cancel_requested: bool = Field(default=False)
+
+    # Duration, slides, images and LLM tokens of each stage of the last attempt
+    metrics: Optional[dict] = Field(sa_column=Column(JSON), default=None)
+
+    # Results of completed stages, to resume from
+    checkpoint: Optional[dict] = Field(
+        sa_column=Column(JSON), default=None, exclude=True
+    )
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     AsyncSession,
 )
+from sqlalchemy import Connection, Table, inspect, text
 from sqlmodel import SQLModel
 
 from models.sql.async_presentation_generation_status import (
@@ -49,6 +50,29 @@ async def get_container_db_async_session() -> AsyncGenerator[AsyncSession, None]
         yield session
 
 
+def add_missing_columns(sync_conn: Connection, tables: list[Table]):
+    """
+    create_all() skips tables that already exist, so columns added to a model
+    later are added here. New columns are always nullable.
+    """
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(
+                text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.quote(column.name)} {column_type}"
+                )
+            )
+
+
 # Create Database and Tables
 async def create_db_and_tables():
     async with sql_engine.begin() as conn:
@@ -67,6 +91,11 @@ async def create_db_and_tables():
                 ],
             )
         )
+        await conn.run_sync(
+            lambda sync_conn: add_missing_columns(
+                sync_conn, [AsyncPresentationGenerationTaskModel.__table__]
+            )
+        )
 
     async with container_db_engine.begin() as conn:
         await conn.run_sync(
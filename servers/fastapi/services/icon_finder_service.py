@@ -1,56 +1,399 @@
+import argparse
 import asyncio
+from collections import OrderedDict
+import hashlib
 import json
-import chromadb
-from chromadb.config import Settings
-from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+import os
+import threading
+import time
+from typing import Any, Callable, Hashable, List, Optional
 
+import numpy as np
+
+from constants.icons import (
+    DEFAULT_ICON_SEARCH_BATCH_WINDOW,
+    DEFAULT_ICON_SEARCH_CACHE_MAX_ENTRIES,
+    DEFAULT_ICON_SEARCH_CACHE_TTL,
+    DEFAULT_ICON_SEARCH_MAX_BATCH_SIZE,
+)
+from utils.get_env import (
+    get_icon_search_batch_window_env,
+    get_icon_search_cache_max_entries_env,
+    get_icon_search_cache_ttl_env,
+    get_icon_search_max_batch_size_env,
+)
+from utils.parsers import parse_float_or_none, parse_int_or_none
+from utils.single_flight import SingleFlight
+
+ICONS_PATH = "assets/icons.json"
+ICONS_INDEX_DIRECTORY = "assets/icons_index"
+EMBEDDING_MODEL_DIRECTORY = "assets/models"
+
+
+class IconsIndex:
+    """
+    Normalized embeddings of the bold icons, one row per icon, so cosine
+    similarity to a query is a single matrix-vector product.
+    The embeddings are memory-mapped, pages are shared between workers and only
+    read from disk when searched.
+    """
+
+    def __init__(self, names: List[str], embeddings: np.ndarray):
+        self.names = names
+        self.embeddings = embeddings
+
+    def search(self, query_embeddings: np.ndarray, k: int) -> List[List[str]]:
+        """Names of the k closest icons to each query, closest first."""
+        k = min(k, len(self.names))
+        if k <= 0:
+            return [[] for _ in query_embeddings]
+        # One matrix product scores every query against every icon
+        scores = query_embeddings.astype(self.embeddings.dtype) @ self.embeddings.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return [[self.names[i] for i in row] for row in top]
+
+    def save(self, directory: str, icons_hash: str):
+        os.makedirs(directory, exist_ok=True)
+        # Written under temporary names and renamed, readers never see half a file
+        embeddings_path = os.path.join(directory, "embeddings.npy")
+        with open(f"{embeddings_path}.tmp", "wb") as file:
+            np.save(file, self.embeddings)
+        metadata_path = os.path.join(directory, "metadata.json")
+        with open(f"{metadata_path}.tmp", "w") as file:
+            json.dump({"icons_hash": icons_hash, "names": self.names}, file)
+        os.replace(f"{embeddings_path}.tmp", embeddings_path)
+        os.replace(f"{metadata_path}.tmp", metadata_path)
+
+    @classmethod
+    def load(cls, directory: str, icons_hash: str) -> Optional["IconsIndex"]:
+        """Index saved in the directory, None if missing or built from other icons."""
+        try:
+            with open(os.path.join(directory, "metadata.json"), "r") as file:
+                metadata = json.load(file)
+            if metadata["icons_hash"] != icons_hash:
+                return None
+            embeddings = np.load(
+                os.path.join(directory, "embeddings.npy"), mmap_mode="r"
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(embeddings) != len(metadata["names"]):
+            return None
+        return cls(metadata["names"], embeddings)
+
+
+class LRUCache:
+    """Thread-safe LRU of the most recently used entries, with hit counts."""
 
-class IconFinderService:
     def __init__(self):
-        self.collection_name = "icons"
-        self.client = chromadb.PersistentClient(
-            path="chroma", settings=Settings(anonymized_telemetry=False)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, ttl: Optional[float] = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (ttl is None or time.monotonic() - entry[0] <= ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, max_entries: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+def normalize_query(query: str) -> str:
+    # The MiniLM tokenizer is uncased, so the embedding doesn't change
+    return " ".join(query.lower().split())
+
+
+def get_icon_documents(icons: dict) -> tuple[List[str], List[str]]:
+    names = []
+    documents = []
+    for each in icons["icons"]:
+        if each["name"].split("-")[-1] == "bold":
+            names.append(each["name"])
+            documents.append(f"{each['name']} {each['tags']}")
+    return names, documents
+
+
+class IconSearchItem:
+    def __init__(self, query: str, k: int):
+        self.query = query
+        self.k = k
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class IconFinderService:
+    """
+    Semantic search of the bold icons with the MiniLM ONNX embedding model.
+    The icon embeddings are built once, at image build time with
+    python -m services.icon_finder_service, and both the index and the model
+    are loaded on the first search, not on import.
+    Searches made within a short window of each other, from any slide or job,
+    are embedded in one ONNX batch and ranked with one matrix product.
+    Results and query embeddings are cached, so repeated queries skip the model,
+    and a query already being searched is joined rather than searched again.
+    """
+
+    def __init__(
+        self,
+        icons_path: str = ICONS_PATH,
+        index_directory: str = ICONS_INDEX_DIRECTORY,
+        embedding_function: Optional[Callable[[List[str]], list]] = None,
+    ):
+        self.icons_path = icons_path
+        self.index_directory = index_directory
+        self._embedding_function = embedding_function
+        self._index: Optional[IconsIndex] = None
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._pending: List[IconSearchItem] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._results = LRUCache()
+        self._embeddings = LRUCache()
+        self._single_flight = SingleFlight()
+
+        self.batches = 0
+        self.queries = 0
+
+    @property
+    def batch_window(self) -> float:
+        batch_window = parse_float_or_none(get_icon_search_batch_window_env())
+        if batch_window is None:
+            return DEFAULT_ICON_SEARCH_BATCH_WINDOW
+        return batch_window
+
+    @property
+    def max_batch_size(self) -> int:
+        return (
+            parse_int_or_none(get_icon_search_max_batch_size_env())
+            or DEFAULT_ICON_SEARCH_MAX_BATCH_SIZE
+        )
+
+    @property
+    def cache_max_entries(self) -> int:
+        return (
+            parse_int_or_none(get_icon_search_cache_max_entries_env())
+            or DEFAULT_ICON_SEARCH_CACHE_MAX_ENTRIES
         )
-        print("Initializing icons collection...")
-        self._initialize_icons_collection()
-        print("Icons collection initialized.")
-
-    def _initialize_icons_collection(self):
-        self.embedding_function = ONNXMiniLM_L6_V2()
-        self.embedding_function.DOWNLOAD_PATH = "chroma/models"
-        self.embedding_function._download_model_if_not_exists()
+
+    @property
+    def cache_ttl(self) -> float:
+        return (
+            parse_float_or_none(get_icon_search_cache_ttl_env())
+            or DEFAULT_ICON_SEARCH_CACHE_TTL
+        )
+
+    @property
+    def embedding_function(self) -> Callable[[List[str]], list]:
+        if self._embedding_function is not None:
+            return self._embedding_function
+        with self._model_lock:
+            if self._embedding_function is None:
+                from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+                embedding_function = ONNXMiniLM_L6_V2()
+                embedding_function.DOWNLOAD_PATH = EMBEDDING_MODEL_DIRECTORY
+                embedding_function._download_model_if_not_exists()
+                self._embedding_function = embedding_function
+        return self._embedding_function
+
+    def embed(self, documents: List[str]) -> np.ndarray:
+        embeddings = np.asarray(self.embedding_function(documents), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def get_icons_hash(self) -> str:
+        with open(self.icons_path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+    def build_index(self, dtype: str = "float32") -> IconsIndex:
+        """Embeds every bold icon and saves the index for the next start."""
+        with open(self.icons_path, "rb") as file:
+            content = file.read()
+        names, documents = get_icon_documents(json.loads(content))
+        embeddings = self.embed(documents).astype(dtype)
+        index = IconsIndex(names, embeddings)
         try:
-            self.collection = self.client.get_collection(
-                self.collection_name, embedding_function=self.embedding_function
-            )
-        except Exception:
-            with open("assets/icons.json", "r") as f:
-                icons = json.load(f)
-
-            documents = []
-            ids = []
-
-            for i, each in enumerate(icons["icons"]):
-                if each["name"].split("-")[-1] == "bold":
-                    doc_text = f"{each['name']} {each['tags']}"
-                    documents.append(doc_text)
-                    ids.append(each["name"])
-
-            if documents:
-                self.collection = self.client.create_collection(
-                    name=self.collection_name,
-                    embedding_function=self.embedding_function,
-                    metadata={"hnsw:space": "cosine"},
-                )
-                self.collection.add(documents=documents, ids=ids)
+            index.save(self.index_directory, hashlib.sha256(content).hexdigest())
+        except OSError as e:
+            print(f"Failed to save icons index to {self.index_directory}: {e}")
+        return index
+
+    def get_index(self) -> IconsIndex:
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is None:
+                index = IconsIndex.load(self.index_directory, self.get_icons_hash())
+                if index is None:
+                    print("Icons index not found, building it...")
+                    index = self.build_index()
+                    print("Icons index built.")
+                self._index = index
+        return self._index
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embeddings of the queries, only those not cached go through the model."""
+        embeddings = [self._embeddings.get(query) for query in queries]
+        missing = [query for query, each in zip(queries, embeddings) if each is None]
+        if missing:
+            new_embeddings = dict(zip(missing, self.embed(missing)))
+            for query, embedding in new_embeddings.items():
+                self._embeddings.set(query, embedding, self.cache_max_entries)
+            embeddings = [
+                each if each is not None else new_embeddings[query]
+                for query, each in zip(queries, embeddings)
+            ]
+        return np.stack(embeddings)
+
+    def warm_up(self):
+        """Loads the index and the model, so the first search doesn't wait on them."""
+        self.get_index()
+        self.embed_queries([normalize_query("icon")])
 
-    async def search_icons(self, query: str, k: int = 1):
-        result = await asyncio.to_thread(
-            self.collection.query,
-            query_texts=[query],
-            n_results=k,
+    def _search_icons(self, queries: List[str], k: int) -> List[List[str]]:
+        index = self.get_index()
+        return index.search(self.embed_queries(queries), k)
+
+    async def search_icons(self, query: str, k: int = 1) -> List[str]:
+        return (await self.search_icons_batch([query], k))[0]
+
+    async def search_icons_batch(
+        self, queries: List[str], k: int = 1
+    ) -> List[List[str]]:
+        """Icon urls of the k closest icons to each query, in the order of queries."""
+        if not queries:
+            return []
+        queries = [normalize_query(query) for query in queries]
+        results: List[Optional[List[str]]] = [
+            self._results.get((query, k), self.cache_ttl) for query in queries
+        ]
+        missing = [index for index, names in enumerate(results) if names is None]
+        # A query already being searched, by this or any other job, is joined
+        searches = await asyncio.gather(
+            *(
+                self._single_flight.run(
+                    (queries[index], k),
+                    lambda query=queries[index]: self._search_icon(query, k),
+                )
+                for index in missing
+            )
         )
-        return [f"/static/icons/bold/{each}.svg" for each in result["ids"][0]]
+        for index, names in zip(missing, searches):
+            results[index] = names
+
+        return [
+            [f"/static/icons/bold/{each}.svg" for each in names] for names in results
+        ]
+
+    async def _search_icon(self, query: str, k: int) -> List[str]:
+        item = IconSearchItem(query, k)
+        self._pending.append(item)
+        if len(self._pending) >= self.max_batch_size or self.batch_window <= 0:
+            self._flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+        try:
+            return await item.future
+        except asyncio.CancelledError:
+            # Not searched yet, so the batch doesn't embed it
+            if item in self._pending:
+                self._pending.remove(item)
+            raise
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_window)
+        self._flush_task = None
+        self._flush()
+
+    def _flush(self):
+        flush_task = self._flush_task
+        self._flush_task = None
+        if flush_task and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+
+        items = self._pending
+        self._pending = []
+        if not items:
+            return
+        batch_task = asyncio.create_task(self._run_batch(items))
+        self._batch_tasks.add(batch_task)
+        batch_task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, items: List[IconSearchItem]):
+        # Repeated queries, like the same icon on many slides, are embedded once
+        queries = list(dict.fromkeys(item.query for item in items))
+        self.batches += 1
+        self.queries += len(items)
+        try:
+            results = await asyncio.to_thread(
+                self._search_icons, queries, max(item.k for item in items)
+            )
+        except Exception as e:
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+
+        names_by_query = dict(zip(queries, results))
+        for item in items:
+            names = names_by_query[item.query][: item.k]
+            self._results.set((item.query, item.k), names, self.cache_max_entries)
+            if not item.future.done():
+                item.future.set_result(names)
+
+    def clear_cache(self):
+        self._results.clear()
+        self._embeddings.clear()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "coalesced": self._single_flight.coalesced,
+            "results_cache": self._results.stats(),
+            "embeddings_cache": self._embeddings.stats(),
+        }
 
 
 ICON_FINDER_SERVICE = IconFinderService()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Builds the icons embedding index searched by the icon finder"
+    )
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    args = parser.parse_args()
+    index = ICON_FINDER_SERVICE.build_index(args.dtype)
+    print(
+        f"Indexed {len(index.names)} icons to {ICON_FINDER_SERVICE.index_directory}"
+    )
@@ -0,0 +1,173 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Optional
+import uuid
+
+from constants.images import (
+    DEFAULT_IMAGE_CACHE_MAX_AGE,
+    DEFAULT_IMAGE_CACHE_MAX_SIZE_MB,
+)
+from utils.get_env import (
+    get_app_data_directory_env,
+    get_image_cache_env,
+    get_image_cache_max_age_env,
+    get_image_cache_max_size_mb_env,
+)
+from utils.parsers import parse_bool_or_none, parse_float_or_none
+
+
+def link_or_copy_file(source: str, destination: str):
+    """Hard links source to destination, or copies it where links aren't possible."""
+    try:
+        os.link(source, destination)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # Other filesystem, or no hard links
+        shutil.copyfile(source, destination)
+
+
+class ImageGenerationCache:
+    """
+    Opt-in cache of AI generated images, so an identical prompt for the same
+    provider, model and quality isn't paid for again.
+    Images are files named by a hash of everything that determines them, in
+    image_cache inside the app data directory. Every hit gets its own copy, a
+    hard link where possible, so deleting an asset doesn't touch the cache.
+    Images not used for the max age, or the least recently used ones once the
+    cache is over its max size, are deleted.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_enabled(self) -> bool:
+        return parse_bool_or_none(get_image_cache_env()) or False
+
+    @property
+    def max_age(self) -> float:
+        return (
+            parse_float_or_none(get_image_cache_max_age_env())
+            or DEFAULT_IMAGE_CACHE_MAX_AGE
+        )
+
+    @property
+    def max_size(self) -> int:
+        max_size_mb = (
+            parse_float_or_none(get_image_cache_max_size_mb_env())
+            or DEFAULT_IMAGE_CACHE_MAX_SIZE_MB
+        )
+        return int(max_size_mb * 2**20)
+
+    @property
+    def directory(self) -> str:
+        if self._directory:
+            return self._directory
+        return os.path.join(
+            get_app_data_directory_env() or "/tmp/presenton", "image_cache"
+        )
+
+    def get_key(self, provider: str, model: str, quality: str, prompt: str) -> str:
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "quality": quality,
+                "prompt": prompt,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, output_directory: str) -> Optional[str]:
+        """Copy of the cached image in the output directory, if there is one."""
+        cached_path = self._find(key)
+        try:
+            if cached_path and time.time() - os.path.getmtime(cached_path) <= (
+                self.max_age
+            ):
+                extension = os.path.splitext(cached_path)[1]
+                image_path = os.path.join(
+                    output_directory, f"{uuid.uuid4()}{extension}"
+                )
+                link_or_copy_file(cached_path, image_path)
+                # Modification time marks the last use, for eviction
+                os.utime(cached_path)
+                self.hits += 1
+                return image_path
+        except FileNotFoundError:
+            # Evicted in the meantime
+            pass
+        self.misses += 1
+        return None
+
+    def set(self, key: str, image_path: str):
+        os.makedirs(self.directory, exist_ok=True)
+        extension = os.path.splitext(image_path)[1]
+        cached_path = os.path.join(self.directory, f"{key}{extension}")
+        # Written under a temporary name, readers never see half an image
+        temporary_path = f"{cached_path}.{uuid.uuid4().hex}.tmp"
+        link_or_copy_file(image_path, temporary_path)
+        os.replace(temporary_path, cached_path)
+        self.evict()
+
+    def evict(self):
+        """Deletes expired images, then the least recently used over max size."""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.directory):
+                if not entry.is_file() or entry.name.endswith(".tmp"):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.max_age:
+                    self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size:
+                    break
+                self._remove(path)
+                total_size -= size
+
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.directory):
+                shutil.rmtree(self.directory)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.is_enabled(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def _find(self, key: str) -> Optional[str]:
+        paths = glob.glob(os.path.join(self.directory, f"{key}.*"))
+        return next((path for path in paths if not path.endswith(".tmp")), None)
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+            self.evictions += 1
+        except FileNotFoundError:
+            pass
+
+
+IMAGE_GENERATION_CACHE = ImageGenerationCache()
@@ -1,13 +1,21 @@
 import asyncio
 import base64
+import hashlib
 import json
 import os
+from typing import Optional
 import aiohttp
 from fastapi import HTTPException
 from google import genai
 from openai import NOT_GIVEN, AsyncOpenAI
 from models.image_prompt import ImagePrompt
 from models.sql.image_asset import ImageAsset
+from services.image_generation_cache import (
+    IMAGE_GENERATION_CACHE,
+    link_or_copy_file,
+)
+from services.prometheus_metrics import PROMETHEUS_METRICS
+from services.tracing import TRACING
 from utils.get_env import (
     get_dall_e_3_quality_env,
     get_gpt_image_1_5_quality_env,
@@ -25,13 +33,19 @@ from utils.image_provider import (
     is_nanobanana_pro_selected,
     is_dalle3_selected,
     is_comfyui_selected,
+    get_selected_image_provider,
 )
+from utils.single_flight import SingleFlight
 import uuid
 
 
 class ImageGenerationService:
-    def __init__(self, output_directory: str):
+    def __init__(self, output_directory: str, use_cache: bool = True):
         self.output_directory = output_directory
+        self.use_cache = use_cache
+        # Slides of a deck often share prompts, those generated at once are shared
+        self._single_flight = SingleFlight()
+        self._claimed_image_paths: set[str] = set()
         self.is_image_generation_disabled = is_image_generation_disabled()
         self.image_gen_func = self.get_image_gen_func()
 
@@ -58,6 +72,47 @@ class ImageGenerationService:
     def is_stock_provider_selected(self):
         return is_pixels_selected() or is_pixabay_selected()
 
+    def get_image_cache_key(self, image_prompt: str) -> Optional[str]:
+        """
+        Key of the image in the image cache, None if it isn't cached.
+        Stock providers only return urls, so there is nothing to cache.
+        """
+        if not (self.use_cache and IMAGE_GENERATION_CACHE.is_enabled()):
+            return None
+        if is_dalle3_selected():
+            model, quality = "dall-e-3", get_dall_e_3_quality_env() or "standard"
+        elif is_gpt_image_1_5_selected():
+            model = "gpt-image-1.5"
+            quality = get_gpt_image_1_5_quality_env() or "medium"
+        elif is_gemini_flash_selected():
+            model, quality = "gemini-2.5-flash-image-preview", ""
+        elif is_nanobanana_pro_selected():
+            model, quality = "gemini-3-pro-image-preview", ""
+        elif is_comfyui_selected():
+            # The workflow decides the model and everything else
+            workflow = f"{get_comfyui_url_env()} {get_comfyui_workflow_env()}"
+            model, quality = hashlib.sha256(workflow.encode("utf-8")).hexdigest(), ""
+        else:
+            return None
+        return IMAGE_GENERATION_CACHE.get_key(
+            get_selected_image_provider().value, model, quality, image_prompt
+        )
+
+    async def get_cached_image(self, cache_key: str) -> Optional[str]:
+        try:
+            return await asyncio.to_thread(
+                IMAGE_GENERATION_CACHE.get, cache_key, self.output_directory
+            )
+        except OSError as e:
+            print(f"Error reading image cache: {e}")
+            return None
+
+    async def cache_image(self, cache_key: str, image_path: str):
+        try:
+            await asyncio.to_thread(IMAGE_GENERATION_CACHE.set, cache_key, image_path)
+        except OSError as e:
+            print(f"Error writing image cache: {e}")
+
     async def generate_image(self, prompt: ImagePrompt) -> str | ImageAsset:
         """
         Generates an image based on the provided prompt.
@@ -65,6 +120,10 @@ class ImageGenerationService:
         - If the stock provider is selected, it uses the prompt directly,
         otherwise it uses the full image prompt with theme.
         - Output Directory is used for saving the generated image not the stock provider.
+        - With the image cache enabled, an image generated before for the same
+        prompt, provider, model and quality is reused.
+        - A prompt that this service is already generating isn't generated again,
+        every caller gets its own asset with a copy of the image.
         """
         if self.is_image_generation_disabled:
             print("Image generation is disabled. Using placeholder image.")
@@ -77,32 +136,75 @@ class ImageGenerationService:
         image_prompt = prompt.get_image_prompt(
             with_theme=not self.is_stock_provider_selected()
         )
+        image_path = await self._single_flight.run(
+            image_prompt, lambda: self._get_image_path(image_prompt)
+        )
+        if not image_path:
+            return "/static/images/placeholder.jpg"
+        if image_path.startswith("http"):
+            return image_path
+
+        try:
+            return ImageAsset(
+                path=await self._claim_image_path(image_path),
+                is_uploaded=False,
+                extras={
+                    "prompt": prompt.prompt,
+                    "theme_prompt": prompt.theme_prompt,
+                },
+            )
+        except OSError as e:
+            print(f"Error copying image: {e}")
+            return "/static/images/placeholder.jpg"
+
+    async def _get_image_path(self, image_prompt: str) -> Optional[str]:
+        """Url or path of the image for the prompt, None if it couldn't be made."""
         print(f"Request - Generating Image for {image_prompt}")
 
         try:
-            if self.is_stock_provider_selected():
-                image_path = await self.image_gen_func(image_prompt)
-            else:
-                image_path = await self.image_gen_func(
-                    image_prompt, self.output_directory
-                )
-            if image_path:
-                if image_path.startswith("http"):
-                    return image_path
-                elif os.path.exists(image_path):
-                    return ImageAsset(
-                        path=image_path,
-                        is_uploaded=False,
-                        extras={
-                            "prompt": prompt.prompt,
-                            "theme_prompt": prompt.theme_prompt,
-                        },
-                    )
+            image_path = None
+            cache_key = self.get_image_cache_key(image_prompt)
+            if cache_key:
+                image_path = await self.get_cached_image(cache_key)
+                if image_path:
+                    print(f"Using cached image for {image_prompt}")
+
+            if not image_path:
+                image_path = await self._generate_image(image_prompt)
+                if cache_key and image_path and os.path.exists(image_path):
+                    await self.cache_image(cache_key, image_path)
+
+            if image_path and (
+                image_path.startswith("http") or os.path.exists(image_path)
+            ):
+                return image_path
             raise Exception(f"Image not found at {image_path}")
 
         except Exception as e:
             print(f"Error generating image: {e}")
-            return "/static/images/placeholder.jpg"
+            return None
+
+    async def _claim_image_path(self, image_path: str) -> str:
+        """
+        Every asset gets its own file. The first caller of a shared generation
+        keeps the image, the others get a copy of it.
+        """
+        if image_path not in self._claimed_image_paths:
+            self._claimed_image_paths.add(image_path)
+            return image_path
+        extension = os.path.splitext(image_path)[1]
+        copy_path = os.path.join(self.output_directory, f"{uuid.uuid4()}{extension}")
+        await asyncio.to_thread(link_or_copy_file, image_path, copy_path)
+        return copy_path
+
+    async def _generate_image(self, image_prompt: str) -> str:
+        image_provider = get_selected_image_provider().value
+        with PROMETHEUS_METRICS.time_image_generation(image_provider), TRACING.span(
+            "image.generate", kind="client", **{"image.provider": image_provider}
+        ):
+            if self.is_stock_provider_selected():
+                return await self.image_gen_func(image_prompt)
+            return await self.image_gen_func(image_prompt, self.output_directory)
 
     async def generate_image_openai(
         self, prompt: str, output_directory: str, model: str, quality: str
@@ -249,9 +351,13 @@ class ImageGenerationService:
             )
 
             # Step 2: Wait for completion
-            status_data = await self._wait_for_comfyui_completion(
-                session, comfyui_url, prompt_id
-            )
+            try:
+                status_data = await self._wait_for_comfyui_completion(
+                    session, comfyui_url, prompt_id
+                )
+            except asyncio.CancelledError:
+                await self._cancel_comfyui_workflow(session, comfyui_url, prompt_id)
+                raise
 
             # Step 3: Download the generated image
             image_path = await self._download_comfyui_image(
@@ -309,6 +415,33 @@ class ImageGenerationService:
         print(f"ComfyUI workflow submitted. Prompt ID: {prompt_id}")
         return prompt_id
 
+    async def _cancel_comfyui_workflow(
+        self, session: aiohttp.ClientSession, comfyui_url: str, prompt_id: str
+    ):
+        """Remove a workflow from the ComfyUI queue, interrupting it if it is running."""
+        try:
+            await session.post(
+                f"{comfyui_url}/queue",
+                json={"delete": [prompt_id]},
+                timeout=aiohttp.ClientTimeout(total=5),
+            )
+
+            response = await session.get(
+                f"{comfyui_url}/queue", timeout=aiohttp.ClientTimeout(total=5)
+            )
+            queue = await response.json()
+            # Entries are [number, prompt_id, prompt, extra_data, outputs]
+            if any(
+                len(each) > 1 and each[1] == prompt_id
+                for each in queue.get("queue_running", [])
+            ):
+                await session.post(
+                    f"{comfyui_url}/interrupt", timeout=aiohttp.ClientTimeout(total=5)
+                )
+            print(f"ComfyUI workflow cancelled. Prompt ID: {prompt_id}")
+        except Exception as e:
+            print(f"Failed to cancel ComfyUI workflow {prompt_id}: {e}")
+
     async def _wait_for_comfyui_completion(
         self,
         session: aiohttp.ClientSession,
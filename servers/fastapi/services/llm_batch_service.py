@@ -0,0 +1,504 @@
+import asyncio
+from collections import OrderedDict
+import functools
+import json
+import time
+from typing import Callable, List, Optional, Tuple
+import uuid
+
+import dirtyjson
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+from openai.types import CompletionUsage
+
+from constants.llm import (
+    DEFAULT_LLM_BATCH_FLUSH_INTERVAL,
+    DEFAULT_LLM_BATCH_MAX_REQUESTS,
+    DEFAULT_LLM_BATCH_POLL_INTERVAL,
+    DEFAULT_LLM_BATCH_TIMEOUT,
+)
+from enums.llm_provider import LLMProvider
+from models.llm_message import LLMMessage
+from services.llm_client import LLMClient
+from utils.get_env import (
+    get_llm_batch_flush_interval_env,
+    get_llm_batch_max_requests_env,
+    get_llm_batch_poll_interval_env,
+    get_llm_batch_timeout_env,
+)
+from utils.llm_provider import get_llm_provider
+from utils.parsers import parse_float_or_none, parse_int_or_none
+
+
+OPENAI_BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Batches whose results are kept in memory for the jobs that resume on them
+BATCH_RESULTS_CACHE_SIZE = 16
+
+# Content of a request and a function recording its token usage
+LLMBatchResult = Tuple[dict, Callable[[], None]]
+
+
+def copy_result(content: dict) -> dict:
+    # Jobs resumed on the same batch each get their own copy of a result
+    return json.loads(json.dumps(content))
+
+
+class LLMBatchError(Exception):
+    pass
+
+
+class LLMBatchItem:
+    def __init__(
+        self,
+        messages: List[LLMMessage],
+        response_format: dict,
+        max_tokens: Optional[int],
+    ):
+        self.custom_id = uuid.uuid4().hex
+        self.messages = messages
+        self.response_format = response_format
+        self.max_tokens = max_tokens
+        # Resolves to the id of the provider batch once it is created
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class LLMBatchService:
+    """
+    Collects structured requests from many presentation jobs and sends them
+    through OpenAI Batch or Anthropic Message Batches, which are cheaper and
+    don't count against real-time rate limits.
+    Submitting a request returns a batch request, a plain dict with the batch
+    id and custom id, which jobs save in their checkpoint. Jobs don't wait
+    for the batch, they are resumed once it is done and read their results,
+    falling back to a real-time call for requests that failed in the batch.
+    """
+
+    def __init__(self):
+        self._pending: dict[tuple[LLMProvider, str], List[LLMBatchItem]] = {}
+        self._flush_tasks: dict[tuple[LLMProvider, str], asyncio.Task] = {}
+        self._submit_tasks: set[asyncio.Task] = set()
+        self._checked_at: dict[str, float] = {}
+        self._done_batches: set[str] = set()
+        self._results: OrderedDict[str, asyncio.Task] = OrderedDict()
+
+        self.batches_submitted = 0
+        self.requests_submitted = 0
+        self.fallbacks = 0
+
+    @property
+    def max_requests(self) -> int:
+        return (
+            parse_int_or_none(get_llm_batch_max_requests_env())
+            or DEFAULT_LLM_BATCH_MAX_REQUESTS
+        )
+
+    @property
+    def flush_interval(self) -> float:
+        return (
+            parse_float_or_none(get_llm_batch_flush_interval_env())
+            or DEFAULT_LLM_BATCH_FLUSH_INTERVAL
+        )
+
+    @property
+    def poll_interval(self) -> float:
+        return (
+            parse_float_or_none(get_llm_batch_poll_interval_env())
+            or DEFAULT_LLM_BATCH_POLL_INTERVAL
+        )
+
+    @property
+    def timeout(self) -> float:
+        return (
+            parse_float_or_none(get_llm_batch_timeout_env())
+            or DEFAULT_LLM_BATCH_TIMEOUT
+        )
+
+    def is_supported(self, llm_provider: LLMProvider) -> bool:
+        return llm_provider in (LLMProvider.OPENAI, LLMProvider.ANTHROPIC)
+
+    async def submit(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+        max_tokens: Optional[int] = None,
+    ) -> dict:
+        """
+        Adds a request to the next batch and returns its batch request once
+        the batch is created.
+        Raises LLMBatchError if the provider has no batch API or the batch
+        could not be created.
+        """
+        llm_provider = get_llm_provider()
+        if not self.is_supported(llm_provider):
+            raise LLMBatchError(f"{llm_provider.value} has no batch API")
+
+        item = LLMBatchItem(messages, response_format, max_tokens)
+        key = (llm_provider, model)
+        pending = self._pending.setdefault(key, [])
+        pending.append(item)
+        if len(pending) >= self.max_requests:
+            self._flush(key)
+        elif key not in self._flush_tasks:
+            self._flush_tasks[key] = asyncio.create_task(self._flush_later(key))
+
+        try:
+            batch_id = await item.future
+        except asyncio.CancelledError:
+            # Not submitted yet, so the batch doesn't pay for it
+            if item in self._pending.get(key, []):
+                self._pending[key].remove(item)
+            raise
+
+        return {
+            "provider": llm_provider.value,
+            "model": model,
+            "batch_id": batch_id,
+            "custom_id": item.custom_id,
+            "submitted_at": time.time(),
+        }
+
+    async def is_batch_done(self, batch_request: dict) -> bool:
+        """
+        Whether the batch of a request has ended, checking with the provider at
+        most once per poll interval. A batch that runs past the timeout is
+        cancelled and counts as done, its requests fall back to real-time calls.
+        """
+        batch_id = batch_request["batch_id"]
+        if batch_id in self._done_batches:
+            return True
+        if time.time() - batch_request["submitted_at"] >= self.timeout:
+            print(f"Batch {batch_id} did not finish in time")
+            await self.cancel_batch(batch_request)
+            self._done_batches.add(batch_id)
+            return True
+
+        now = time.monotonic()
+        checked_at = self._checked_at.get(batch_id)
+        if checked_at is not None and now - checked_at < self.poll_interval:
+            return False
+        self._checked_at[batch_id] = now
+
+        llm_provider = LLMProvider(batch_request["provider"])
+        try:
+            client = LLMClient(llm_provider)
+            if llm_provider == LLMProvider.OPENAI:
+                openai_client: AsyncOpenAI = client._client
+                batch = await openai_client.batches.retrieve(batch_id)
+                done = batch.status in OPENAI_BATCH_FINAL_STATUSES
+            else:
+                anthropic_client: AsyncAnthropic = client._client
+                batch = await anthropic_client.messages.batches.retrieve(batch_id)
+                done = batch.processing_status == "ended"
+        except Exception as e:
+            print(f"Error checking batch {batch_id}: {e}")
+            return False
+
+        if done:
+            self._checked_at.pop(batch_id, None)
+            self._done_batches.add(batch_id)
+        return done
+
+    async def cancel_batch(self, batch_request: dict):
+        batch_id = batch_request["batch_id"]
+        llm_provider = LLMProvider(batch_request["provider"])
+        print(f"Cancelling batch {batch_id}")
+        try:
+            client = LLMClient(llm_provider)
+            if llm_provider == LLMProvider.OPENAI:
+                await client._client.batches.cancel(batch_id)
+            else:
+                await client._client.messages.batches.cancel(batch_id)
+        except Exception as e:
+            print(f"Error cancelling batch {batch_id}: {e}")
+
+    async def get_result(
+        self,
+        batch_request: dict,
+        messages: List[LLMMessage],
+        response_format: dict,
+        max_tokens: Optional[int] = None,
+    ) -> dict:
+        """
+        Result of a request submitted in an ended batch, or of a real-time call
+        if it failed in the batch or the batch has no result for it.
+        """
+        try:
+            results = await self._get_batch_results(batch_request)
+            result = results.get(batch_request["custom_id"]) or LLMBatchError(
+                "No result returned for request"
+            )
+            if isinstance(result, Exception):
+                raise result
+        except LLMBatchError as e:
+            print(f"Batch request failed ({e}), falling back to real-time call")
+            self.fallbacks += 1
+            return await self._generate_realtime(
+                batch_request["model"], messages, response_format, max_tokens
+            )
+
+        content, record_usage = result
+        # Usage is recorded in the context of the job reading the result
+        record_usage()
+        return copy_result(content)
+
+    async def _generate_realtime(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+        max_tokens: Optional[int],
+    ) -> dict:
+        return await LLMClient().generate_structured(
+            model=model,
+            messages=messages,
+            response_format=response_format,
+            strict=False,
+            max_tokens=max_tokens,
+        )
+
+    async def _flush_later(self, key: tuple[LLMProvider, str]):
+        await asyncio.sleep(self.flush_interval)
+        self._flush_tasks.pop(key, None)
+        self._flush(key)
+
+    def _flush(self, key: tuple[LLMProvider, str]):
+        flush_task = self._flush_tasks.pop(key, None)
+        if flush_task and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+
+        items = self._pending.pop(key, [])
+        if not items:
+            return
+        submit_task = asyncio.create_task(self._submit_batch(*key, items))
+        self._submit_tasks.add(submit_task)
+        submit_task.add_done_callback(self._submit_tasks.discard)
+
+    async def _submit_batch(
+        self, llm_provider: LLMProvider, model: str, items: List[LLMBatchItem]
+    ):
+        print(f"Submitting batch of {len(items)} {llm_provider.value} requests")
+        try:
+            client = LLMClient(llm_provider)
+            if llm_provider == LLMProvider.OPENAI:
+                batch_id = await self._submit_openai_batch(client, model, items)
+            else:
+                batch_id = await self._submit_anthropic_batch(client, model, items)
+        except Exception as e:
+            print(f"Batch submission failed: {e}")
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(LLMBatchError(str(e)))
+            return
+
+        self.batches_submitted += 1
+        self.requests_submitted += len(items)
+        for item in items:
+            if not item.future.done():
+                item.future.set_result(batch_id)
+
+    async def _get_batch_results(
+        self, batch_request: dict
+    ) -> dict[str, LLMBatchResult | Exception]:
+        # Jobs resumed on the same batch share one download of its results
+        batch_id = batch_request["batch_id"]
+        results = self._results.get(batch_id)
+        if results is None:
+            results = asyncio.create_task(self._download_results(batch_request))
+            self._results[batch_id] = results
+            while len(self._results) > BATCH_RESULTS_CACHE_SIZE:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(batch_id)
+
+        try:
+            return await asyncio.shield(results)
+        except Exception as e:
+            # Failed downloads are tried again by the next job
+            if self._results.get(batch_id) is results:
+                self._results.pop(batch_id)
+            if isinstance(e, LLMBatchError):
+                raise
+            raise LLMBatchError(str(e)) from e
+
+    async def _download_results(
+        self, batch_request: dict
+    ) -> dict[str, LLMBatchResult | Exception]:
+        llm_provider = LLMProvider(batch_request["provider"])
+        client = LLMClient(llm_provider)
+        if llm_provider == LLMProvider.OPENAI:
+            return await self._download_openai_results(
+                client, batch_request["model"], batch_request["batch_id"]
+            )
+        return await self._download_anthropic_results(
+            client, batch_request["model"], batch_request["batch_id"]
+        )
+
+    # ? OpenAI Batch
+    async def _submit_openai_batch(
+        self, client: LLMClient, model: str, items: List[LLMBatchItem]
+    ) -> str:
+        openai_client: AsyncOpenAI = client._client
+
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": item.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": model,
+                        "messages": [message.model_dump() for message in item.messages],
+                        "response_format": {
+                            "type": "json_schema",
+                            "json_schema": {
+                                "name": "ResponseSchema",
+                                "strict": False,
+                                "schema": item.response_format,
+                            },
+                        },
+                        "max_completion_tokens": item.max_tokens,
+                        **client._get_openai_prompt_cache_kwargs(item.messages),
+                    },
+                }
+            )
+            for item in items
+        ]
+        input_file = await openai_client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await openai_client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def _download_openai_results(
+        self, client: LLMClient, model: str, batch_id: str
+    ) -> dict[str, LLMBatchResult | Exception]:
+        openai_client: AsyncOpenAI = client._client
+        batch = await openai_client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            raise LLMBatchError(f"Batch {batch.id} {batch.status}")
+
+        results: dict[str, LLMBatchResult | Exception] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await openai_client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                body = response.get("body") or {}
+                try:
+                    if response.get("status_code") != 200 or not body.get("choices"):
+                        raise LLMBatchError(
+                            str(entry.get("error") or body.get("error") or "No choices")
+                        )
+                    usage = body.get("usage")
+                    results[entry["custom_id"]] = (
+                        dict(
+                            dirtyjson.loads(body["choices"][0]["message"]["content"])
+                        ),
+                        functools.partial(
+                            client._record_openai_usage,
+                            model,
+                            CompletionUsage.model_validate(usage),
+                        )
+                        if usage
+                        else lambda: None,
+                    )
+                except Exception as e:
+                    results[entry["custom_id"]] = (
+                        e if isinstance(e, LLMBatchError) else LLMBatchError(str(e))
+                    )
+        return results
+
+    # ? Anthropic Message Batches
+    async def _submit_anthropic_batch(
+        self, client: LLMClient, model: str, items: List[LLMBatchItem]
+    ) -> str:
+        anthropic_client: AsyncAnthropic = client._client
+
+        batch = await anthropic_client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": item.custom_id,
+                    "params": {
+                        "model": model,
+                        "system": client._get_anthropic_system_prompt(item.messages),
+                        "messages": [
+                            message.model_dump()
+                            for message in client._get_anthropic_messages(
+                                item.messages
+                            )
+                        ],
+                        "max_tokens": item.max_tokens or 4000,
+                        "tools": [
+                            {
+                                "name": "ResponseSchema",
+                                "description": "A response to the user's message",
+                                "input_schema": item.response_format,
+                            }
+                        ],
+                        "tool_choice": {"type": "tool", "name": "ResponseSchema"},
+                    },
+                }
+                for item in items
+            ]
+        )
+        return batch.id
+
+    async def _download_anthropic_results(
+        self, client: LLMClient, model: str, batch_id: str
+    ) -> dict[str, LLMBatchResult | Exception]:
+        anthropic_client: AsyncAnthropic = client._client
+        batch = await anthropic_client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            raise LLMBatchError(f"Batch {batch.id} {batch.processing_status}")
+
+        results: dict[str, LLMBatchResult | Exception] = {}
+        async for entry in await anthropic_client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                results[entry.custom_id] = LLMBatchError(
+                    f"Request {entry.result.type}"
+                )
+                continue
+
+            message = entry.result.message
+            content = next(
+                (
+                    content.input
+                    for content in message.content
+                    if content.type == "tool_use" and content.name == "ResponseSchema"
+                ),
+                None,
+            )
+            results[entry.custom_id] = (
+                (
+                    content,
+                    functools.partial(
+                        client._record_anthropic_usage, model, message.usage
+                    ),
+                )
+                if content is not None
+                else LLMBatchError("No structured response")
+            )
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "pending": sum(len(items) for items in self._pending.values()),
+            "submitting_batches": len(self._submit_tasks),
+            "batches_submitted": self.batches_submitted,
+            "requests_submitted": self.requests_submitted,
+            "fallbacks": self.fallbacks,
+        }
+
+
+LLM_BATCH_SERVICE = LLMBatchService()
@@ -0,0 +1,111 @@
+import time
+
+from constants.llm import (
+    DEFAULT_LLM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    DEFAULT_LLM_CIRCUIT_BREAKER_THRESHOLD,
+)
+from enums.llm_provider import LLMProvider
+from utils.get_env import (
+    get_llm_circuit_breaker_reset_timeout_env,
+    get_llm_circuit_breaker_threshold_env,
+)
+from utils.parsers import parse_float_or_none, parse_int_or_none
+
+
+class CircuitBreaker:
+    """
+    Opens after threshold consecutive failures and rejects calls until
+    reset_timeout has passed. Then one probe call is let through per
+    reset_timeout until a call succeeds and the circuit closes again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+
+        self.failures = 0
+        self.successes = 0
+        self.rejections = 0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._opened_at = time.monotonic()
+            return True
+        self.rejections += 1
+        return False
+
+    def record_success(self):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.consecutive_failures >= self.threshold
+        ):
+            if self.state != self.OPEN:
+                print(f"Circuit opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failures": self.failures,
+            "successes": self.successes,
+            "rejections": self.rejections,
+        }
+
+
+class LLMCircuitBreaker:
+    """Health of each LLM provider, used to skip unhealthy ones on failover."""
+
+    def __init__(self):
+        self._breakers: dict[LLMProvider, CircuitBreaker] = {}
+
+    def get_breaker(self, llm_provider: LLMProvider) -> CircuitBreaker:
+        breaker = self._breakers.get(llm_provider)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                parse_int_or_none(get_llm_circuit_breaker_threshold_env())
+                or DEFAULT_LLM_CIRCUIT_BREAKER_THRESHOLD,
+                parse_float_or_none(get_llm_circuit_breaker_reset_timeout_env())
+                or DEFAULT_LLM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+            )
+            self._breakers[llm_provider] = breaker
+        return breaker
+
+    def allow_request(self, llm_provider: LLMProvider) -> bool:
+        return self.get_breaker(llm_provider).allow_request()
+
+    def record_success(self, llm_provider: LLMProvider):
+        self.get_breaker(llm_provider).record_success()
+
+    def record_failure(self, llm_provider: LLMProvider):
+        self.get_breaker(llm_provider).record_failure()
+
+    def reset(self):
+        self._breakers.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            llm_provider.value: breaker.snapshot()
+            for llm_provider, breaker in self._breakers.items()
+        }
+
+
+LLM_CIRCUIT_BREAKER = LLMCircuitBreaker()
@@ -1,9 +1,22 @@
 import asyncio
 import dirtyjson
+import hashlib
 import json
-from typing import AsyncGenerator, List, Optional
+import threading
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+)
 from fastapi import HTTPException
+import httpx
 from openai import AsyncOpenAI
+from openai import DefaultAsyncHttpxClient as OpenAIDefaultAsyncHttpxClient
 from openai.types.chat.chat_completion_chunk import (
     ChatCompletionChunk as OpenAIChatCompletionChunk,
 )
@@ -18,8 +31,14 @@ from google.genai.types import (
 )
 from google.genai.types import Tool as GoogleTool
 from anthropic import AsyncAnthropic
+from anthropic import DefaultAsyncHttpxClient as AnthropicDefaultAsyncHttpxClient
 from anthropic.types import Message as AnthropicMessage
 from anthropic import MessageStreamEvent as AnthropicMessageStreamEvent
+from constants.llm import (
+    DEFAULT_LLM_KEEPALIVE_EXPIRY,
+    DEFAULT_LLM_MAX_CONNECTIONS,
+    DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS,
+)
 from enums.llm_provider import LLMProvider
 from models.llm_message import (
     AnthropicAssistantMessage,
@@ -39,22 +58,45 @@ from models.llm_tool_call import (
     OpenAIToolCallFunction,
 )
 from models.llm_tools import LLMDynamicTool, LLMTool
+from services.llm_rate_limiter import LLM_RATE_LIMITER, estimate_llm_tokens
+from services.llm_circuit_breaker import LLM_CIRCUIT_BREAKER
+from services.llm_response_cache import LLM_RESPONSE_CACHE
+from services.llm_usage_tracker import LLM_USAGE_TRACKER, LLMUsage
+from services.presentation_generation_metrics import count_in_generation_stage
+from services.prometheus_metrics import PROMETHEUS_METRICS
+from services.tracing import TRACING
+from services.llm_retry_policy import (
+    LLM_LATENCY_TRACKER,
+    LLMRetryPolicy,
+    get_hedge_delay,
+    is_hedging_enabled,
+    run_hedged,
+)
 from services.llm_tool_calls_handler import LLMToolCallsHandler
 from utils.async_iterator import iterator_to_async
 from utils.dummy_functions import do_nothing_async
 from utils.get_env import (
+    get_llm_prompt_caching_env,
     get_anthropic_api_key_env,
     get_custom_llm_api_key_env,
     get_custom_llm_url_env,
     get_disable_thinking_env,
     get_google_api_key_env,
+    get_llm_keepalive_expiry_env,
+    get_llm_max_connections_env,
+    get_llm_max_keepalive_connections_env,
     get_ollama_url_env,
     get_openai_api_key_env,
     get_tool_calls_env,
     get_web_grounding_env,
 )
-from utils.llm_provider import get_llm_provider, get_model
-from utils.parsers import parse_bool_or_none
+from utils.llm_client_error_handler import is_llm_retryable_error
+from utils.llm_provider import (
+    get_fallback_llm_providers,
+    get_llm_provider,
+    get_model_for_provider,
+)
+from utils.parsers import parse_bool_or_none, parse_float_or_none, parse_int_or_none
 from utils.schema_utils import (
     ensure_strict_json_schema,
     flatten_json_schema,
@@ -62,10 +104,88 @@ from utils.schema_utils import (
 )
 
 
-class LLMClient:
+def get_llm_connection_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=parse_int_or_none(get_llm_max_connections_env())
+        or DEFAULT_LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=parse_int_or_none(
+            get_llm_max_keepalive_connections_env()
+        )
+        or DEFAULT_LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=parse_float_or_none(get_llm_keepalive_expiry_env())
+        or DEFAULT_LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_llm_client_fingerprint(llm_provider: LLMProvider) -> tuple:
+    """
+    Settings a provider SDK client is built from.
+    A pooled client is only reused while its fingerprint matches.
+    """
+    match llm_provider:
+        case LLMProvider.OPENAI:
+            return (get_openai_api_key_env(),)
+        case LLMProvider.GOOGLE:
+            return (get_google_api_key_env(),)
+        case LLMProvider.ANTHROPIC:
+            return (get_anthropic_api_key_env(),)
+        case LLMProvider.OLLAMA:
+            return (get_ollama_url_env(),)
+        case LLMProvider.CUSTOM:
+            return (get_custom_llm_url_env(), get_custom_llm_api_key_env())
+    return ()
+
+
+class LLMClientRegistry:
+    """
+    Process-wide pool of provider SDK clients.
+    Every LLMClient shares one SDK client (and its keep-alive connection pool)
+    per provider instead of opening fresh connections for each call.
+    """
+
     def __init__(self):
-        self.llm_provider = get_llm_provider()
-        self._client = self._get_client()
+        self._clients: dict[LLMProvider, tuple[tuple, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, llm_provider: LLMProvider, factory: Callable[[], Any]):
+        fingerprint = get_llm_client_fingerprint(llm_provider)
+        with self._lock:
+            cached = self._clients.get(llm_provider)
+            if cached and cached[0] == fingerprint:
+                return cached[1]
+
+            client = factory()
+            self._clients[llm_provider] = (fingerprint, client)
+            return client
+
+    def invalidate(self, llm_provider: Optional[LLMProvider] = None):
+        # In-flight calls keep their reference to the old client,
+        # so dropped clients are left to be closed on garbage collection.
+        with self._lock:
+            if llm_provider is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(llm_provider, None)
+
+    def invalidate_stale(self):
+        """Drops pooled clients whose keys or urls changed since creation."""
+        with self._lock:
+            for llm_provider, (fingerprint, _) in list(self._clients.items()):
+                if fingerprint != get_llm_client_fingerprint(llm_provider):
+                    self._clients.pop(llm_provider, None)
+
+
+LLM_CLIENT_REGISTRY = LLMClientRegistry()
+
+
+class LLMClient:
+    def __init__(self, llm_provider: Optional[LLMProvider] = None):
+        # Fails over to LLM_FALLBACK_PROVIDERS only when using the selected provider
+        self.use_failover = llm_provider is None
+        self.llm_provider = llm_provider or get_llm_provider()
+        self._client = LLM_CLIENT_REGISTRY.get_client(
+            self.llm_provider, self._get_client
+        )
         self.tool_calls_handler = LLMToolCallsHandler(self)
 
     # ? Use tool calls
@@ -112,7 +232,12 @@ class LLMClient:
                 status_code=400,
                 detail="OpenAI API Key is not set",
             )
-        return AsyncOpenAI()
+        return AsyncOpenAI(
+            max_retries=0,
+            http_client=OpenAIDefaultAsyncHttpxClient(
+                limits=get_llm_connection_limits()
+            ),
+        )
 
     def _get_google_client(self):
         if not get_google_api_key_env():
@@ -128,13 +253,22 @@ class LLMClient:
                 status_code=400,
                 detail="Anthropic API Key is not set",
             )
-        return AsyncAnthropic()
+        return AsyncAnthropic(
+            max_retries=0,
+            http_client=AnthropicDefaultAsyncHttpxClient(
+                limits=get_llm_connection_limits()
+            ),
+        )
 
     def _get_ollama_client(self):
         return AsyncOpenAI(
             base_url=(get_ollama_url_env() or "http://localhost:11434") + "/v1",
             api_key="ollama",
             default_headers={"User-Agent": "curl/7.68.0"},
+            max_retries=0,
+            http_client=OpenAIDefaultAsyncHttpxClient(
+                limits=get_llm_connection_limits()
+            ),
         )
 
     def _get_custom_client(self):
@@ -146,6 +280,289 @@ class LLMClient:
         return AsyncOpenAI(
             base_url=get_custom_llm_url_env(),
             api_key=get_custom_llm_api_key_env() or "null",
+            max_retries=0,
+            http_client=OpenAIDefaultAsyncHttpxClient(
+                limits=get_llm_connection_limits()
+            ),
+        )
+
+    # ? Rate limiting, retries and hedging
+    def _limit(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int] = None,
+    ):
+        return LLM_RATE_LIMITER.limit(
+            self.llm_provider, model, estimate_llm_tokens(messages, max_tokens)
+        )
+
+    async def _call(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int],
+        call: Callable[[], Awaitable[Any]],
+        hedge: bool = False,
+    ):
+        # SDK retries are disabled on pooled clients, retries happen here so
+        # every attempt goes through the rate limiter on its own
+        latency_key = f"{self.llm_provider.value}:{model}"
+
+        async def attempt():
+            async with self._limit(model, messages, max_tokens):
+                started_at = time.monotonic()
+                with PROMETHEUS_METRICS.time_llm_request(
+                    self.llm_provider.value, model
+                ), TRACING.span(
+                    "llm.generate",
+                    kind="client",
+                    **{"llm.provider": self.llm_provider.value, "llm.model": model},
+                ):
+                    result = await call()
+            LLM_LATENCY_TRACKER.record(latency_key, time.monotonic() - started_at)
+            return result
+
+        async def hedged_attempt():
+            hedge_after = (
+                get_hedge_delay(latency_key)
+                if hedge and is_hedging_enabled()
+                else None
+            )
+            if hedge_after is None:
+                return await attempt()
+            return await run_hedged(attempt, hedge_after)
+
+        return await LLMRetryPolicy.from_env().run(hedged_attempt)
+
+    async def _call_stream(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int],
+        get_stream: Callable[[], AsyncGenerator[str, None]],
+    ) -> AsyncGenerator[str, None]:
+        # A stream can only be retried before its first chunk reaches the caller
+        retry_policy = LLMRetryPolicy.from_env()
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            has_yielded = False
+            try:
+                # Holds the provider slot for the whole duration of the stream
+                async with self._limit(model, messages, max_tokens):
+                    with PROMETHEUS_METRICS.time_llm_request(
+                        self.llm_provider.value, model
+                    ), TRACING.span(
+                        "llm.stream",
+                        kind="client",
+                        current=False,
+                        **{"llm.provider": self.llm_provider.value, "llm.model": model},
+                    ):
+                        async for chunk in get_stream():
+                            has_yielded = True
+                            yield chunk
+                return
+            except Exception as e:
+                if has_yielded or not retry_policy.should_retry(
+                    attempt, e, time.monotonic() - started_at
+                ):
+                    raise
+                delay = retry_policy.get_delay(attempt, e)
+                attempt += 1
+                print(
+                    f"LLM stream failed ({e.__class__.__name__}), "
+                    f"retrying in {delay:.1f}s (attempt {attempt}/{retry_policy.max_retries})"
+                )
+                await asyncio.sleep(delay)
+
+    # ? Failover
+    def _get_failover_chain(self, model: str) -> List[tuple["LLMClient", str]]:
+        chain = [(self, model)]
+        if not self.use_failover:
+            return chain
+        for llm_provider in get_fallback_llm_providers():
+            fallback_model = get_model_for_provider(llm_provider)
+            if not fallback_model:
+                print(f"Skipping fallback {llm_provider.value}, no model is set")
+                continue
+            try:
+                chain.append((LLMClient(llm_provider), fallback_model))
+            except HTTPException as e:
+                print(f"Skipping fallback {llm_provider.value}, {e.detail}")
+        return chain
+
+    def _iter_available_clients(
+        self, model: str
+    ) -> Iterator[tuple["LLMClient", str]]:
+        """
+        Providers of the failover chain to try, in order. A circuit is checked
+        only when its provider is about to be tried, so a half open circuit's
+        probe isn't used up by a fallback that is never called.
+        """
+        chain = self._get_failover_chain(model)
+        if len(chain) == 1:
+            yield chain[0]
+            return
+        tried = False
+        for client, client_model in chain:
+            if LLM_CIRCUIT_BREAKER.allow_request(client.llm_provider):
+                tried = True
+                yield client, client_model
+        if not tried:
+            # Every circuit is open, still try the selected provider
+            yield chain[0]
+
+    def _on_provider_error(self, client: "LLMClient", e: Exception) -> bool:
+        """Records the error and returns whether to fail over to the next provider."""
+        if not is_llm_retryable_error(e):
+            # The provider answered, the request itself is at fault
+            LLM_CIRCUIT_BREAKER.record_success(client.llm_provider)
+            return False
+        LLM_CIRCUIT_BREAKER.record_failure(client.llm_provider)
+        print(
+            f"LLM provider {client.llm_provider.value} failed "
+            f"({e.__class__.__name__})"
+        )
+        return True
+
+    async def _call_with_failover(
+        self,
+        model: str,
+        call: Callable[["LLMClient", str], Awaitable[Any]],
+    ):
+        error = None
+        for client, client_model in self._iter_available_clients(model):
+            try:
+                result = await call(client, client_model)
+            except Exception as e:
+                if not self._on_provider_error(client, e):
+                    raise
+                error = e
+                continue
+            LLM_CIRCUIT_BREAKER.record_success(client.llm_provider)
+            return result
+        # Every provider tried failed
+        raise error
+
+    async def _stream_with_failover(
+        self,
+        model: str,
+        get_stream: Callable[["LLMClient", str], AsyncGenerator[str, None]],
+    ) -> AsyncGenerator[str, None]:
+        # Like retries, failover is only possible before the first chunk
+        error = None
+        for client, client_model in self._iter_available_clients(model):
+            has_yielded = False
+            try:
+                async for chunk in get_stream(client, client_model):
+                    if not has_yielded:
+                        has_yielded = True
+                        LLM_CIRCUIT_BREAKER.record_success(client.llm_provider)
+                    yield chunk
+                return
+            except Exception as e:
+                if has_yielded or not self._on_provider_error(client, e):
+                    raise
+                error = e
+        # Every provider tried failed
+        raise error
+
+    # ? Prompt caching
+    def use_prompt_caching(self) -> bool:
+        prompt_caching = parse_bool_or_none(get_llm_prompt_caching_env())
+        return True if prompt_caching is None else prompt_caching
+
+    def _get_openai_prompt_cache_kwargs(self, messages: List[LLMMessage]) -> dict:
+        # OpenAI caches prompt prefixes on its own, the key routes requests
+        # sharing a system prompt to the same cache
+        if self.llm_provider != LLMProvider.OPENAI or not self.use_prompt_caching():
+            return {}
+        system_prompt = self._get_system_prompt(messages)
+        if not system_prompt:
+            return {}
+        return {
+            "prompt_cache_key": hashlib.sha256(system_prompt.encode()).hexdigest()[:32]
+        }
+
+    def _get_openai_stream_kwargs(self, messages: List[LLMMessage]) -> dict:
+        if self.llm_provider != LLMProvider.OPENAI:
+            return {}
+        return {
+            "stream_options": {"include_usage": True},
+            **self._get_openai_prompt_cache_kwargs(messages),
+        }
+
+    def _get_anthropic_system_prompt(self, messages: List[LLMMessage]):
+        system_prompt = self._get_system_prompt(messages)
+        if not system_prompt or not self.use_prompt_caching():
+            return system_prompt
+        # Caches tools and system prompt, which only depend on the slide layout
+        return [
+            {
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+
+    def _record_usage(self, model: str, usage: LLMUsage):
+        LLM_USAGE_TRACKER.record(self.llm_provider.value, model, usage)
+        PROMETHEUS_METRICS.record_llm_tokens(self.llm_provider.value, model, usage)
+        count_in_generation_stage(
+            llm_requests=usage.requests,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cached_input_tokens=usage.cached_input_tokens,
+        )
+
+    def _record_openai_usage(self, model: str, usage):
+        if not usage:
+            return
+        prompt_tokens_details = getattr(usage, "prompt_tokens_details", None)
+        self._record_usage(
+            model,
+            LLMUsage(
+                input_tokens=usage.prompt_tokens or 0,
+                output_tokens=usage.completion_tokens or 0,
+                cached_input_tokens=(
+                    getattr(prompt_tokens_details, "cached_tokens", None) or 0
+                ),
+                requests=1,
+            ),
+        )
+
+    def _record_anthropic_usage(self, model: str, usage):
+        if not usage:
+            return
+        cached_input_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_creation_input_tokens = (
+            getattr(usage, "cache_creation_input_tokens", None) or 0
+        )
+        self._record_usage(
+            model,
+            LLMUsage(
+                input_tokens=usage.input_tokens
+                + cached_input_tokens
+                + cache_creation_input_tokens,
+                output_tokens=usage.output_tokens,
+                cached_input_tokens=cached_input_tokens,
+                cache_creation_input_tokens=cache_creation_input_tokens,
+                requests=1,
+            ),
+        )
+
+    def _record_google_usage(self, model: str, usage_metadata):
+        if not usage_metadata:
+            return
+        self._record_usage(
+            model,
+            LLMUsage(
+                input_tokens=usage_metadata.prompt_token_count or 0,
+                output_tokens=usage_metadata.candidates_token_count or 0,
+                cached_input_tokens=usage_metadata.cached_content_token_count or 0,
+                requests=1,
+            ),
         )
 
     # ? Prompts
@@ -204,7 +621,9 @@ class LLMClient:
             max_completion_tokens=max_tokens,
             tools=tools,
             extra_body=extra_body,
+            **self._get_openai_prompt_cache_kwargs(messages),
         )
+        self._record_openai_usage(model, response.usage)
 
         if len(response.choices) == 0:
             return None
@@ -271,6 +690,7 @@ class LLMClient:
                 max_output_tokens=max_tokens,
             ),
         )
+        self._record_google_usage(model, response.usage_metadata)
 
         content = response.candidates[0].content
         response_parts = content.parts
@@ -326,7 +746,7 @@ class LLMClient:
 
         response: AnthropicMessage = await client.messages.create(
             model=model,
-            system=self._get_system_prompt(messages),
+            system=self._get_anthropic_system_prompt(messages),
             messages=[
                 message.model_dump()
                 for message in self._get_anthropic_messages(messages)
@@ -334,6 +754,7 @@ class LLMClient:
             tools=tools,
             max_tokens=max_tokens or 4000,
         )
+        self._record_anthropic_usage(model, response.usage)
         text_content = None
         tool_calls: List[AnthropicToolCall] = []
         for content in response.content:
@@ -408,9 +829,51 @@ class LLMClient:
         messages: List[LLMMessage],
         max_tokens: Optional[int] = None,
         tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
+    ):
+        return await self._call_with_failover(
+            model,
+            lambda client, client_model: client._generate_on_provider(
+                model=client_model,
+                messages=messages,
+                max_tokens=max_tokens,
+                tools=tools,
+            ),
+        )
+
+    async def _generate_on_provider(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int] = None,
+        tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
     ):
         parsed_tools = self.tool_calls_handler.parse_tools(tools)
 
+        content = await self._call(
+            model,
+            messages,
+            max_tokens,
+            lambda: self._generate(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                parsed_tools=parsed_tools,
+            ),
+        )
+        if content is None:
+            raise HTTPException(
+                status_code=400,
+                detail="LLM did not return any content",
+            )
+        return content
+
+    async def _generate(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int] = None,
+        parsed_tools: Optional[List[dict]] = None,
+    ):
         content = None
         match self.llm_provider:
             case LLMProvider.OPENAI:
@@ -442,11 +905,6 @@ class LLMClient:
                 content = await self._generate_custom(
                     model=model, messages=messages, max_tokens=max_tokens
                 )
-        if content is None:
-            raise HTTPException(
-                status_code=400,
-                detail="LLM did not return any content",
-            )
         return content
 
     # ? Generate Structured Content
@@ -509,7 +967,9 @@ class LLMClient:
             max_completion_tokens=max_tokens,
             tools=all_tools,
             extra_body=extra_body,
+            **self._get_openai_prompt_cache_kwargs(messages),
         )
+        self._record_openai_usage(model, response.usage)
 
         if len(response.choices) == 0:
             return None
@@ -616,6 +1076,7 @@ class LLMClient:
                 max_output_tokens=max_tokens,
             ),
         )
+        self._record_google_usage(model, response.usage_metadata)
 
         content = response.candidates[0].content
         response_parts = content.parts
@@ -679,7 +1140,7 @@ class LLMClient:
         client: AsyncAnthropic = self._client
         response: AnthropicMessage = await client.messages.create(
             model=model,
-            system=self._get_system_prompt(messages),
+            system=self._get_anthropic_system_prompt(messages),
             messages=[
                 message.model_dump()
                 for message in self._get_anthropic_messages(messages)
@@ -694,6 +1155,7 @@ class LLMClient:
                 *(tools or []),
             ],
         )
+        self._record_anthropic_usage(model, response.usage)
         tool_calls: List[AnthropicToolCall] = []
         for content in response.content:
             if content.type == "tool_use":
@@ -782,9 +1244,84 @@ class LLMClient:
         strict: bool = False,
         tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
         max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        hedge: bool = False,
     ) -> dict:
+        return await self._call_with_failover(
+            model,
+            lambda client, client_model: client._generate_structured_on_provider(
+                model=client_model,
+                messages=messages,
+                response_format=response_format,
+                strict=strict,
+                tools=tools,
+                max_tokens=max_tokens,
+                use_cache=use_cache,
+                hedge=hedge,
+            ),
+        )
+
+    async def _generate_structured_on_provider(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+        strict: bool = False,
+        tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        hedge: bool = False,
+    ) -> dict:
+        # Tool calls (e.g. web search) make responses non deterministic
+        cache_key = None
+        if use_cache and not tools and LLM_RESPONSE_CACHE.is_enabled():
+            cache_key = LLM_RESPONSE_CACHE.get_key(
+                self.llm_provider.value,
+                model,
+                messages,
+                response_format,
+                strict,
+                max_tokens,
+            )
+            cached_content = await LLM_RESPONSE_CACHE.get(cache_key)
+            if cached_content is not None:
+                count_in_generation_stage(llm_cache_hits=1)
+                return cached_content
+
         parsed_tools = self.tool_calls_handler.parse_tools(tools)
 
+        content = await self._call(
+            model,
+            messages,
+            max_tokens,
+            lambda: self._generate_structured(
+                model=model,
+                messages=messages,
+                response_format=response_format,
+                strict=strict,
+                parsed_tools=parsed_tools,
+                max_tokens=max_tokens,
+            ),
+            hedge=hedge,
+        )
+        if content is None:
+            raise HTTPException(
+                status_code=400,
+                detail="LLM did not return any content",
+            )
+        if cache_key:
+            await LLM_RESPONSE_CACHE.set(cache_key, content)
+        return content
+
+    async def _generate_structured(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+        strict: bool = False,
+        parsed_tools: Optional[List[dict]] = None,
+        max_tokens: Optional[int] = None,
+    ) -> dict | None:
         content = None
         match self.llm_provider:
             case LLMProvider.OPENAI:
@@ -828,11 +1365,6 @@ class LLMClient:
                     strict=strict,
                     max_tokens=max_tokens,
                 )
-        if content is None:
-            raise HTTPException(
-                status_code=400,
-                detail="LLM did not return any content",
-            )
         return content
 
     # ? Stream Unstructured Content
@@ -859,8 +1391,11 @@ class LLMClient:
             tools=tools,
             extra_body=extra_body,
             stream=True,
+            **self._get_openai_stream_kwargs(messages),
         ):
             event: OpenAIChatCompletionChunk = event
+            if event.usage:
+                self._record_openai_usage(model, event.usage)
             if not event.choices:
                 continue
 
@@ -1018,7 +1553,7 @@ class LLMClient:
         tool_calls: List[AnthropicToolCall] = []
         async with client.messages.stream(
             model=model,
-            system=self._get_system_prompt(messages),
+            system=self._get_anthropic_system_prompt(messages),
             messages=[
                 message.model_dump()
                 for message in self._get_anthropic_messages(messages)
@@ -1044,6 +1579,9 @@ class LLMClient:
                             input=event.content_block.input,
                         )
                     )
+            self._record_anthropic_usage(
+                model, (await stream.get_final_message()).usage
+            )
 
         if tool_calls:
             tool_call_messages = (
@@ -1102,9 +1640,45 @@ class LLMClient:
         messages: List[LLMMessage],
         max_tokens: Optional[int] = None,
         tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
+    ):
+        return self._stream_with_failover(
+            model,
+            lambda client, client_model: client._stream_on_provider(
+                model=client_model,
+                messages=messages,
+                max_tokens=max_tokens,
+                tools=tools,
+            ),
+        )
+
+    def _stream_on_provider(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int] = None,
+        tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
     ):
         parsed_tools = self.tool_calls_handler.parse_tools(tools)
 
+        return self._call_stream(
+            model,
+            messages,
+            max_tokens,
+            lambda: self._stream(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                parsed_tools=parsed_tools,
+            ),
+        )
+
+    def _stream(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int] = None,
+        parsed_tools: Optional[List[dict]] = None,
+    ):
         match self.llm_provider:
             case LLMProvider.OPENAI:
                 return self._stream_openai(
@@ -1206,8 +1780,11 @@ class LLMClient:
             ),
             extra_body=extra_body,
             stream=True,
+            **self._get_openai_stream_kwargs(messages),
         ):
             event: OpenAIChatCompletionChunk = event
+            if event.usage:
+                self._record_openai_usage(model, event.usage)
             if not event.choices:
                 continue
 
@@ -1408,7 +1985,7 @@ class LLMClient:
         has_response_schema_tool_call = False
         async with client.messages.stream(
             model=model,
-            system=self._get_system_prompt(messages),
+            system=self._get_anthropic_system_prompt(messages),
             messages=[
                 message.model_dump()
                 for message in self._get_anthropic_messages(messages)
@@ -1454,6 +2031,9 @@ class LLMClient:
                             input=event.content_block.input,
                         )
                     )
+            self._record_anthropic_usage(
+                model, (await stream.get_final_message()).usage
+            )
 
         if tool_calls and not has_response_schema_tool_call:
             tool_call_messages = (
@@ -1526,9 +2106,53 @@ class LLMClient:
         strict: bool = False,
         tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
         max_tokens: Optional[int] = None,
+    ):
+        return self._stream_with_failover(
+            model,
+            lambda client, client_model: client._stream_structured_on_provider(
+                model=client_model,
+                messages=messages,
+                response_format=response_format,
+                strict=strict,
+                tools=tools,
+                max_tokens=max_tokens,
+            ),
+        )
+
+    def _stream_structured_on_provider(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+        strict: bool = False,
+        tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
+        max_tokens: Optional[int] = None,
     ):
         parsed_tools = self.tool_calls_handler.parse_tools(tools)
 
+        return self._call_stream(
+            model,
+            messages,
+            max_tokens,
+            lambda: self._stream_structured(
+                model=model,
+                messages=messages,
+                response_format=response_format,
+                strict=strict,
+                parsed_tools=parsed_tools,
+                max_tokens=max_tokens,
+            ),
+        )
+
+    def _stream_structured(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+        strict: bool = False,
+        parsed_tools: Optional[List[dict]] = None,
+        max_tokens: Optional[int] = None,
+    ):
         match self.llm_provider:
             case LLMProvider.OPENAI:
                 return self._stream_openai_structured(
@@ -1576,7 +2200,7 @@ class LLMClient:
     async def _search_openai(self, query: str) -> str:
         client: AsyncOpenAI = self._client
         response = await client.responses.create(
-            model=get_model(),
+            model=get_model_for_provider(self.llm_provider),
             tools=[
                 {
                     "type": "web_search_preview",
@@ -1593,7 +2217,7 @@ class LLMClient:
 
         response = await asyncio.to_thread(
             client.models.generate_content,
-            model=get_model(),
+            model=get_model_for_provider(self.llm_provider),
             contents=query,
             config=config,
         )
@@ -1603,7 +2227,7 @@ class LLMClient:
         client: AsyncAnthropic = self._client
 
         response = await client.messages.create(
-            model=get_model(),
+            model=get_model_for_provider(self.llm_provider),
             max_tokens=4000,
             messages=[{"role": "user", "content": query}],
             tools=[
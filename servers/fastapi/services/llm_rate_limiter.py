@@ -0,0 +1,256 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+import json
+import time
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from constants.llm import (
+    DEFAULT_LLM_MAX_CONCURRENCY,
+    DEFAULT_LLM_MIN_CONCURRENCY,
+    DEFAULT_LLM_OUTPUT_TOKENS_ESTIMATE,
+    LLM_CONCURRENCY_DECREASE_COOLDOWN,
+    LLM_CONCURRENCY_DECREASE_FACTOR,
+)
+from enums.llm_provider import LLMProvider
+from models.llm_message import LLMMessage
+from utils.get_env import (
+    get_llm_max_concurrency_env,
+    get_llm_min_concurrency_env,
+    get_llm_rate_limits_env,
+    get_llm_requests_per_minute_env,
+    get_llm_tokens_per_minute_env,
+)
+from utils.llm_client_error_handler import is_llm_rate_limit_error
+from utils.parsers import parse_float_or_none, parse_int_or_none
+
+
+class LLMRateLimitConfig(BaseModel):
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_concurrency: int = DEFAULT_LLM_MAX_CONCURRENCY
+    min_concurrency: int = DEFAULT_LLM_MIN_CONCURRENCY
+
+
+def get_llm_rate_limit_config(provider: str, model: str) -> LLMRateLimitConfig:
+    """
+    Limits for a provider/model pair.
+    LLM_RATE_LIMITS is a JSON object keyed by "provider" or "provider:model"
+    that overrides the global LLM_* limits, e.g.
+    {"openai:gpt-4.1": {"requests_per_minute": 500, "tokens_per_minute": 30000}}
+    """
+    config = LLMRateLimitConfig(
+        requests_per_minute=parse_float_or_none(get_llm_requests_per_minute_env()),
+        tokens_per_minute=parse_float_or_none(get_llm_tokens_per_minute_env()),
+        max_concurrency=parse_int_or_none(get_llm_max_concurrency_env())
+        or DEFAULT_LLM_MAX_CONCURRENCY,
+        min_concurrency=parse_int_or_none(get_llm_min_concurrency_env())
+        or DEFAULT_LLM_MIN_CONCURRENCY,
+    )
+
+    overrides = {}
+    try:
+        overrides = json.loads(get_llm_rate_limits_env() or "{}")
+    except json.JSONDecodeError:
+        print("Invalid LLM_RATE_LIMITS, ignoring it")
+
+    for key in (provider, f"{provider}:{model}"):
+        if isinstance(overrides.get(key), dict):
+            config = config.model_copy(update=overrides[key])
+
+    config.min_concurrency = max(1, min(config.min_concurrency, config.max_concurrency))
+    return config
+
+
+def estimate_llm_tokens(
+    messages: List[LLMMessage], max_tokens: Optional[int] = None
+) -> int:
+    # Roughly 4 characters per token for the prompt, plus the output budget
+    prompt_characters = sum(len(message.model_dump_json()) for message in messages)
+    return prompt_characters // 4 + (max_tokens or DEFAULT_LLM_OUTPUT_TOKENS_ESTIMATE)
+
+
+class TokenBucket:
+    """Refills continuously at capacity per minute. Waiters are served in order."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self._refill_rate = per_minute / 60
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated_at) * self._refill_rate
+        )
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1):
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self._refill_rate)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit.
+    Grows by one slot per window of successful calls and halves on overload.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease_at = float("-inf")
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Pass the wake up on to the next waiter
+                    self._wake_waiters()
+                raise
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def on_success(self):
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake_waiters()
+
+    def on_overload(self):
+        # Many in-flight calls fail together on a 429, only back off once for them
+        now = time.monotonic()
+        if now - self._last_decrease_at < LLM_CONCURRENCY_DECREASE_COOLDOWN:
+            return
+        self._last_decrease_at = now
+        self.limit = max(self.min_limit, self.limit * LLM_CONCURRENCY_DECREASE_FACTOR)
+
+    def _wake_waiters(self):
+        free_slots = int(self.limit) - self.in_flight
+        while free_slots > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+
+class ProviderModelLimiter:
+    def __init__(self, config: LLMRateLimitConfig):
+        self.config = config
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            config.max_concurrency, config.min_concurrency
+        )
+        self.requests_bucket = (
+            TokenBucket(config.requests_per_minute)
+            if config.requests_per_minute
+            else None
+        )
+        self.tokens_bucket = (
+            TokenBucket(config.tokens_per_minute) if config.tokens_per_minute else None
+        )
+
+        self.requests = 0
+        self.overloads = 0
+
+    async def acquire(self, estimated_tokens: int):
+        if self.requests_bucket:
+            await self.requests_bucket.acquire(1)
+        if self.tokens_bucket:
+            await self.tokens_bucket.acquire(estimated_tokens)
+        await self.concurrency.acquire()
+        self.requests += 1
+
+    def release(self):
+        self.concurrency.release()
+
+    def on_success(self):
+        self.concurrency.on_success()
+
+    def on_overload(self):
+        self.overloads += 1
+        self.concurrency.on_overload()
+
+    def snapshot(self) -> dict:
+        return {
+            "concurrency_limit": int(self.concurrency.limit),
+            "max_concurrency": self.config.max_concurrency,
+            "in_flight": self.concurrency.in_flight,
+            "waiting": self.concurrency.waiting,
+            "requests": self.requests,
+            "overloads": self.overloads,
+            "requests_per_minute": self.config.requests_per_minute,
+            "tokens_per_minute": self.config.tokens_per_minute,
+        }
+
+
+class LLMRateLimiter:
+    """
+    Process-wide scheduler for LLM calls, keyed by provider and model.
+    Enforces requests/tokens per minute and adapts concurrency to 429s.
+    """
+
+    def __init__(self):
+        self._limiters: dict[tuple[str, str], ProviderModelLimiter] = {}
+
+    def get_limiter(self, provider: LLMProvider, model: str) -> ProviderModelLimiter:
+        key = (provider.value, model)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = ProviderModelLimiter(get_llm_rate_limit_config(*key))
+            self._limiters[key] = limiter
+        return limiter
+
+    def get_concurrency_limit(self, provider: LLMProvider, model: str) -> int:
+        return int(self.get_limiter(provider, model).concurrency.limit)
+
+    @asynccontextmanager
+    async def limit(self, provider: LLMProvider, model: str, estimated_tokens: int):
+        limiter = self.get_limiter(provider, model)
+        await limiter.acquire(estimated_tokens)
+        try:
+            yield
+        except Exception as e:
+            if is_llm_rate_limit_error(e):
+                limiter.on_overload()
+            raise
+        else:
+            limiter.on_success()
+        finally:
+            limiter.release()
+
+    def reset(self):
+        self._limiters.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            f"{provider}:{model}": limiter.snapshot()
+            for (provider, model), limiter in self._limiters.items()
+        }
+
+
+LLM_RATE_LIMITER = LLMRateLimiter()
@@ -0,0 +1,231 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import closing
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from constants.llm import (
+    DEFAULT_LLM_RESPONSE_CACHE_MAX_DISK_ENTRIES,
+    DEFAULT_LLM_RESPONSE_CACHE_MAX_ENTRIES,
+    DEFAULT_LLM_RESPONSE_CACHE_TTL,
+)
+from models.llm_message import LLMMessage
+from utils.get_env import (
+    get_app_data_directory_env,
+    get_llm_response_cache_env,
+    get_llm_response_cache_max_disk_entries_env,
+    get_llm_response_cache_max_entries_env,
+    get_llm_response_cache_ttl_env,
+)
+from utils.parsers import parse_bool_or_none, parse_float_or_none, parse_int_or_none
+
+
+class LLMResponseCache:
+    """
+    Opt-in cache for structured LLM responses.
+    Entries are addressed by a hash of everything that determines the response
+    and live in an in-memory LRU backed by a SQLite file in the app data directory.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db_initialized = False
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+    def is_enabled(self) -> bool:
+        return parse_bool_or_none(get_llm_response_cache_env()) or False
+
+    @property
+    def ttl(self) -> float:
+        return (
+            parse_float_or_none(get_llm_response_cache_ttl_env())
+            or DEFAULT_LLM_RESPONSE_CACHE_TTL
+        )
+
+    @property
+    def max_entries(self) -> int:
+        return (
+            parse_int_or_none(get_llm_response_cache_max_entries_env())
+            or DEFAULT_LLM_RESPONSE_CACHE_MAX_ENTRIES
+        )
+
+    @property
+    def max_disk_entries(self) -> int:
+        return (
+            parse_int_or_none(get_llm_response_cache_max_disk_entries_env())
+            or DEFAULT_LLM_RESPONSE_CACHE_MAX_DISK_ENTRIES
+        )
+
+    @property
+    def db_path(self) -> str:
+        if self._db_path:
+            return self._db_path
+        return os.path.join(
+            get_app_data_directory_env() or "/tmp/presenton", "llm_response_cache.db"
+        )
+
+    def get_key(
+        self,
+        provider: str,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+        strict: bool,
+        max_tokens: Optional[int],
+    ) -> str:
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "messages": [message.model_dump(mode="json") for message in messages],
+                "response_format": response_format,
+                "strict": strict,
+                # A response cut short by a low limit mustn't serve a higher one
+                "max_tokens": max_tokens,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return json.loads(entry[1])
+            if entry:
+                self._memory.pop(key, None)
+
+        try:
+            entry = await asyncio.to_thread(self._get_from_disk, key, now)
+        except Exception as e:
+            print(f"Error reading LLM response cache: {e}")
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._set_in_memory(key, *entry)
+        self.hits += 1
+        self.disk_hits += 1
+        return json.loads(entry[1])
+
+    async def set(self, key: str, value: dict):
+        created_at = time.time()
+        serialized = json.dumps(value, ensure_ascii=False)
+        self._set_in_memory(key, created_at, serialized)
+        try:
+            await asyncio.to_thread(self._set_on_disk, key, created_at, serialized)
+        except Exception as e:
+            print(f"Error writing LLM response cache: {e}")
+
+    def clear(self):
+        with self._memory_lock:
+            self._memory.clear()
+        with self._db_lock:
+            if os.path.exists(self.db_path):
+                with closing(self._connect()) as connection, connection:
+                    connection.execute("DELETE FROM llm_responses")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.is_enabled(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _set_in_memory(self, key: str, created_at: float, serialized: str):
+        with self._memory_lock:
+            self._memory[key] = (created_at, serialized)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path)
+        if not self._db_initialized:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed_at "
+                "ON llm_responses (accessed_at)"
+            )
+            self._db_initialized = True
+        return connection
+
+    def _get_from_disk(self, key: str, now: float) -> Optional[tuple[float, str]]:
+        with self._db_lock:
+            with closing(self._connect()) as connection, connection:
+                row = connection.execute(
+                    "SELECT created_at, value FROM llm_responses WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[0] > self.ttl:
+                    connection.execute(
+                        "DELETE FROM llm_responses WHERE key = ?", (key,)
+                    )
+                    return None
+                connection.execute(
+                    "UPDATE llm_responses SET accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+                return row[0], row[1]
+
+    def _set_on_disk(self, key: str, created_at: float, serialized: str):
+        with self._db_lock:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, serialized, created_at, created_at),
+                )
+                connection.execute(
+                    "DELETE FROM llm_responses WHERE created_at < ?",
+                    (created_at - self.ttl,),
+                )
+                connection.execute(
+                    """
+                    DELETE FROM llm_responses WHERE key IN (
+                        SELECT key FROM llm_responses
+                        ORDER BY accessed_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_disk_entries,),
+                )
+
+
+LLM_RESPONSE_CACHE = LLMResponseCache()
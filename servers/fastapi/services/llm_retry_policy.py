@@ -0,0 +1,171 @@
+import asyncio
+from collections import deque
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from constants.llm import (
+    DEFAULT_LLM_HEDGE_MIN_SAMPLES,
+    DEFAULT_LLM_HEDGE_PERCENTILE,
+    DEFAULT_LLM_MAX_RETRIES,
+    DEFAULT_LLM_RETRY_BASE_DELAY,
+    DEFAULT_LLM_RETRY_DEADLINE,
+    DEFAULT_LLM_RETRY_MAX_DELAY,
+    LLM_LATENCY_WINDOW_SIZE,
+)
+from utils.get_env import (
+    get_llm_hedge_min_samples_env,
+    get_llm_hedge_percentile_env,
+    get_llm_hedge_requests_env,
+    get_llm_max_retries_env,
+    get_llm_retry_base_delay_env,
+    get_llm_retry_deadline_env,
+    get_llm_retry_max_delay_env,
+)
+from utils.llm_client_error_handler import (
+    get_llm_error_retry_after,
+    is_llm_retryable_error,
+)
+from utils.parsers import parse_bool_or_none, parse_float_or_none, parse_int_or_none
+
+
+T = TypeVar("T")
+
+
+class LLMRetryPolicy:
+    """
+    Retries transient LLM errors with exponential backoff and full jitter.
+    No new attempt is started once the overall deadline has passed,
+    but an attempt that is already running is never cut short.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_LLM_MAX_RETRIES,
+        base_delay: float = DEFAULT_LLM_RETRY_BASE_DELAY,
+        max_delay: float = DEFAULT_LLM_RETRY_MAX_DELAY,
+        deadline: float = DEFAULT_LLM_RETRY_DEADLINE,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    @classmethod
+    def from_env(cls) -> "LLMRetryPolicy":
+        max_retries = parse_int_or_none(get_llm_max_retries_env())
+        return cls(
+            max_retries=(
+                DEFAULT_LLM_MAX_RETRIES if max_retries is None else max(0, max_retries)
+            ),
+            base_delay=parse_float_or_none(get_llm_retry_base_delay_env())
+            or DEFAULT_LLM_RETRY_BASE_DELAY,
+            max_delay=parse_float_or_none(get_llm_retry_max_delay_env())
+            or DEFAULT_LLM_RETRY_MAX_DELAY,
+            deadline=parse_float_or_none(get_llm_retry_deadline_env())
+            or DEFAULT_LLM_RETRY_DEADLINE,
+        )
+
+    def get_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        retry_after = get_llm_error_retry_after(error) if error else None
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def should_retry(self, attempt: int, error: Exception, elapsed: float) -> bool:
+        if attempt >= self.max_retries or not is_llm_retryable_error(error):
+            return False
+        return elapsed < self.deadline
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except Exception as e:
+                if not self.should_retry(attempt, e, time.monotonic() - started_at):
+                    raise
+                delay = self.get_delay(attempt, e)
+                remaining = self.deadline - (time.monotonic() - started_at)
+                if delay >= remaining:
+                    raise
+                attempt += 1
+                print(
+                    f"LLM call failed ({e.__class__.__name__}), "
+                    f"retrying in {delay:.1f}s (attempt {attempt}/{self.max_retries})"
+                )
+                await asyncio.sleep(delay)
+
+
+class LLMLatencyTracker:
+    """Sliding window of successful call latencies per provider and model."""
+
+    def __init__(self, window_size: int = LLM_LATENCY_WINDOW_SIZE):
+        self.window_size = window_size
+        self._latencies: dict[str, deque[float]] = {}
+
+    def record(self, key: str, seconds: float):
+        latencies = self._latencies.get(key)
+        if latencies is None:
+            latencies = deque(maxlen=self.window_size)
+            self._latencies[key] = latencies
+        latencies.append(seconds)
+
+    def get_percentile(
+        self, key: str, percentile: float, min_samples: int = 1
+    ) -> Optional[float]:
+        latencies = self._latencies.get(key)
+        if not latencies or len(latencies) < min_samples:
+            return None
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(percentile * len(ordered)))
+        return ordered[index]
+
+
+LLM_LATENCY_TRACKER = LLMLatencyTracker()
+
+
+def is_hedging_enabled() -> bool:
+    return parse_bool_or_none(get_llm_hedge_requests_env()) or False
+
+
+def get_hedge_delay(key: str) -> Optional[float]:
+    """Latency after which a duplicate request is launched, None if unknown."""
+    return LLM_LATENCY_TRACKER.get_percentile(
+        key,
+        parse_float_or_none(get_llm_hedge_percentile_env())
+        or DEFAULT_LLM_HEDGE_PERCENTILE,
+        parse_int_or_none(get_llm_hedge_min_samples_env())
+        or DEFAULT_LLM_HEDGE_MIN_SAMPLES,
+    )
+
+
+async def run_hedged(call: Callable[[], Awaitable[T]], hedge_after: float) -> T:
+    """
+    Runs call and, if it has not finished after hedge_after seconds,
+    a duplicate of it. The first successful result wins and the other is cancelled.
+    """
+    tasks = {asyncio.ensure_future(call())}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            print(f"LLM call exceeded {hedge_after:.1f}s, launching hedged request")
+            tasks.add(asyncio.ensure_future(call()))
+
+        error: Optional[BaseException] = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,51 @@
+from pydantic import BaseModel
+
+
+class LLMUsage(BaseModel):
+    # Input tokens include the cached ones
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    requests: int = 0
+
+    def add(self, usage: "LLMUsage"):
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.cached_input_tokens += usage.cached_input_tokens
+        self.cache_creation_input_tokens += usage.cache_creation_input_tokens
+        self.requests += usage.requests
+
+
+class LLMUsageTracker:
+    """Token usage per provider and model, including prompt cache hits."""
+
+    def __init__(self):
+        self._usage: dict[str, LLMUsage] = {}
+
+    def record(self, provider: str, model: str, usage: LLMUsage):
+        key = f"{provider}:{model}"
+        total = self._usage.get(key)
+        if total is None:
+            total = LLMUsage()
+            self._usage[key] = total
+        total.add(usage)
+
+    def reset(self):
+        self._usage.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            key: {
+                **usage.model_dump(),
+                "cache_hit_rate": (
+                    usage.cached_input_tokens / usage.input_tokens
+                    if usage.input_tokens
+                    else 0.0
+                ),
+            }
+            for key, usage in self._usage.items()
+        }
+
+
+LLM_USAGE_TRACKER = LLMUsageTracker()
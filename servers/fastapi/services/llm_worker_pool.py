@@ -0,0 +1,50 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar
+
+from services.llm_rate_limiter import LLM_RATE_LIMITER
+from utils.llm_provider import get_llm_provider, get_model
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def get_llm_worker_pool_size(model: Optional[str] = None) -> int:
+    """Workers to run against the selected provider, its current concurrency limit."""
+    return LLM_RATE_LIMITER.get_concurrency_limit(
+        get_llm_provider(), model or get_model()
+    )
+
+
+class LLMWorkerPool:
+    """
+    Bounded pool of workers pulling jobs from a shared queue.
+    A worker takes the next job as soon as its current one finishes,
+    so one slow LLM call never leaves the other slots idle.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+
+    async def map(self, fn: Callable[[T], Awaitable[R]], items: Iterable[T]) -> List[R]:
+        """Runs fn over items and returns the results in item order."""
+        queue: asyncio.Queue[tuple[int, T]] = asyncio.Queue()
+        for each in enumerate(items):
+            queue.put_nowait(each)
+
+        results: List[R] = [None] * queue.qsize()
+
+        async def worker():
+            while not queue.empty():
+                index, item = queue.get_nowait()
+                results[index] = await fn(item)
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(min(self.size, len(results)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+        return results
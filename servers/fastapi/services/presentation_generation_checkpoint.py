@@ -0,0 +1,239 @@
+import asyncio
+import copy
+import json
+from typing import List, Optional, Tuple
+import uuid
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from constants.presentation import DEFAULT_PRESENTATION_CHECKPOINT_SAVE_INTERVAL
+from models.presentation_outline_model import PresentationOutlineModel
+from models.presentation_structure_model import PresentationStructureModel
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from models.sql.image_asset import ImageAsset
+from services.database import async_session_maker
+from utils.get_env import get_presentation_checkpoint_save_interval_env
+from utils.parsers import parse_float_or_none
+
+
+def copy_json(content: dict) -> dict:
+    # Slide content parsed by dirtyjson holds AttributedDicts, which can't be deepcopied
+    return json.loads(json.dumps(content))
+
+
+class PresentationGenerationCheckpoint:
+    """
+    Results of completed generation stages, saved on the async task so a
+    failed or interrupted task can resume without paying for them again.
+    Stages are outlines, structure, batch requests of slides submitted to the
+    batch API, content of each slide, assets of each slide and finally the
+    saved presentation.
+    Slides finish concurrently, so their saves are coalesced into at most one
+    write per save interval. Other stages are written right away.
+    Without a task (sync generation) nothing is saved or restored.
+    """
+
+    def __init__(
+        self,
+        async_status: Optional[AsyncPresentationGenerationTaskModel],
+        session_maker: async_sessionmaker = async_session_maker,
+    ):
+        self.task_id = async_status.id if async_status else None
+        self.data: dict = (
+            copy.deepcopy(async_status.checkpoint or {}) if async_status else {}
+        )
+        self.session_maker = session_maker
+        self._lock = asyncio.Lock()
+        # Changes made, and changes written to the task
+        self._version = 0
+        self._saved_version = 0
+        self._scheduled_save: Optional[asyncio.Task] = None
+
+    @property
+    def save_interval(self) -> float:
+        save_interval = parse_float_or_none(
+            get_presentation_checkpoint_save_interval_env()
+        )
+        if save_interval is None:
+            return DEFAULT_PRESENTATION_CHECKPOINT_SAVE_INTERVAL
+        return save_interval
+
+    @property
+    def is_presentation_saved(self) -> bool:
+        return self.data.get("presentation_saved", False)
+
+    def get_outlines(self) -> Optional[Tuple[PresentationOutlineModel, int]]:
+        outlines = self.data.get("outlines")
+        if not outlines:
+            return None
+        return (
+            PresentationOutlineModel(**outlines["outlines"]),
+            outlines["total_outlines"],
+        )
+
+    async def save_outlines(
+        self, outlines: PresentationOutlineModel, total_outlines: int
+    ):
+        self.data["outlines"] = {
+            "outlines": outlines.model_dump(mode="json"),
+            "total_outlines": total_outlines,
+        }
+        await self._save()
+
+    def get_structure(
+        self,
+    ) -> Optional[Tuple[PresentationStructureModel, PresentationOutlineModel]]:
+        """The structure with the outlines it was made for, including table of contents."""
+        structure = self.data.get("structure")
+        if not structure:
+            return None
+        return (
+            PresentationStructureModel(**structure["structure"]),
+            PresentationOutlineModel(**structure["outlines"]),
+        )
+
+    async def save_structure(
+        self, structure: PresentationStructureModel, outlines: PresentationOutlineModel
+    ):
+        self.data["structure"] = {
+            "structure": structure.model_dump(mode="json"),
+            "outlines": outlines.model_dump(mode="json"),
+        }
+        await self._save()
+
+    def get_slide_content(self, index: int) -> Optional[Tuple[int, dict]]:
+        """Layout index and generated content of a slide."""
+        slide = self.data.get("slide_contents", {}).get(str(index))
+        if not slide:
+            return None
+        return slide["layout_index"], copy.deepcopy(slide["content"])
+
+    async def save_slide_content(self, index: int, layout_index: int, content: dict):
+        self.data.setdefault("slide_contents", {})[str(index)] = {
+            "layout_index": layout_index,
+            "content": copy_json(content),
+        }
+        self._save_later()
+
+    def get_slide_assets(self, index: int) -> Optional[Tuple[dict, List[ImageAsset]]]:
+        """Content of a slide with asset urls filled in, and its image assets."""
+        slide = self.data.get("slide_assets", {}).get(str(index))
+        if not slide:
+            return None
+        return (
+            copy.deepcopy(slide["content"]),
+            [
+                ImageAsset(**{**each, "id": uuid.UUID(each["id"])})
+                for each in slide["assets"]
+            ],
+        )
+
+    async def save_slide_assets(
+        self, index: int, content: dict, assets: List[ImageAsset]
+    ):
+        self.data.setdefault("slide_assets", {})[str(index)] = {
+            "content": copy_json(content),
+            # created_at is filled in by the database when the asset is saved
+            "assets": [
+                each.model_dump(mode="json", exclude={"created_at"}) for each in assets
+            ],
+        }
+        self._save_later()
+
+    @property
+    def has_batch_requests(self) -> bool:
+        return "batch_requests" in self.data
+
+    def get_batch_request(self, index: int) -> Optional[dict]:
+        """Batch request holding the content of a slide submitted to the batch API."""
+        return self.data.get("batch_requests", {}).get(str(index))
+
+    def get_batch_requests(self) -> List[dict]:
+        return list(self.data.get("batch_requests", {}).values())
+
+    async def save_batch_requests(self, batch_requests: dict[int, dict]):
+        self.data["batch_requests"] = {
+            str(index): batch_request for index, batch_request in batch_requests.items()
+        }
+        await self._save()
+
+    def get_asset_ids(self) -> List[uuid.UUID]:
+        return [
+            uuid.UUID(each["id"])
+            for slide in self.data.get("slide_assets", {}).values()
+            for each in slide["assets"]
+        ]
+
+    async def commit_presentation(self, sql_session: AsyncSession):
+        """
+        Commits the presentation added to sql_session together with the
+        checkpoint marking it saved, so a retry never sees one without the other.
+        """
+        # A write started by flush would overwrite the mark
+        async with self._lock:
+            version = self._version
+            if self.task_id:
+                await sql_session.execute(
+                    update(AsyncPresentationGenerationTaskModel)
+                    .where(AsyncPresentationGenerationTaskModel.id == self.task_id)
+                    .values(checkpoint={**self.data, "presentation_saved": True})
+                )
+            await sql_session.commit()
+            self.data["presentation_saved"] = True
+            self._saved_version = version
+
+    def get_completed_stages(self) -> List[str]:
+        stages = []
+        if "outlines" in self.data:
+            stages.append("outlines")
+        if "structure" in self.data:
+            stages.append("structure")
+        if self.data.get("batch_requests"):
+            stages.append(
+                f"{len(self.data['batch_requests'])} slides submitted to batch API"
+            )
+        if self.data.get("slide_contents"):
+            stages.append(f"{len(self.data['slide_contents'])} slide contents")
+        if self.data.get("slide_assets"):
+            stages.append(f"{len(self.data['slide_assets'])} slide assets")
+        if self.is_presentation_saved:
+            stages.append("presentation saved")
+        return stages
+
+    async def flush(self):
+        """Writes changes not saved yet, such as slides waiting for the interval."""
+        if not self.task_id:
+            return
+        # Writes are serialized, and one write saves every change made before it
+        async with self._lock:
+            if self._saved_version == self._version:
+                return
+            version = self._version
+            async with self.session_maker() as session:
+                await session.execute(
+                    update(AsyncPresentationGenerationTaskModel)
+                    .where(AsyncPresentationGenerationTaskModel.id == self.task_id)
+                    .values(checkpoint=self.data)
+                )
+                await session.commit()
+            self._saved_version = version
+
+    async def _save(self):
+        self._version += 1
+        await self.flush()
+
+    def _save_later(self):
+        self._version += 1
+        if not self.task_id or self._scheduled_save:
+            return
+        self._scheduled_save = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.save_interval)
+        finally:
+            self._scheduled_save = None
+        await self.flush()
@@ -0,0 +1,178 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+from typing import Optional
+
+from pydantic import BaseModel
+
+from services.tracing import TRACING
+
+
+class PresentationGenerationStageMetrics(BaseModel):
+    # Wall clock time from the first run starting to the last one finishing
+    duration: float = 0.0
+    # Time spent in every run added up, more than duration when slides overlap
+    run_duration: float = 0.0
+    runs: int = 0
+    slides: int = 0
+    images: int = 0
+    icons: int = 0
+    llm_requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+    llm_cache_hits: int = 0
+
+
+_CURRENT_METRICS: ContextVar[Optional["PresentationGenerationMetrics"]] = ContextVar(
+    "presentation_generation_metrics", default=None
+)
+_CURRENT_STAGE: ContextVar[Optional[str]] = ContextVar(
+    "presentation_generation_stage", default=None
+)
+
+
+class PresentationGenerationMetrics:
+    """
+    Timings and counts of each stage of one presentation generation.
+    Stages are entered with generation_stage, which also works from tasks the
+    stage starts, so concurrent slides are recorded against their own stage.
+    LLM calls made outside of any stage are recorded under "other".
+    """
+
+    def __init__(self):
+        self.stages: dict[str, PresentationGenerationStageMetrics] = {}
+        self._started_at = time.perf_counter()
+        self._stage_spans: dict[str, tuple[float, float]] = {}
+
+    @property
+    def duration(self) -> float:
+        return time.perf_counter() - self._started_at
+
+    @contextmanager
+    def measure(self):
+        """Records stages and counts of the code run inside into these metrics."""
+        token = _CURRENT_METRICS.set(self)
+        try:
+            yield self
+        finally:
+            _CURRENT_METRICS.reset(token)
+
+    def get_stage(self, name: str) -> PresentationGenerationStageMetrics:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = PresentationGenerationStageMetrics()
+            self.stages[name] = stage
+        return stage
+
+    def add_run(self, name: str, started_at: float, finished_at: float):
+        stage = self.get_stage(name)
+        stage.runs += 1
+        stage.run_duration += finished_at - started_at
+
+        first_start, last_finish = self._stage_spans.get(
+            name, (started_at, finished_at)
+        )
+        first_start = min(first_start, started_at)
+        last_finish = max(last_finish, finished_at)
+        self._stage_spans[name] = (first_start, last_finish)
+        stage.duration = last_finish - first_start
+
+    def to_dict(self) -> dict:
+        return {
+            "duration": round(self.duration, 3),
+            "stages": {
+                name: {
+                    **stage.model_dump(),
+                    "duration": round(stage.duration, 3),
+                    "run_duration": round(stage.run_duration, 3),
+                }
+                for name, stage in self.stages.items()
+            },
+        }
+
+
+@contextmanager
+def generation_stage(name: str):
+    """
+    Records the code run inside as a run of the named stage, if metrics are
+    active, and traces it as a span.
+    """
+    metrics = _CURRENT_METRICS.get()
+    token = _CURRENT_STAGE.set(name)
+    started_at = time.perf_counter()
+    try:
+        with TRACING.span(f"presentation.{name}"):
+            yield
+    finally:
+        _CURRENT_STAGE.reset(token)
+        if metrics:
+            metrics.add_run(name, started_at, time.perf_counter())
+
+
+def count_in_generation_stage(**counts: int):
+    """Adds to the counts of the current stage, e.g. slides=1."""
+    metrics = _CURRENT_METRICS.get()
+    if not metrics:
+        return
+    stage = metrics.get_stage(_CURRENT_STAGE.get() or "other")
+    for key, value in counts.items():
+        setattr(stage, key, getattr(stage, key) + value)
+
+
+def get_current_generation_metrics() -> Optional[PresentationGenerationMetrics]:
+    return _CURRENT_METRICS.get()
+
+
+class PresentationGenerationStageTracker:
+    """Stage metrics of every presentation generated by this process."""
+
+    def __init__(self):
+        self.presentations = 0
+        self.failed_presentations = 0
+        self._stages: dict[str, PresentationGenerationStageMetrics] = {}
+        self._max_durations: dict[str, float] = {}
+        self.duration = 0.0
+
+    def record(self, metrics: PresentationGenerationMetrics, failed: bool = False):
+        self.presentations += 1
+        if failed:
+            self.failed_presentations += 1
+        self.duration += metrics.duration
+
+        for name, stage in metrics.stages.items():
+            total = self._stages.get(name)
+            if total is None:
+                total = PresentationGenerationStageMetrics()
+                self._stages[name] = total
+            for key, value in stage.model_dump().items():
+                setattr(total, key, getattr(total, key) + value)
+            self._max_durations[name] = max(
+                self._max_durations.get(name, 0.0), stage.duration
+            )
+
+    def reset(self):
+        self.presentations = 0
+        self.failed_presentations = 0
+        self.duration = 0.0
+        self._stages.clear()
+        self._max_durations.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "presentations": self.presentations,
+            "failed_presentations": self.failed_presentations,
+            "duration": round(self.duration, 3),
+            "stages": {
+                name: {
+                    **stage.model_dump(),
+                    "duration": round(stage.duration, 3),
+                    "run_duration": round(stage.run_duration, 3),
+                    "max_duration": round(self._max_durations[name], 3),
+                }
+                for name, stage in self._stages.items()
+            },
+        }
+
+
+PRESENTATION_GENERATION_STAGE_TRACKER = PresentationGenerationStageTracker()
@@ -0,0 +1,135 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, List, Optional, Tuple
+import uuid
+
+from models.presentation_layout import PresentationLayoutModel, SlideLayoutModel
+from models.presentation_outline_model import SlideOutlineModel
+from models.sql.image_asset import ImageAsset
+from models.sql.slide import SlideModel
+from services.image_generation_service import ImageGenerationService
+from services.llm_worker_pool import get_llm_worker_pool_size
+from services.presentation_generation_checkpoint import (
+    PresentationGenerationCheckpoint,
+)
+from services.presentation_generation_metrics import (
+    count_in_generation_stage,
+    generation_stage,
+)
+from utils.get_env import (
+    get_presentation_pipeline_env,
+    get_presentation_pipeline_window_env,
+)
+from utils.parsers import parse_bool_or_none, parse_int_or_none
+from utils.process_slides import process_slide_and_fetch_assets
+
+
+def is_presentation_pipeline_enabled() -> bool:
+    # Opt-in, layouts are chosen per slide instead of for the whole deck at once
+    return parse_bool_or_none(get_presentation_pipeline_env()) or False
+
+
+def get_presentation_pipeline_window() -> int:
+    return (
+        parse_int_or_none(get_presentation_pipeline_window_env())
+        or get_llm_worker_pool_size()
+    )
+
+
+class PresentationGenerationPipeline:
+    """
+    Generates each slide as soon as its outline is available.
+    A slide goes through layout selection, content generation and asset
+    fetching on its own, with at most window slides in flight at once.
+    """
+
+    def __init__(
+        self,
+        presentation_id: uuid.UUID,
+        layout_model: PresentationLayoutModel,
+        image_generation_service: ImageGenerationService,
+        select_layout: Callable[[int, SlideOutlineModel], Awaitable[int]],
+        generate_content: Callable[
+            [SlideLayoutModel, SlideOutlineModel], Awaitable[dict]
+        ],
+        window: int,
+        checkpoint: Optional[PresentationGenerationCheckpoint] = None,
+    ):
+        self.presentation_id = presentation_id
+        self.layout_model = layout_model
+        self.image_generation_service = image_generation_service
+        self.select_layout = select_layout
+        self.generate_content = generate_content
+        self.checkpoint = checkpoint or PresentationGenerationCheckpoint(None)
+        self._window = asyncio.Semaphore(max(1, window))
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._tasks
+
+    def add_outline(self, index: int, outline: SlideOutlineModel):
+        if index in self._tasks:
+            return
+        self._tasks[index] = asyncio.create_task(self._process_slide(index, outline))
+
+    async def finish(self) -> Tuple[List[int], List[SlideModel], List[ImageAsset]]:
+        """Waits for every slide and returns layout indices, slides and assets in order."""
+        try:
+            await asyncio.gather(*self._tasks.values())
+        except BaseException:
+            self.cancel()
+            raise
+
+        layout_indices, slides, assets = [], [], []
+        for index in sorted(self._tasks):
+            layout_index, slide, slide_assets = self._tasks[index].result()
+            layout_indices.append(layout_index)
+            slides.append(slide)
+            assets.extend(slide_assets)
+        return layout_indices, slides, assets
+
+    def cancel(self):
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+    async def _process_slide(
+        self, index: int, outline: SlideOutlineModel
+    ) -> Tuple[int, SlideModel, List[ImageAsset]]:
+        saved_content = self.checkpoint.get_slide_content(index)
+        if saved_content and saved_content[0] < len(self.layout_model.slides):
+            layout_index, slide_content = saved_content
+        else:
+            async with self._window:
+                with generation_stage("layouts"):
+                    layout_index = await self.select_layout(index, outline)
+                if not 0 <= layout_index < len(self.layout_model.slides):
+                    layout_index = random.randint(0, len(self.layout_model.slides) - 1)
+                slide_layout = self.layout_model.slides[layout_index]
+
+                print(f"Generating slide {index} with layout {slide_layout.id}")
+                with generation_stage("slide_content"):
+                    slide_content = await self.generate_content(slide_layout, outline)
+                    count_in_generation_stage(slides=1)
+            await self.checkpoint.save_slide_content(index, layout_index, slide_content)
+
+        slide = SlideModel(
+            presentation=self.presentation_id,
+            layout_group=self.layout_model.name,
+            layout=self.layout_model.slides[layout_index].id,
+            index=index,
+            speaker_note=slide_content.get("__speaker_note__"),
+            content=slide_content,
+        )
+
+        saved_assets = self.checkpoint.get_slide_assets(index)
+        if saved_assets:
+            slide.content, assets = saved_assets
+        else:
+            # Assets are mostly image generation, they don't hold a slot in the window
+            with generation_stage("slide_assets"):
+                assets = await process_slide_and_fetch_assets(
+                    self.image_generation_service, slide
+                )
+            await self.checkpoint.save_slide_assets(index, slide.content, assets)
+        return layout_index, slide, assets
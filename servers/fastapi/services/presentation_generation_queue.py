@@ -0,0 +1,745 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import os
+import secrets
+import shutil
+import socket
+import time
+import traceback
+from typing import Awaitable, Callable, List, Optional
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import select
+
+from constants.presentation import (
+    DEFAULT_PRESENTATION_QUEUE_MAX_ATTEMPTS,
+    DEFAULT_PRESENTATION_QUEUE_MAX_CONCURRENCY,
+    DEFAULT_PRESENTATION_QUEUE_POLL_INTERVAL,
+    DEFAULT_PRESENTATION_QUEUE_VISIBILITY_TIMEOUT,
+)
+from enums.webhook_event import WebhookEvent
+from models.api_error_model import APIErrorModel
+from models.generate_presentation_request import GeneratePresentationRequest
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from services.concurrent_service import CONCURRENT_SERVICE
+from services.database import async_session_maker
+from services.llm_batch_service import LLM_BATCH_SERVICE
+from services.presentation_generation_checkpoint import (
+    PresentationGenerationCheckpoint,
+)
+from services.prometheus_metrics import PROMETHEUS_METRICS
+from services.tracing import TRACING
+from services.webhook_service import WebhookService
+from utils.get_env import (
+    get_app_data_directory_env,
+    get_presentation_queue_max_attempts_env,
+    get_presentation_queue_max_concurrency_env,
+    get_presentation_queue_poll_interval_env,
+    get_presentation_queue_visibility_timeout_env,
+)
+from utils.parsers import parse_float_or_none, parse_int_or_none
+
+
+def get_lease_time() -> datetime:
+    # Naive UTC, so workers in different time zones agree on lease expiry
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class PresentationGenerationWaiting(Exception):
+    """
+    Raised by a job that submitted slides to a provider batch. Its task waits
+    without a lease and is queued again once the batches have ended.
+    """
+
+
+PresentationGenerationJobHandler = Callable[
+    [AsyncPresentationGenerationTaskModel, AsyncSession], Awaitable[None]
+]
+
+
+class PresentationGenerationQueue:
+    """
+    Durable queue for async presentation generation, stored in the
+    async_presentation_generation_tasks table so it survives restarts and is
+    shared by every process using the same database.
+    A worker leases a job for the visibility timeout and renews the lease
+    while it runs. If the worker dies the lease expires and the job is leased
+    again, so jobs run at least once and at most max attempts times.
+    A running job is cancelled by the worker running it, which checks for
+    cancel requests every poll interval.
+    A job waiting for a provider batch gives up its lease and its task is
+    left waiting, with the batch ids in its checkpoint. Workers check those
+    batches every batch poll interval and queue the task again once they end.
+    Uploaded documents of a task are copied into the app data directory, as
+    upload temp directories are local to a process and deleted on restart.
+    They are deleted once the task completes.
+    """
+
+    def __init__(
+        self, session_maker: async_sessionmaker, files_directory: Optional[str] = None
+    ):
+        self.session_maker = session_maker
+        self._files_directory = files_directory
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{secrets.token_hex(4)}"
+        self._handler: Optional[PresentationGenerationJobHandler] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._running: dict[str, asyncio.Task] = {}
+        self._started: set[str] = set()
+        self._cancelling: set[str] = set()
+        self._lost_leases: set[str] = set()
+        self._batches_checked_at: Optional[float] = None
+        self._wake_up = asyncio.Event()
+
+    @property
+    def max_concurrency(self) -> int:
+        return (
+            parse_int_or_none(get_presentation_queue_max_concurrency_env())
+            or DEFAULT_PRESENTATION_QUEUE_MAX_CONCURRENCY
+        )
+
+    @property
+    def max_attempts(self) -> int:
+        return (
+            parse_int_or_none(get_presentation_queue_max_attempts_env())
+            or DEFAULT_PRESENTATION_QUEUE_MAX_ATTEMPTS
+        )
+
+    @property
+    def visibility_timeout(self) -> float:
+        return (
+            parse_float_or_none(get_presentation_queue_visibility_timeout_env())
+            or DEFAULT_PRESENTATION_QUEUE_VISIBILITY_TIMEOUT
+        )
+
+    @property
+    def poll_interval(self) -> float:
+        return (
+            parse_float_or_none(get_presentation_queue_poll_interval_env())
+            or DEFAULT_PRESENTATION_QUEUE_POLL_INTERVAL
+        )
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    @property
+    def files_directory(self) -> str:
+        if self._files_directory:
+            return self._files_directory
+        return os.path.join(
+            get_app_data_directory_env() or "/tmp/presenton", "queued_files"
+        )
+
+    def get_task_files_directory(self, task_id: str) -> str:
+        return os.path.join(self.files_directory, task_id)
+
+    async def enqueue(
+        self,
+        sql_session: AsyncSession,
+        presentation_id: uuid.UUID,
+        request: GeneratePresentationRequest,
+        priority: int = 0,
+    ) -> AsyncPresentationGenerationTaskModel:
+        task = AsyncPresentationGenerationTaskModel(
+            status="pending",
+            message="Queued for generation",
+            presentation_id=presentation_id,
+            priority=priority,
+        )
+        if request.files:
+            request = request.model_copy(
+                update={
+                    "files": await asyncio.to_thread(
+                        self._store_files, task.id, request.files
+                    )
+                }
+            )
+        task.request = request.model_dump(mode="json")
+        sql_session.add(task)
+        await sql_session.commit()
+        self._wake_up.set()
+        PROMETHEUS_METRICS.record_generation_task("queued")
+        return task
+
+    def _store_files(self, task_id: str, file_paths: List[str]) -> List[str]:
+        """Copies the files of a task to where any worker can read them later."""
+        stored_paths = []
+        for index, file_path in enumerate(file_paths):
+            if not os.path.isfile(file_path):
+                # Fails when the task runs, like it would without the queue
+                stored_paths.append(file_path)
+                continue
+            # One directory per file, uploads in different temp dirs can share names
+            directory = os.path.join(self.get_task_files_directory(task_id), str(index))
+            os.makedirs(directory, exist_ok=True)
+            stored_path = os.path.join(directory, os.path.basename(file_path))
+            shutil.copyfile(file_path, stored_path)
+            stored_paths.append(stored_path)
+        return stored_paths
+
+    def delete_files(self, task_id: str):
+        shutil.rmtree(self.get_task_files_directory(task_id), ignore_errors=True)
+
+    async def requeue(
+        self,
+        sql_session: AsyncSession,
+        task: AsyncPresentationGenerationTaskModel,
+        message: str,
+    ) -> AsyncPresentationGenerationTaskModel:
+        """Queues a finished task again, it keeps its checkpoint and attempts start over."""
+        task.status = "pending"
+        task.message = message
+        task.error = None
+        task.attempts = 0
+        task.cancel_requested = False
+        task.leased_by = None
+        task.lease_expires_at = None
+        task.updated_at = datetime.now()
+        sql_session.add(task)
+        await sql_session.commit()
+        self._wake_up.set()
+        PROMETHEUS_METRICS.record_generation_task("resumed")
+        return task
+
+    async def cancel(
+        self,
+        sql_session: AsyncSession,
+        task: AsyncPresentationGenerationTaskModel,
+    ) -> bool:
+        """
+        Cancels a pending, waiting or processing task. A pending or waiting task
+        is cancelled right away, a processing one once its worker sees the
+        request.
+        Returns False if the task had already finished.
+        """
+        if task.status in ["pending", "waiting"]:
+            values = self._get_cancelled_values()
+        else:
+            values = {
+                "cancel_requested": True,
+                "message": "Cancelling presentation generation",
+            }
+
+        result = await sql_session.execute(
+            update(AsyncPresentationGenerationTaskModel)
+            .where(
+                AsyncPresentationGenerationTaskModel.id == task.id,
+                AsyncPresentationGenerationTaskModel.status == task.status,
+                AsyncPresentationGenerationTaskModel.status.in_(
+                    ["pending", "waiting", "processing"]
+                ),
+            )
+            .values(**values, updated_at=datetime.now())
+        )
+        await sql_session.commit()
+        await sql_session.refresh(task)
+        if result.rowcount != 1:
+            return False
+
+        if task.status == "cancelled":
+            PROMETHEUS_METRICS.record_generation_task("cancelled")
+            await self._cancel_unused_batches(task.id)
+        self._cancel_job(task.id)
+        return True
+
+    async def lease(self, limit: int) -> List[str]:
+        """
+        Leases up to limit jobs, highest priority and oldest first.
+        Returns the ids of the leased tasks.
+        """
+        now = datetime.now()
+        lease_time = get_lease_time()
+        leased = []
+        async with self.session_maker() as session:
+            candidates = await session.scalars(
+                select(AsyncPresentationGenerationTaskModel)
+                .where(
+                    or_(
+                        AsyncPresentationGenerationTaskModel.status == "pending",
+                        and_(
+                            AsyncPresentationGenerationTaskModel.status
+                            == "processing",
+                            AsyncPresentationGenerationTaskModel.lease_expires_at
+                            < lease_time,
+                        ),
+                    )
+                )
+                .order_by(
+                    AsyncPresentationGenerationTaskModel.priority.desc(),
+                    AsyncPresentationGenerationTaskModel.created_at,
+                )
+                .limit(limit * 2)
+            )
+
+            # Read plain values up front, the tasks may expire on commit
+            candidates = [
+                (
+                    task.id,
+                    task.status,
+                    task.attempts,
+                    task.request is None,
+                    task.cancel_requested,
+                )
+                for task in candidates.all()
+            ]
+            for (
+                task_id,
+                status,
+                attempts,
+                has_no_request,
+                cancel_requested,
+            ) in candidates:
+                if len(leased) >= limit:
+                    break
+
+                error = None
+                if has_no_request:
+                    error = "Task was queued before a restart and can't be resumed"
+                elif (attempts or 0) >= self.max_attempts:
+                    error = "Presentation generation was interrupted too many times"
+
+                if cancel_requested:
+                    # Its worker stopped before it could cancel the job
+                    values = self._get_cancelled_values()
+                elif error:
+                    values = {
+                        "status": "error",
+                        "message": "Presentation generation failed",
+                        "error": APIErrorModel.from_exception(
+                            HTTPException(status_code=500, detail=error)
+                        ).model_dump(mode="json"),
+                        "leased_by": None,
+                        "lease_expires_at": None,
+                    }
+                else:
+                    values = {
+                        "status": "processing",
+                        "attempts": (attempts or 0) + 1,
+                        "leased_by": self.worker_id,
+                        "lease_expires_at": lease_time
+                        + timedelta(seconds=self.visibility_timeout),
+                    }
+
+                # Every lease changes attempts, so this only matches if no other
+                # worker leased the task since it was selected
+                result = await session.execute(
+                    update(AsyncPresentationGenerationTaskModel)
+                    .where(
+                        AsyncPresentationGenerationTaskModel.id == task_id,
+                        AsyncPresentationGenerationTaskModel.status == status,
+                        (
+                            AsyncPresentationGenerationTaskModel.attempts.is_(None)
+                            if attempts is None
+                            else AsyncPresentationGenerationTaskModel.attempts
+                            == attempts
+                        ),
+                    )
+                    .values(**values, updated_at=now)
+                )
+                await session.commit()
+                if result.rowcount != 1:
+                    continue
+
+                if cancel_requested:
+                    PROMETHEUS_METRICS.record_generation_task("cancelled")
+                    await self._cancel_unused_batches(task_id)
+                elif error:
+                    PROMETHEUS_METRICS.record_generation_task("failed")
+                    CONCURRENT_SERVICE.run_task(
+                        None,
+                        WebhookService.send_webhook,
+                        WebhookEvent.PRESENTATION_GENERATION_FAILED,
+                        values["error"],
+                    )
+                else:
+                    leased.append(task_id)
+
+        return leased
+
+    async def renew_lease(self, task_id: str) -> bool:
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(AsyncPresentationGenerationTaskModel)
+                .where(
+                    AsyncPresentationGenerationTaskModel.id == task_id,
+                    AsyncPresentationGenerationTaskModel.leased_by == self.worker_id,
+                )
+                .values(
+                    lease_expires_at=get_lease_time()
+                    + timedelta(seconds=self.visibility_timeout)
+                )
+            )
+            await session.commit()
+            return result.rowcount == 1
+
+    async def save_final_status(
+        self, sql_session: AsyncSession, task: AsyncPresentationGenerationTaskModel
+    ) -> bool:
+        """
+        Writes the final status set on a running task, unless the task was
+        leased by another worker after this one lost its lease.
+        Returns whether it was written.
+        """
+        values = {
+            "status": task.status,
+            "message": task.message,
+            "data": task.data,
+            "error": task.error,
+            "metrics": task.metrics,
+            "updated_at": task.updated_at,
+        }
+        task_id, leased_by = task.id, task.leased_by
+        # Pending changes of the task are written by the update below or not at all
+        sql_session.expire(task)
+        result = await sql_session.execute(
+            update(AsyncPresentationGenerationTaskModel)
+            .where(
+                AsyncPresentationGenerationTaskModel.id == task_id,
+                AsyncPresentationGenerationTaskModel.leased_by == leased_by,
+            )
+            .values(**values)
+        )
+        await sql_session.commit()
+        await sql_session.refresh(task)
+        if result.rowcount != 1:
+            print(f"Task {task_id} was leased by another worker, not saving its status")
+            return False
+        # Failed and cancelled tasks keep their files, they can be resumed
+        if values["status"] == "completed":
+            await asyncio.to_thread(self.delete_files, task_id)
+        return True
+
+    async def release(self, task_id: str, interrupted: bool = False):
+        """
+        Gives up the lease on a job. A job that didn't reach a final status is
+        queued again, an interrupted one without using up an attempt.
+        """
+        async with self.session_maker() as session:
+            requeue_values = {"status": "pending"}
+            if interrupted:
+                requeue_values["attempts"] = (
+                    AsyncPresentationGenerationTaskModel.attempts - 1
+                )
+            await session.execute(
+                update(AsyncPresentationGenerationTaskModel)
+                .where(
+                    AsyncPresentationGenerationTaskModel.id == task_id,
+                    AsyncPresentationGenerationTaskModel.leased_by == self.worker_id,
+                    AsyncPresentationGenerationTaskModel.status == "processing",
+                )
+                .values(**requeue_values)
+            )
+            await session.execute(
+                update(AsyncPresentationGenerationTaskModel)
+                .where(
+                    AsyncPresentationGenerationTaskModel.id == task_id,
+                    AsyncPresentationGenerationTaskModel.leased_by == self.worker_id,
+                )
+                .values(leased_by=None, lease_expires_at=None)
+            )
+            await session.commit()
+
+    async def wait_for_batches(self, task_id: str, message: str) -> bool:
+        """
+        Gives up the lease on a job waiting for provider batches without using
+        up an attempt. Returns False if the task was leased by another worker
+        or asked to cancel, it's then released as usual.
+        """
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(AsyncPresentationGenerationTaskModel)
+                .where(
+                    AsyncPresentationGenerationTaskModel.id == task_id,
+                    AsyncPresentationGenerationTaskModel.leased_by == self.worker_id,
+                    AsyncPresentationGenerationTaskModel.status == "processing",
+                    AsyncPresentationGenerationTaskModel.cancel_requested == False,
+                )
+                .values(
+                    status="waiting",
+                    message=message,
+                    attempts=AsyncPresentationGenerationTaskModel.attempts - 1,
+                    leased_by=None,
+                    lease_expires_at=None,
+                    updated_at=datetime.now(),
+                )
+            )
+            await session.commit()
+            return result.rowcount == 1
+
+    async def _queue_tasks_with_ended_batches(self):
+        """Queues waiting tasks again once every batch they wait for has ended."""
+        now = time.monotonic()
+        if (
+            self._batches_checked_at is not None
+            and now - self._batches_checked_at < LLM_BATCH_SERVICE.poll_interval
+        ):
+            return
+        self._batches_checked_at = now
+
+        async with self.session_maker() as session:
+            tasks = await session.scalars(
+                select(AsyncPresentationGenerationTaskModel).where(
+                    AsyncPresentationGenerationTaskModel.status == "waiting"
+                )
+            )
+            waiting = [
+                (task.id, PresentationGenerationCheckpoint(task).get_batch_requests())
+                for task in tasks.all()
+            ]
+
+        for task_id, batch_requests in waiting:
+            batches = {each["batch_id"]: each for each in batch_requests}
+            if not all(
+                [
+                    await LLM_BATCH_SERVICE.is_batch_done(batch_request)
+                    for batch_request in batches.values()
+                ]
+            ):
+                continue
+            async with self.session_maker() as session:
+                result = await session.execute(
+                    update(AsyncPresentationGenerationTaskModel)
+                    .where(
+                        AsyncPresentationGenerationTaskModel.id == task_id,
+                        AsyncPresentationGenerationTaskModel.status == "waiting",
+                    )
+                    .values(
+                        status="pending",
+                        message="Queued for resuming with batch API results",
+                        updated_at=datetime.now(),
+                    )
+                )
+                await session.commit()
+            if result.rowcount == 1:
+                self._wake_up.set()
+
+    async def _cancel_unused_batches(self, task_id: str):
+        """
+        Cancels the provider batches of a cancelled task, unless another
+        unfinished task still needs their results.
+        """
+        try:
+            async with self.session_maker() as session:
+                task = await session.get(AsyncPresentationGenerationTaskModel, task_id)
+                batches = {
+                    each["batch_id"]: each
+                    for each in PresentationGenerationCheckpoint(
+                        task
+                    ).get_batch_requests()
+                }
+                if not batches:
+                    return
+                others = await session.scalars(
+                    select(AsyncPresentationGenerationTaskModel).where(
+                        AsyncPresentationGenerationTaskModel.id != task_id,
+                        AsyncPresentationGenerationTaskModel.status.in_(
+                            ["pending", "waiting", "processing"]
+                        ),
+                    )
+                )
+                for other in others.all():
+                    for each in PresentationGenerationCheckpoint(
+                        other
+                    ).get_batch_requests():
+                        batches.pop(each["batch_id"], None)
+
+            for batch_request in batches.values():
+                if not await LLM_BATCH_SERVICE.is_batch_done(batch_request):
+                    await LLM_BATCH_SERVICE.cancel_batch(batch_request)
+        except Exception:
+            traceback.print_exc()
+
+    async def _mark_cancelled(self, task_id: str):
+        async with self.session_maker() as session:
+            await session.execute(
+                update(AsyncPresentationGenerationTaskModel)
+                .where(
+                    AsyncPresentationGenerationTaskModel.id == task_id,
+                    AsyncPresentationGenerationTaskModel.status == "processing",
+                )
+                .values(**self._get_cancelled_values(), updated_at=datetime.now())
+            )
+            await session.commit()
+
+    def _get_cancelled_values(self) -> dict:
+        return {
+            "status": "cancelled",
+            "message": "Presentation generation cancelled",
+            "cancel_requested": False,
+            "leased_by": None,
+            "lease_expires_at": None,
+        }
+
+    def start(self, handler: PresentationGenerationJobHandler):
+        """Starts leasing and running jobs in this process."""
+        if self._loop_task:
+            return
+        self._handler = handler
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops leasing and hands running jobs back to the queue."""
+        if not self._loop_task:
+            return
+        # The loop is not cancelled, a lease cut off mid write can leave sqlite locked
+        self._stopping = True
+        self._wake_up.set()
+        await self._loop_task
+
+        running = list(self._running.items())
+        for _, job in running:
+            job.cancel()
+        await asyncio.gather(*[job for _, job in running], return_exceptions=True)
+        for task_id, _ in running:
+            await self.release(task_id, interrupted=True)
+        self._loop_task = None
+        self._stopping = False
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await self._cancel_requested_jobs()
+            except Exception:
+                traceback.print_exc()
+
+            try:
+                await self._queue_tasks_with_ended_batches()
+            except Exception:
+                traceback.print_exc()
+
+            available = self.max_concurrency - self.running
+            if available > 0:
+                try:
+                    for task_id in await self.lease(available):
+                        self._start_job(task_id)
+                except Exception:
+                    traceback.print_exc()
+
+            if self._stopping:
+                break
+            self._wake_up.clear()
+            try:
+                await asyncio.wait_for(self._wake_up.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _cancel_requested_jobs(self):
+        """Cancels running jobs that were asked to stop through another process."""
+        if not self._running:
+            return
+        async with self.session_maker() as session:
+            task_ids = await session.scalars(
+                select(AsyncPresentationGenerationTaskModel.id).where(
+                    AsyncPresentationGenerationTaskModel.id.in_(list(self._running)),
+                    AsyncPresentationGenerationTaskModel.cancel_requested == True,
+                )
+            )
+            for task_id in task_ids.all():
+                self._cancel_job(task_id)
+
+    def _cancel_job(self, task_id: str):
+        job = self._running.get(task_id)
+        if not job or task_id in self._cancelling:
+            return
+        # Cancelling the job cancels every slide, image and export call it awaits,
+        # freeing their provider slots right away
+        self._cancelling.add(task_id)
+        # A job that hasn't started yet would never see the cancellation,
+        # it checks for it when it starts instead
+        if task_id in self._started:
+            job.cancel()
+
+    def _start_job(self, task_id: str):
+        job = asyncio.create_task(self._run_job(task_id))
+        self._running[task_id] = job
+
+        def on_job_done(_: asyncio.Task):
+            self._running.pop(task_id, None)
+            self._started.discard(task_id)
+            self._cancelling.discard(task_id)
+            self._lost_leases.discard(task_id)
+            self._wake_up.set()
+
+        job.add_done_callback(on_job_done)
+
+    async def _run_job(self, task_id: str):
+        print(f"Running presentation generation task: {task_id}")
+        PROMETHEUS_METRICS.record_generation_task("started")
+        self._started.add(task_id)
+        job_done = asyncio.Event()
+        waiting: Optional[PresentationGenerationWaiting] = None
+        heartbeat = asyncio.create_task(
+            self._renew_lease_periodically(task_id, job_done)
+        )
+        try:
+            if task_id in self._cancelling:
+                raise asyncio.CancelledError()
+            with TRACING.span(
+                "presentation_generation.job",
+                task_id=task_id,
+                worker_id=self.worker_id,
+            ):
+                async with self.session_maker() as session:
+                    task = await session.get(
+                        AsyncPresentationGenerationTaskModel, task_id
+                    )
+                    await self._handler(task, session)
+        except asyncio.CancelledError:
+            if task_id not in self._cancelling and task_id not in self._lost_leases:
+                raise
+        except PresentationGenerationWaiting as e:
+            waiting = e
+        except Exception:
+            traceback.print_exc()
+        finally:
+            # Not cancelled for the same reason as the loop in stop
+            job_done.set()
+            await heartbeat
+
+        if task_id in self._lost_leases:
+            # Another worker may be running it, the task is theirs now
+            print(f"Stopped presentation generation task with a lost lease: {task_id}")
+            return
+        if task_id in self._cancelling:
+            print(f"Cancelled presentation generation task: {task_id}")
+            PROMETHEUS_METRICS.record_generation_task("cancelled")
+            await self._mark_cancelled(task_id)
+            await self._cancel_unused_batches(task_id)
+        elif waiting and await self.wait_for_batches(task_id, str(waiting)):
+            print(f"Presentation generation task is waiting for batches: {task_id}")
+            return
+        await self.release(task_id)
+
+    async def _renew_lease_periodically(self, task_id: str, job_done: asyncio.Event):
+        while True:
+            try:
+                await asyncio.wait_for(job_done.wait(), self.visibility_timeout / 3)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if not await self.renew_lease(task_id):
+                    self._lose_lease(task_id)
+                    return
+            except Exception:
+                traceback.print_exc()
+
+    def _lose_lease(self, task_id: str):
+        """
+        Stops a job whose lease expired and was taken over or cleared, so two
+        workers don't generate the same presentation.
+        """
+        job = self._running.get(task_id)
+        if not job:
+            return
+        self._lost_leases.add(task_id)
+        job.cancel()
+
+
+PRESENTATION_GENERATION_QUEUE = PresentationGenerationQueue(async_session_maker)
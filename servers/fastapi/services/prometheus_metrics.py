@@ -0,0 +1,253 @@
+import asyncio
+from contextlib import contextmanager
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from services.llm_usage_tracker import LLMUsage
+from utils.get_env import get_prometheus_metrics_env
+from utils.parsers import parse_bool_or_none
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        start_http_server,
+    )
+
+    PROMETHEUS_CLIENT_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_CLIENT_AVAILABLE = False
+
+
+REQUEST_DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+PROVIDER_DURATION_BUCKETS = (0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+GENERATION_DURATION_BUCKETS = (5, 10, 30, 60, 120, 180, 300, 600, 1200, 1800, 3600)
+
+
+def is_prometheus_metrics_enabled() -> bool:
+    return PROMETHEUS_CLIENT_AVAILABLE and (
+        parse_bool_or_none(get_prometheus_metrics_env()) or False
+    )
+
+
+def get_call_status(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "success"
+    # A stream closed early by its consumer raises GeneratorExit
+    if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+        return "cancelled"
+    return "error"
+
+
+class PrometheusMetrics:
+    """
+    Prometheus histograms, counters and gauges of the server, enabled with
+    PROMETHEUS_METRICS when prometheus_client is installed.
+    While disabled every method is a no-op.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = is_prometheus_metrics_enabled() if enabled is None else enabled
+        if not self.enabled:
+            return
+
+        self.registry = CollectorRegistry()
+
+        self.http_request_duration = Histogram(
+            "presenton_http_request_duration_seconds",
+            "Duration of HTTP requests until the response starts",
+            ["method", "route", "status"],
+            buckets=REQUEST_DURATION_BUCKETS,
+            registry=self.registry,
+        )
+        self.http_requests_in_flight = Gauge(
+            "presenton_http_requests_in_flight",
+            "HTTP requests being handled",
+            registry=self.registry,
+        )
+
+        self.llm_request_duration = Histogram(
+            "presenton_llm_request_duration_seconds",
+            "Duration of LLM calls, streams until their last chunk",
+            ["provider", "model", "status"],
+            buckets=PROVIDER_DURATION_BUCKETS,
+            registry=self.registry,
+        )
+        self.llm_tokens = Counter(
+            "presenton_llm_tokens",
+            "LLM tokens used, input includes cached input",
+            ["provider", "model", "type"],
+            registry=self.registry,
+        )
+
+        self.image_generation_duration = Histogram(
+            "presenton_image_generation_duration_seconds",
+            "Duration of image generation and stock image searches",
+            ["provider", "status"],
+            buckets=PROVIDER_DURATION_BUCKETS,
+            registry=self.registry,
+        )
+        self.export_duration = Histogram(
+            "presenton_export_duration_seconds",
+            "Duration of presentation exports",
+            ["format", "status"],
+            buckets=PROVIDER_DURATION_BUCKETS,
+            registry=self.registry,
+        )
+
+        self.generations_in_flight = Gauge(
+            "presenton_presentation_generations_in_flight",
+            "Presentations being generated by this process",
+            registry=self.registry,
+        )
+        self.generation_duration = Histogram(
+            "presenton_presentation_generation_duration_seconds",
+            "Duration of presentation generation including export",
+            ["status"],
+            buckets=GENERATION_DURATION_BUCKETS,
+            registry=self.registry,
+        )
+        self.generation_stage_duration = Histogram(
+            "presenton_presentation_generation_stage_duration_seconds",
+            "Wall clock duration of each presentation generation stage",
+            ["stage"],
+            buckets=PROVIDER_DURATION_BUCKETS,
+            registry=self.registry,
+        )
+        self.generation_tasks = Counter(
+            "presenton_presentation_generation_tasks",
+            "Async presentation generation task events",
+            ["event"],
+            registry=self.registry,
+        )
+        self.queue_depth = Gauge(
+            "presenton_presentation_generation_queue_depth",
+            "Async presentation generation tasks waiting or running",
+            ["status"],
+            registry=self.registry,
+        )
+
+        self.db_connections_in_use = Gauge(
+            "presenton_db_connections_in_use",
+            "Database connections checked out by sessions",
+            registry=self.registry,
+        )
+
+    def observe_http_request(
+        self, method: str, route: str, status_code: int, duration: float
+    ):
+        if not self.enabled:
+            return
+        self.http_request_duration.labels(method, route, str(status_code)).observe(
+            duration
+        )
+
+    def time_llm_request(self, provider: str, model: str):
+        return self._time_call("llm_request_duration", provider, model)
+
+    def record_llm_tokens(self, provider: str, model: str, usage: LLMUsage):
+        if not self.enabled:
+            return
+        for token_type, value in (
+            ("input", usage.input_tokens),
+            ("output", usage.output_tokens),
+            ("cached_input", usage.cached_input_tokens),
+        ):
+            if value:
+                self.llm_tokens.labels(provider, model, token_type).inc(value)
+
+    def time_image_generation(self, provider: str):
+        return self._time_call("image_generation_duration", provider)
+
+    def time_export(self, export_as: str):
+        return self._time_call("export_duration", export_as)
+
+    @contextmanager
+    def track_generation(self):
+        if not self.enabled:
+            yield
+            return
+        self.generations_in_flight.inc()
+        try:
+            yield
+        finally:
+            self.generations_in_flight.dec()
+
+    def record_generation(self, metrics: dict, failed: bool = False):
+        """Records a finished generation from its PresentationGenerationMetrics.to_dict()."""
+        if not self.enabled:
+            return
+        self.generation_duration.labels("failed" if failed else "completed").observe(
+            metrics["duration"]
+        )
+        for stage, stage_metrics in metrics["stages"].items():
+            self.generation_stage_duration.labels(stage).observe(
+                stage_metrics["duration"]
+            )
+
+    def record_generation_task(self, event_name: str):
+        """Counts queued, started, completed, failed, cancelled and resumed tasks."""
+        if not self.enabled:
+            return
+        self.generation_tasks.labels(event_name).inc()
+
+    def set_queue_depth(self, counts: dict[str, int]):
+        if not self.enabled:
+            return
+        for status in ("pending", "processing"):
+            self.queue_depth.labels(status).set(counts.get(status, 0))
+
+    def instrument_engine(self, engine: AsyncEngine):
+        """Tracks connections checked out from the pool of the engine."""
+        if not self.enabled:
+            return
+
+        def on_checkout(*_):
+            self.db_connections_in_use.inc()
+
+        def on_checkin(*_):
+            self.db_connections_in_use.dec()
+
+        event.listen(engine.sync_engine, "checkout", on_checkout)
+        event.listen(engine.sync_engine, "checkin", on_checkin)
+
+    @contextmanager
+    def _time_call(self, histogram_name: str, *labels: str):
+        """Observes the duration of the block with its labels and status."""
+        if not self.enabled:
+            yield
+            return
+        started_at = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            getattr(self, histogram_name).labels(
+                *labels, get_call_status(error)
+            ).observe(time.perf_counter() - started_at)
+
+    def start_http_server(self, port: int):
+        """Serves /metrics on its own port, for processes without the API."""
+        if not self.enabled:
+            return
+        start_http_server(port, registry=self.registry)
+
+    def generate_latest(self) -> bytes:
+        return generate_latest(self.registry)
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPE_LATEST
+
+
+PROMETHEUS_METRICS = PrometheusMetrics()
@@ -1,16 +1,43 @@
+import glob
 import os
+import shutil
+import socket
+import threading
 from typing import Optional, Union
 
 from utils.get_env import get_temp_directory_env
 import uuid
 
 
+def is_process_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running as another user
+        return True
+    return True
+
+
 class TempFileService:
+    """
+    API and worker processes on a host share TEMP_DIRECTORY, so each one keeps
+    its temp files in a directory of its own, named after the host and its
+    process id. Directories of stopped processes are deleted on startup.
+    """
 
     def __init__(self):
-        self.base_dir = get_temp_directory_env() or "/tmp/presenton"
-        self.cleanup_base_dir()
-        os.makedirs(self.base_dir, exist_ok=True)
+        self.root_dir = get_temp_directory_env() or "/tmp/presenton"
+
+    @property
+    def process_dir_prefix(self) -> str:
+        return f"process-{socket.gethostname()}-"
+
+    @property
+    def base_dir(self) -> str:
+        # Read on every use, a forked process gets its own directory
+        return os.path.join(self.root_dir, f"{self.process_dir_prefix}{os.getpid()}")
 
     def create_dir_in_dir(self, base_dir: str, dir_name: Optional[str] = None) -> str:
         temp_dir = os.path.join(base_dir, dir_name if dir_name else str(uuid.uuid4()))
@@ -66,5 +93,43 @@ class TempFileService:
     def cleanup_base_dir(self):
         self.cleanup_temp_dir(self.base_dir)
 
+    def move_aside_base_dir(self):
+        """
+        Renames temp files left by an earlier process with the same id out of
+        the way, so they can be deleted by cleanup_old_base_dirs without holding
+        up startup.
+        """
+        if os.path.exists(self.base_dir):
+            old_dir = f"{self.old_base_dir_prefix}{uuid.uuid4().hex}"
+            try:
+                os.rename(self.base_dir, old_dir)
+            except OSError:
+                # e.g. the directory is a mount point
+                self.delete_dir_files(self.base_dir)
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    @property
+    def old_base_dir_prefix(self) -> str:
+        return f"{self.base_dir}.old-"
+
+    def cleanup_old_base_dirs(self):
+        """
+        Deletes moved aside directories and those of processes on this host
+        that stopped. Directories of other hosts sharing TEMP_DIRECTORY are
+        left to them.
+        """
+        prefix = self.process_dir_prefix
+        for each in glob.glob(os.path.join(glob.escape(self.root_dir), f"{prefix}*")):
+            pid = os.path.basename(each)[len(prefix) :]
+            if pid.isdigit() and is_process_running(int(pid)):
+                continue
+            # Other processes may be deleting it at the same time
+            shutil.rmtree(each, ignore_errors=True)
+
+    def cleanup_old_base_dirs_in_background(self):
+        threading.Thread(
+            target=self.cleanup_old_base_dirs, name="temp-files-cleanup", daemon=True
+        ).start()
+
 
 TEMP_FILE_SERVICE = TempFileService()
@@ -0,0 +1,180 @@
+from contextlib import contextmanager
+import json
+import os
+import threading
+from typing import Any, Optional, Sequence
+
+from utils.get_env import (
+    get_app_data_directory_env,
+    get_tracing_exporter_env,
+    get_tracing_file_env,
+)
+
+try:
+    from opentelemetry import context as context_api, propagate, trace
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SpanExporter,
+        SpanExportResult,
+    )
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+
+    OPENTELEMETRY_AVAILABLE = True
+except ImportError:
+    OPENTELEMETRY_AVAILABLE = False
+
+
+if OPENTELEMETRY_AVAILABLE:
+
+    class FileSpanExporter(SpanExporter):
+        """Appends finished spans to a file, one JSON object per line."""
+
+        def __init__(self, path: str):
+            self.path = path
+            self._lock = threading.Lock()
+
+        def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+            lines = "".join(
+                json.dumps(json.loads(span.to_json())) + "\n" for span in spans
+            )
+            try:
+                with self._lock, open(self.path, "a") as file:
+                    file.write(lines)
+            except OSError as e:
+                print(f"Failed to write traces to {self.path}: {e}")
+                return SpanExportResult.FAILURE
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+
+class Tracing:
+    """
+    OpenTelemetry tracing of presentation generation, from the API request
+    through LLM and image providers to the Next.js export.
+    Enabled with TRACING_EXPORTER (otlp, file or console) when the
+    OpenTelemetry SDK is installed, every span is a no-op otherwise.
+    """
+
+    def __init__(self):
+        self._provider = None
+        self._tracer = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._tracer is not None
+
+    def setup(self, service_name: str = "presenton-api"):
+        """Starts exporting spans of this process, if tracing is configured."""
+        if self._provider or not OPENTELEMETRY_AVAILABLE:
+            return
+        exporter = self._get_exporter()
+        if not exporter:
+            return
+
+        provider = TracerProvider(
+            resource=Resource.create(
+                {SERVICE_NAME: os.getenv("OTEL_SERVICE_NAME") or service_name}
+            )
+        )
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        self._provider = provider
+        self._tracer = provider.get_tracer("presenton")
+        print(f"Exporting traces with {exporter.__class__.__name__}")
+
+    def shutdown(self):
+        if self._provider:
+            self._provider.shutdown()
+        self._provider = None
+        self._tracer = None
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: Optional[str] = None,
+        current: bool = True,
+        **attributes: Any,
+    ):
+        """
+        Runs the block in a span, a child of the current one.
+        Spans around async generators can't be current, the generator's caller
+        would see them between chunks, so they pass current=False.
+        Exceptions, except cancellation, mark the span as failed.
+        """
+        if not self._tracer:
+            yield None
+            return
+        span = self._tracer.start_span(
+            name,
+            kind=getattr(SpanKind, kind.upper()) if kind else SpanKind.INTERNAL,
+            attributes={
+                key: value for key, value in attributes.items() if value is not None
+            },
+        )
+        token = (
+            context_api.attach(trace.set_span_in_context(span)) if current else None
+        )
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            raise
+        finally:
+            if token is not None:
+                context_api.detach(token)
+            span.end()
+
+    @contextmanager
+    def server_span(self, name: str, headers: dict, **attributes: Any):
+        """Span of an incoming request, continuing the trace of its caller."""
+        if not self._tracer:
+            yield None
+            return
+        token = context_api.attach(propagate.extract(headers))
+        try:
+            with self.span(name, kind="server", **attributes) as span:
+                yield span
+        finally:
+            context_api.detach(token)
+
+    def get_propagation_headers(self) -> dict:
+        """Headers carrying the current trace to another service."""
+        headers = {}
+        if self._tracer:
+            propagate.inject(headers)
+        return headers
+
+    def _get_exporter(self):
+        exporter = (get_tracing_exporter_env() or "").lower()
+        if exporter == "otlp":
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                    OTLPSpanExporter,
+                )
+            except ImportError:
+                print(
+                    "TRACING_EXPORTER is otlp but opentelemetry-exporter-otlp-proto-http "
+                    "is not installed"
+                )
+                return None
+            # Endpoint comes from OTEL_EXPORTER_OTLP_ENDPOINT, localhost:4318 by default
+            return OTLPSpanExporter()
+        if exporter == "file":
+            return FileSpanExporter(
+                get_tracing_file_env()
+                or os.path.join(
+                    get_app_data_directory_env() or "/tmp/presenton", "traces.jsonl"
+                )
+            )
+        if exporter == "console":
+            return ConsoleSpanExporter()
+        return None
+
+
+TRACING = Tracing()
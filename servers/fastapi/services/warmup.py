@@ -0,0 +1,86 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+
+from utils.get_env import get_warmup_on_startup_env
+from utils.parsers import parse_bool_or_none
+
+
+class SubsystemWarmup(BaseModel):
+    # cold, warming, warm or failed
+    status: str = "cold"
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+class Warmup:
+    """
+    Subsystems that are slow to load, like the icon search model, load on
+    first use. After startup they are loaded one by one in a background task,
+    so the server answers right away and the first requests don't wait on them.
+    """
+
+    def __init__(self):
+        self._loaders: dict[str, Callable[[], None]] = {}
+        self.subsystems: dict[str, SubsystemWarmup] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def is_enabled(self) -> bool:
+        enabled = parse_bool_or_none(get_warmup_on_startup_env())
+        return True if enabled is None else enabled
+
+    def register(self, name: str, load: Callable[[], None]):
+        """Adds a subsystem, load runs in a thread and must be safe to repeat."""
+        self._loaders[name] = load
+        self.subsystems[name] = SubsystemWarmup()
+
+    def start(self):
+        if self._task is None and self.is_enabled():
+            self._task = asyncio.create_task(self._warm_up())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def finished(self) -> bool:
+        return all(
+            each.status in ("warm", "failed") for each in self.subsystems.values()
+        )
+
+    def is_ready(self) -> bool:
+        # Without warm-up every subsystem loads on first use
+        return self.finished or not self.is_enabled()
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "subsystems": {
+                name: each.model_dump() for name, each in self.subsystems.items()
+            },
+        }
+
+    async def _warm_up(self):
+        for name, load in self._loaders.items():
+            subsystem = self.subsystems[name]
+            subsystem.status = "warming"
+            started_at = time.perf_counter()
+            try:
+                await asyncio.to_thread(load)
+                subsystem.status = "warm"
+            except Exception as e:
+                print(f"Failed to warm up {name}: {e}")
+                subsystem.status = "failed"
+                subsystem.error = str(e)
+            subsystem.duration = round(time.perf_counter() - started_at, 3)
+
+
+WARMUP = Warmup()
@@ -0,0 +1,272 @@
+"""
+Local stand in for the OpenAI Batch and Anthropic Message Batches APIs.
+Batches finish after a few polls and every request is answered with a
+minimal object that satisfies its JSON schema.
+
+Run standalone with:
+    python -m tests.stubs.llm_batch_server --port 8765
+and point OPENAI_BASE_URL to http://127.0.0.1:8765/v1 or
+ANTHROPIC_BASE_URL to http://127.0.0.1:8765.
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import PlainTextResponse
+import uvicorn
+
+
+def sample_from_schema(schema: dict, root: dict = None):
+    root = root or schema
+    if "$ref" in schema:
+        ref = schema["$ref"].split("/")[-1]
+        return sample_from_schema(
+            root.get("$defs", root.get("definitions", {}))[ref], root
+        )
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            return sample_from_schema(schema[key][0], root)
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = schema_type[0]
+    if schema_type == "object":
+        return {
+            key: sample_from_schema(value, root)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return [
+            sample_from_schema(schema.get("items", {}), root)
+            for _ in range(schema.get("minItems", 1))
+        ]
+    if schema_type == "string":
+        return "stub".ljust(schema.get("minLength", 0), ".")
+    if schema_type in ("integer", "number"):
+        return schema.get("minimum", 0)
+    if schema_type == "boolean":
+        return False
+    return None
+
+
+class StubBatchState:
+    def __init__(self, polls_until_done: int = 1):
+        self.polls_until_done = polls_until_done
+        self.files: dict[str, str] = {}
+        self.openai_batches: dict[str, dict] = {}
+        self.anthropic_batches: dict[str, dict] = {}
+        self.anthropic_requests: dict[str, list] = {}
+        self.polls: dict[str, int] = {}
+
+    def is_done(self, batch_id: str) -> bool:
+        self.polls[batch_id] = self.polls.get(batch_id, 0) + 1
+        return self.polls[batch_id] > self.polls_until_done
+
+
+def create_app(polls_until_done: int = 1) -> FastAPI:
+    app = FastAPI()
+    state = StubBatchState(polls_until_done)
+    app.state.batches = state
+
+    # ? OpenAI
+    @app.post("/v1/files")
+    async def create_file(file: UploadFile = File(...), purpose: str = Form(...)):
+        file_id = f"file-{uuid.uuid4().hex}"
+        state.files[file_id] = (await file.read()).decode("utf-8")
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(state.files[file_id]),
+            "created_at": int(time.time()),
+            "filename": file.filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    @app.get("/v1/files/{file_id}/content")
+    async def get_file_content(file_id: str):
+        if file_id not in state.files:
+            raise HTTPException(status_code=404)
+        return PlainTextResponse(state.files[file_id])
+
+    @app.post("/v1/batches")
+    async def create_openai_batch(request: Request):
+        body = await request.json()
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        state.openai_batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"],
+            "completion_window": body["completion_window"],
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+        }
+        return state.openai_batches[batch_id]
+
+    @app.get("/v1/batches/{batch_id}")
+    async def get_openai_batch(batch_id: str):
+        batch = state.openai_batches[batch_id]
+        if batch["status"] == "in_progress" and state.is_done(batch_id):
+            output_lines = []
+            for line in state.files[batch["input_file_id"]].splitlines():
+                request = json.loads(line)
+                response_format = request["body"]["response_format"]
+                content = sample_from_schema(response_format["json_schema"]["schema"])
+                output_lines.append(
+                    json.dumps(
+                        {
+                            "id": f"batch_req_{uuid.uuid4().hex}",
+                            "custom_id": request["custom_id"],
+                            "response": {
+                                "status_code": 200,
+                                "body": {
+                                    "choices": [
+                                        {
+                                            "index": 0,
+                                            "message": {
+                                                "role": "assistant",
+                                                "content": json.dumps(content),
+                                            },
+                                        }
+                                    ],
+                                    "usage": {
+                                        "prompt_tokens": 100,
+                                        "completion_tokens": 10,
+                                        "total_tokens": 110,
+                                    },
+                                },
+                            },
+                            "error": None,
+                        }
+                    )
+                )
+            output_file_id = f"file-{uuid.uuid4().hex}"
+            state.files[output_file_id] = "\n".join(output_lines)
+            batch["status"] = "completed"
+            batch["output_file_id"] = output_file_id
+        return batch
+
+    @app.post("/v1/batches/{batch_id}/cancel")
+    async def cancel_openai_batch(batch_id: str):
+        state.openai_batches[batch_id]["status"] = "cancelled"
+        return state.openai_batches[batch_id]
+
+    # ? Anthropic
+    @app.post("/v1/messages/batches")
+    async def create_anthropic_batch(request: Request):
+        body = await request.json()
+        batch_id = f"msgbatch_{uuid.uuid4().hex}"
+        state.anthropic_requests[batch_id] = body["requests"]
+        state.anthropic_batches[batch_id] = {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "in_progress",
+            "request_counts": {
+                "processing": len(body["requests"]),
+                "succeeded": 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": "2025-01-01T00:00:00Z",
+            "expires_at": "2025-01-02T00:00:00Z",
+            "results_url": None,
+        }
+        return state.anthropic_batches[batch_id]
+
+    @app.get("/v1/messages/batches/{batch_id}")
+    async def get_anthropic_batch(batch_id: str, request: Request):
+        batch = state.anthropic_batches[batch_id]
+        if batch["processing_status"] == "in_progress" and state.is_done(batch_id):
+            batch["processing_status"] = "ended"
+            batch["results_url"] = str(
+                request.url_for("get_anthropic_results", batch_id=batch_id)
+            )
+        return batch
+
+    @app.post("/v1/messages/batches/{batch_id}/cancel")
+    async def cancel_anthropic_batch(batch_id: str):
+        state.anthropic_batches[batch_id]["processing_status"] = "canceling"
+        return state.anthropic_batches[batch_id]
+
+    @app.get("/v1/messages/batches/{batch_id}/results")
+    async def get_anthropic_results(batch_id: str):
+        lines = []
+        for each in state.anthropic_requests[batch_id]:
+            params = each["params"]
+            tool = params["tools"][0]
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": each["custom_id"],
+                        "result": {
+                            "type": "succeeded",
+                            "message": {
+                                "id": f"msg_{uuid.uuid4().hex}",
+                                "type": "message",
+                                "role": "assistant",
+                                "model": params["model"],
+                                "content": [
+                                    {
+                                        "type": "tool_use",
+                                        "id": f"toolu_{uuid.uuid4().hex}",
+                                        "name": tool["name"],
+                                        "input": sample_from_schema(
+                                            tool["input_schema"]
+                                        ),
+                                    }
+                                ],
+                                "stop_reason": "tool_use",
+                                "stop_sequence": None,
+                                "usage": {"input_tokens": 100, "output_tokens": 10},
+                            },
+                        },
+                    }
+                )
+            )
+        return PlainTextResponse("\n".join(lines))
+
+    return app
+
+
+class StubBatchServer:
+    """Runs the stub app with uvicorn in a background thread."""
+
+    def __init__(self, port: int = 0, polls_until_done: int = 1):
+        self.app = create_app(polls_until_done)
+        self.server = uvicorn.Server(
+            uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="error")
+        )
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def __enter__(self) -> "StubBatchServer":
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *args):
+        self.server.should_exit = True
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--polls-until-done", type=int, default=1)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.polls_until_done), host="127.0.0.1", port=args.port)
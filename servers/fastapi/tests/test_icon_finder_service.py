@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from services.icon_finder_service import IconFinderService, IconsIndex
+
+WORDS = ["chart", "money", "leaf", "rocket", "person"]
+
+
+def embed_words(documents):
+    # One dimension per known word, enough to rank icons by shared words
+    return [
+        [float(document.count(word)) + 0.01 for word in WORDS]
+        for document in documents
+    ]
+
+
+@pytest.fixture
+def icons_path(tmp_path):
+    path = tmp_path / "icons.json"
+    icons = {
+        "icons": [
+            {"name": "chart-bar-bold", "tags": "chart graph"},
+            {"name": "chart-bar-light", "tags": "chart graph"},
+            {"name": "money-bold", "tags": "money cash"},
+            {"name": "leaf-bold", "tags": "leaf nature plant"},
+            {"name": "rocket-bold", "tags": "rocket launch"},
+        ]
+    }
+    path.write_text(json.dumps(icons))
+    return path
+
+
+class TestIconFinderService:
+    """
+    Testing semantic icon search on the precomputed embedding index
+    """
+
+    def test_search_ranks_icons_by_similarity(self, icons_path, tmp_path):
+        calls = []
+
+        def embedding_function(documents):
+            calls.append(documents)
+            return embed_words(documents)
+
+        service = IconFinderService(
+            str(icons_path), str(tmp_path / "index"), embedding_function
+        )
+        assert calls == []
+
+        icons = asyncio.run(service.search_icons("green leaf", 2))
+
+        assert icons[0] == "/static/icons/bold/leaf-bold.svg"
+        assert len(icons) == 2
+        # Only bold icons are indexed
+        assert len(calls[0]) == 4
+        assert asyncio.run(service.search_icons("rocket", 10))[0] == (
+            "/static/icons/bold/rocket-bold.svg"
+        )
+        assert len(asyncio.run(service.search_icons("rocket", 10))) == 4
+
+    def test_saved_index_is_memory_mapped_and_reused(self, icons_path, tmp_path):
+        index_directory = str(tmp_path / "index")
+        IconFinderService(str(icons_path), index_directory, embed_words).build_index(
+            "float16"
+        )
+
+        calls = []
+
+        def embedding_function(documents):
+            calls.append(documents)
+            return embed_words(documents)
+
+        service = IconFinderService(
+            str(icons_path), index_directory, embedding_function
+        )
+        icons = asyncio.run(service.search_icons("money", 1))
+
+        index = service.get_index()
+        assert isinstance(index.embeddings, np.memmap)
+        assert index.embeddings.dtype == np.float16
+        assert icons == ["/static/icons/bold/money-bold.svg"]
+        # Only the query was embedded
+        assert calls == [["money"]]
+
+    def test_index_is_rebuilt_when_icons_change(self, icons_path, tmp_path):
+        index_directory = str(tmp_path / "index")
+        IconFinderService(str(icons_path), index_directory, embed_words).build_index()
+
+        icons = json.loads(icons_path.read_text())
+        icons["icons"].append({"name": "person-bold", "tags": "person user"})
+        icons_path.write_text(json.dumps(icons))
+
+        assert IconsIndex.load(index_directory, "stale") is None
+        service = IconFinderService(str(icons_path), index_directory, embed_words)
+        assert asyncio.run(service.search_icons("person", 1)) == [
+            "/static/icons/bold/person-bold.svg"
+        ]
+        assert "person-bold" in IconsIndex.load(
+            index_directory, service.get_icons_hash()
+        ).names
+
+    def test_concurrent_searches_share_one_batch(self, icons_path, tmp_path):
+        calls = []
+
+        def embedding_function(documents):
+            calls.append(documents)
+            return embed_words(documents)
+
+        service = IconFinderService(
+            str(icons_path), str(tmp_path / "index"), embedding_function
+        )
+        service.get_index()
+        calls.clear()
+
+        async def run():
+            return await asyncio.gather(
+                service.search_icons("leaf", 1),
+                service.search_icons_batch(["rocket", "money", "leaf"], 2),
+                service.search_icons("chart", 3),
+            )
+
+        leaf, batch, chart = asyncio.run(run())
+
+        assert leaf == ["/static/icons/bold/leaf-bold.svg"]
+        assert [icons[0] for icons in batch] == [
+            "/static/icons/bold/rocket-bold.svg",
+            "/static/icons/bold/money-bold.svg",
+            "/static/icons/bold/leaf-bold.svg",
+        ]
+        assert all(len(icons) == 2 for icons in batch)
+        assert chart[0] == "/static/icons/bold/chart-bar-bold.svg"
+        assert len(chart) == 3
+        # Repeated queries are embedded once, all in a single batch
+        assert calls == [["leaf", "rocket", "money", "chart"]]
+        assert service.batches == 1
+        assert service.queries == 5
+
+    def test_identical_searches_in_flight_are_joined(self, icons_path, tmp_path):
+        calls = []
+
+        def embedding_function(documents):
+            calls.append(documents)
+            return embed_words(documents)
+
+        service = IconFinderService(
+            str(icons_path), str(tmp_path / "index"), embedding_function
+        )
+        service.get_index()
+        calls.clear()
+
+        async def run():
+            return await asyncio.gather(
+                service.search_icons_batch(["rocket", "money"], 1),
+                service.search_icons_batch(["money", "leaf"], 1),
+                service.search_icons("money", 1),
+            )
+
+        first, second, money = asyncio.run(run())
+
+        assert first[1] == second[0] == money == ["/static/icons/bold/money-bold.svg"]
+        assert calls == [["rocket", "money", "leaf"]]
+        assert service.queries == 3
+        assert service.stats()["coalesced"] == 2
+
+    def test_repeated_queries_skip_the_model(self, icons_path, tmp_path):
+        calls = []
+
+        def embedding_function(documents):
+            calls.append(documents)
+            return embed_words(documents)
+
+        service = IconFinderService(
+            str(icons_path), str(tmp_path / "index"), embedding_function
+        )
+        service.get_index()
+        calls.clear()
+
+        first = asyncio.run(service.search_icons("Money  chart", 2))
+        assert asyncio.run(service.search_icons("money chart", 2)) == first
+        # Same query with another k is ranked again, but not embedded again
+        assert asyncio.run(service.search_icons("money chart", 1)) == first[:1]
+        assert calls == [["money chart"]]
+
+        stats = service.stats()
+        assert stats["results_cache"]["hits"] == 1
+        assert stats["results_cache"]["misses"] == 2
+        assert stats["embeddings_cache"]["hits"] == 1
+        assert stats["embeddings_cache"]["hit_rate"] == 0.5
+
+    def test_cache_keeps_recent_queries(self, icons_path, tmp_path):
+        calls = []
+
+        def embedding_function(documents):
+            calls.append(documents)
+            return embed_words(documents)
+
+        service = IconFinderService(
+            str(icons_path), str(tmp_path / "index"), embedding_function
+        )
+        service.get_index()
+        calls.clear()
+
+        with patch.dict(os.environ, {"ICON_SEARCH_CACHE_MAX_ENTRIES": "2"}):
+            for query in ["leaf", "rocket", "leaf", "money", "leaf", "rocket"]:
+                asyncio.run(service.search_icons(query))
+
+        # rocket's result was the least recently used when money was added, its
+        # embedding wasn't, as results of leaf were found without embedding it
+        assert calls == [["leaf"], ["rocket"], ["money"]]
+        stats = service.stats()
+        assert stats["results_cache"]["hits"] == 2
+        assert stats["results_cache"]["misses"] == 4
+        assert stats["results_cache"]["entries"] == 2
+        assert stats["embeddings_cache"]["hits"] == 1
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from models.image_prompt import ImagePrompt
+from models.sql.image_asset import ImageAsset
+from services.image_generation_cache import ImageGenerationCache
+from services.image_generation_service import ImageGenerationService
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ImageGenerationCache(str(tmp_path / "image_cache"))
+    with patch("services.image_generation_service.IMAGE_GENERATION_CACHE", cache):
+        yield cache
+
+
+@pytest.fixture
+def images_directory(tmp_path):
+    directory = tmp_path / "images"
+    directory.mkdir()
+    return str(directory)
+
+
+class TestImageGenerationCache:
+    """
+    Testing reuse of AI generated images for identical prompts
+    """
+
+    def generate(self, images_directory, prompt, env, use_cache=True):
+        calls = []
+
+        async def generate_image_openai(prompt, output_directory, model, quality):
+            calls.append((prompt, model, quality))
+            image_path = os.path.join(output_directory, f"generated-{len(calls)}.png")
+            with open(image_path, "wb") as file:
+                file.write(f"{prompt} {quality}".encode())
+            return image_path
+
+        with patch.dict(os.environ, {"IMAGE_PROVIDER": "dall-e-3", **env}):
+            service = ImageGenerationService(images_directory, use_cache=use_cache)
+            with patch.object(service, "generate_image_openai", generate_image_openai):
+                image = asyncio.run(service.generate_image(prompt))
+        return image, calls
+
+    def test_identical_prompts_reuse_the_image(self, cache, images_directory):
+        prompt = ImagePrompt(prompt="Wind turbines", theme_prompt="flat, blue")
+        env = {"IMAGE_CACHE": "true", "DALL_E_3_QUALITY": "hd"}
+
+        first, calls = self.generate(images_directory, prompt, env)
+        assert calls == [("Wind turbines, flat, blue", "dall-e-3", "hd")]
+
+        second, calls = self.generate(images_directory, prompt, env)
+        assert calls == []
+        assert isinstance(second, ImageAsset)
+        assert second.path != first.path
+        with open(second.path, "rb") as file:
+            assert file.read() == b"Wind turbines, flat, blue hd"
+        assert second.extras == {
+            "prompt": "Wind turbines",
+            "theme_prompt": "flat, blue",
+        }
+
+        # Deleting an asset leaves the cache intact
+        os.remove(first.path)
+        os.remove(second.path)
+        _, calls = self.generate(images_directory, prompt, env)
+        assert calls == []
+        assert cache.hits == 2
+
+    def test_cache_is_keyed_by_prompt_and_quality(self, cache, images_directory):
+        prompt = ImagePrompt(prompt="Wind turbines", theme_prompt="flat, blue")
+        env = {"IMAGE_CACHE": "true"}
+        self.generate(images_directory, prompt, {**env, "DALL_E_3_QUALITY": "hd"})
+
+        for other_prompt, other_env in (
+            (prompt, {**env, "DALL_E_3_QUALITY": "standard"}),
+            (ImagePrompt(prompt="Wind turbines", theme_prompt="dark"), env),
+        ):
+            _, calls = self.generate(images_directory, other_prompt, other_env)
+            assert len(calls) == 1
+
+    def test_bypass_and_disabled_cache(self, cache, images_directory):
+        prompt = ImagePrompt(prompt="Solar panels")
+        self.generate(images_directory, prompt, {"IMAGE_CACHE": "true"})
+
+        _, calls = self.generate(
+            images_directory, prompt, {"IMAGE_CACHE": "true"}, use_cache=False
+        )
+        assert len(calls) == 1
+        _, calls = self.generate(images_directory, prompt, {"IMAGE_CACHE": "false"})
+        assert len(calls) == 1
+
+    def test_eviction_by_age_and_size(self, cache, tmp_path):
+        images = tmp_path / "generated"
+        images.mkdir()
+        for name in ("old", "used", "unused", "new"):
+            (images / f"{name}.png").write_bytes(b"x" * 400 * 1024)
+
+        for name in ("old", "used", "unused"):
+            cache.set(name, str(images / f"{name}.png"))
+        now = time.time()
+        os.utime(cache._find("old"), (now - 7200, now - 7200))
+        os.utime(cache._find("used"), (now - 60, now - 60))
+        os.utime(cache._find("unused"), (now - 30, now - 30))
+
+        with patch.dict(
+            os.environ, {"IMAGE_CACHE_MAX_SIZE_MB": "1", "IMAGE_CACHE_MAX_AGE": "3600"}
+        ):
+            assert cache.get("used", str(images)) is not None
+            cache.set("new", str(images / "new.png"))
+
+        assert cache._find("old") is None
+        assert cache._find("unused") is None
+        assert cache._find("used") is not None
+        assert cache._find("new") is not None
+        assert cache.evictions == 2
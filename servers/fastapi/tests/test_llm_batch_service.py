@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from models.llm_message import LLMSystemMessage, LLMUserMessage
+from services.llm_batch_service import LLMBatchError, LLMBatchService
+from services.llm_client import LLMClientRegistry
+from tests.stubs.llm_batch_server import StubBatchServer
+
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "minLength": 10},
+        "items": {
+            "type": "array",
+            "minItems": 2,
+            "items": {"type": "object", "properties": {"value": {"type": "integer"}}},
+        },
+    },
+}
+
+BATCH_ENV = {
+    "LLM_BATCH_FLUSH_INTERVAL": "0.05",
+    "LLM_BATCH_POLL_INTERVAL": "0.05",
+}
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    with StubBatchServer(polls_until_done=2) as server:
+        yield server
+
+
+def get_messages(index: int):
+    return [
+        LLMSystemMessage(content="Generate structured slide"),
+        LLMUserMessage(content=f"Slide {index}"),
+    ]
+
+
+async def submit_slides(service: LLMBatchService, model: str, count: int):
+    return await asyncio.gather(
+        *[
+            service.submit(model, get_messages(i), RESPONSE_SCHEMA)
+            for i in range(count)
+        ]
+    )
+
+
+async def read_slides(service: LLMBatchService, batch_requests: list):
+    while not await service.is_batch_done(batch_requests[0]):
+        await asyncio.sleep(0.01)
+    return await asyncio.gather(
+        *[
+            service.get_result(batch_request, get_messages(i), RESPONSE_SCHEMA)
+            for i, batch_request in enumerate(batch_requests)
+        ]
+    )
+
+
+class TestLLMBatchService:
+    """
+    Testing batch API generation against the local stub batch server
+    """
+
+    @pytest.mark.parametrize(
+        "env",
+        [
+            {"LLM": "openai", "OPENAI_API_KEY": "key", "OPENAI_BASE_URL": "{url}/v1"},
+            {
+                "LLM": "anthropic",
+                "ANTHROPIC_API_KEY": "key",
+                "ANTHROPIC_BASE_URL": "{url}",
+            },
+        ],
+        ids=["openai", "anthropic"],
+    )
+    def test_requests_from_many_jobs_share_one_batch(self, stub_server, env):
+        """
+        Concurrent requests should be collected into a single provider batch,
+        whose results can be read after a restart from the saved batch requests
+        """
+        env = {key: value.format(url=stub_server.url) for key, value in env.items()}
+        service = LLMBatchService()
+        restarted_service = LLMBatchService()
+        with patch.dict(os.environ, {**env, **BATCH_ENV}), patch(
+            "services.llm_client.LLM_CLIENT_REGISTRY", LLMClientRegistry()
+        ):
+            batch_requests = asyncio.run(submit_slides(service, "model", 5))
+            batch_requests = json.loads(json.dumps(batch_requests))
+            results = asyncio.run(read_slides(restarted_service, batch_requests))
+
+        assert len({each["batch_id"] for each in batch_requests}) == 1
+        assert len({each["custom_id"] for each in batch_requests}) == 5
+        assert len(results) == 5
+        assert results[0]["title"] == "stub......"
+        assert len(results[0]["items"]) == 2
+        assert service.stats()["batches_submitted"] == 1
+        assert service.stats()["requests_submitted"] == 5
+        assert restarted_service.stats()["fallbacks"] == 0
+
+    def test_flushes_when_batch_is_full(self, stub_server):
+        env = {
+            "LLM": "openai",
+            "OPENAI_API_KEY": "key",
+            "OPENAI_BASE_URL": f"{stub_server.url}/v1",
+            **BATCH_ENV,
+            "LLM_BATCH_FLUSH_INTERVAL": "60",
+            "LLM_BATCH_MAX_REQUESTS": "2",
+        }
+        service = LLMBatchService()
+        with patch.dict(os.environ, env), patch(
+            "services.llm_client.LLM_CLIENT_REGISTRY", LLMClientRegistry()
+        ):
+            batch_requests = asyncio.run(submit_slides(service, "model", 4))
+
+        assert len({each["batch_id"] for each in batch_requests}) == 2
+        assert service.stats()["batches_submitted"] == 2
+
+    def test_failed_submission_raises(self, stub_server):
+        """
+        Jobs should generate in real time when their batch can't be created
+        """
+        service = LLMBatchService()
+
+        async def fail(*args):
+            raise RuntimeError("batch endpoint unavailable")
+
+        async def run():
+            return await asyncio.gather(
+                *[
+                    service.submit("model", get_messages(i), RESPONSE_SCHEMA)
+                    for i in range(3)
+                ],
+                return_exceptions=True,
+            )
+
+        env = {"LLM": "openai", "OPENAI_API_KEY": "key", **BATCH_ENV}
+        with patch.dict(os.environ, env), patch.object(
+            service, "_submit_openai_batch", fail
+        ):
+            results = asyncio.run(run())
+
+        assert all(isinstance(each, LLMBatchError) for each in results)
+        assert service.stats()["batches_submitted"] == 0
+
+    def test_batch_past_timeout_is_cancelled_and_falls_back(self, stub_server):
+        """
+        Requests of a batch that didn't finish in time should be made in real time
+        """
+        env = {
+            "LLM": "openai",
+            "OPENAI_API_KEY": "key",
+            "OPENAI_BASE_URL": f"{stub_server.url}/v1",
+            **BATCH_ENV,
+        }
+        service = LLMBatchService()
+
+        async def realtime(*args):
+            return {"title": "realtime"}
+
+        with patch.dict(os.environ, env), patch(
+            "services.llm_client.LLM_CLIENT_REGISTRY", LLMClientRegistry()
+        ), patch.object(service, "_generate_realtime", realtime):
+            batch_requests = asyncio.run(submit_slides(service, "model", 2))
+            with patch.dict(os.environ, {"LLM_BATCH_TIMEOUT": "0.01"}):
+                time.sleep(0.02)
+                results = asyncio.run(read_slides(service, batch_requests))
+
+        batch_id = batch_requests[0]["batch_id"]
+        assert stub_server.app.state.batches.openai_batches[batch_id]["status"] == (
+            "cancelled"
+        )
+        assert results == [{"title": "realtime"}] * 2
+        assert service.stats()["fallbacks"] == 2
+
+    def test_cancelled_request_is_not_submitted(self, stub_server):
+        """
+        A request cancelled before its batch is flushed should be left out of it
+        """
+        env = {
+            "LLM": "openai",
+            "OPENAI_API_KEY": "key",
+            "OPENAI_BASE_URL": f"{stub_server.url}/v1",
+            **BATCH_ENV,
+        }
+        service = LLMBatchService()
+
+        async def run():
+            cancelled = asyncio.create_task(
+                service.submit("model", get_messages(0), RESPONSE_SCHEMA)
+            )
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            return await submit_slides(service, "model", 2)
+
+        with patch.dict(os.environ, env), patch(
+            "services.llm_client.LLM_CLIENT_REGISTRY", LLMClientRegistry()
+        ):
+            batch_requests = asyncio.run(run())
+
+        assert len(batch_requests) == 2
+        assert service.stats()["requests_submitted"] == 2
@@ -0,0 +1,52 @@
+import os
+from unittest.mock import patch
+
+from enums.llm_provider import LLMProvider
+from services.llm_client import LLMClient, LLMClientRegistry
+
+
+class TestLLMClientRegistry:
+    """
+    Testing the process-wide pool of provider SDK clients
+    """
+
+    def test_clients_are_shared_between_llm_clients(self):
+        """
+        Two LLMClients for the same provider should reuse one SDK client
+        """
+        registry = LLMClientRegistry()
+        with patch.dict(os.environ, {"LLM": "openai", "OPENAI_API_KEY": "key-1"}):
+            with patch("services.llm_client.LLM_CLIENT_REGISTRY", registry):
+                first = LLMClient()
+                second = LLMClient()
+                assert first._client is second._client
+
+    def test_changed_key_creates_new_client(self):
+        """
+        A changed API key should never be served by a stale pooled client
+        """
+        registry = LLMClientRegistry()
+        with patch("services.llm_client.LLM_CLIENT_REGISTRY", registry):
+            with patch.dict(os.environ, {"LLM": "openai", "OPENAI_API_KEY": "key-1"}):
+                first = LLMClient()
+            with patch.dict(os.environ, {"LLM": "openai", "OPENAI_API_KEY": "key-2"}):
+                second = LLMClient()
+                assert first._client is not second._client
+                assert second._client.api_key == "key-2"
+
+    def test_invalidate_stale_drops_only_changed_providers(self):
+        """
+        invalidate_stale should keep clients whose settings did not change
+        """
+        registry = LLMClientRegistry()
+        with patch.dict(
+            os.environ, {"OPENAI_API_KEY": "key-1", "OLLAMA_URL": "http://ollama"}
+        ):
+            registry.get_client(LLMProvider.OPENAI, object)
+            ollama_client = registry.get_client(LLMProvider.OLLAMA, object)
+
+            os.environ["OPENAI_API_KEY"] = "key-2"
+            registry.invalidate_stale()
+
+            assert LLMProvider.OPENAI not in registry._clients
+            assert registry.get_client(LLMProvider.OLLAMA, object) is ollama_client
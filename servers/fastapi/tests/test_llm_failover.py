@@ -0,0 +1,198 @@
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from google.genai.errors import APIError as GoogleAPIError
+
+from enums.llm_provider import LLMProvider
+from services.llm_circuit_breaker import CircuitBreaker, LLMCircuitBreaker
+from services.llm_client import LLMClient
+from utils.llm_provider import get_fallback_llm_providers
+
+FAILOVER_ENV = {
+    "LLM": "openai",
+    "OPENAI_API_KEY": "openai-key",
+    "ANTHROPIC_API_KEY": "anthropic-key",
+    "ANTHROPIC_MODEL": "claude-test",
+    "LLM_FALLBACK_PROVIDERS": "anthropic",
+}
+
+
+def unavailable_error():
+    return GoogleAPIError(503, {"error": {"message": "unavailable"}})
+
+
+class TestCircuitBreaker:
+    """
+    Testing the per provider circuit breaker
+    """
+
+    def test_opens_after_threshold_and_probes_after_timeout(self):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert not breaker.allow_request()
+
+        asyncio.run(asyncio.sleep(0.06))
+        assert breaker.allow_request()
+        # Only one probe per reset timeout
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request()
+
+
+class TestLLMFailover:
+    """
+    Testing failover between LLM providers
+    """
+
+    def test_fallback_providers_skip_selected_and_invalid(self):
+        env = {**FAILOVER_ENV, "LLM_FALLBACK_PROVIDERS": "openai, invalid,anthropic"}
+        with patch.dict(os.environ, env):
+            assert get_fallback_llm_providers() == [LLMProvider.ANTHROPIC]
+
+    def test_fails_over_to_next_provider_with_its_model(self):
+        """
+        An unavailable provider should be skipped for the next one in the chain
+        """
+        calls = []
+
+        async def generate_on_provider(self, model, messages, max_tokens, tools):
+            calls.append((self.llm_provider, model))
+            if self.llm_provider == LLMProvider.OPENAI:
+                raise unavailable_error()
+            return "from anthropic"
+
+        breaker = LLMCircuitBreaker()
+        with patch.dict(os.environ, FAILOVER_ENV), patch(
+            "services.llm_client.LLM_CIRCUIT_BREAKER", breaker
+        ), patch.object(LLMClient, "_generate_on_provider", generate_on_provider):
+            content = asyncio.run(LLMClient().generate("gpt-4.1", []))
+
+        assert content == "from anthropic"
+        assert calls == [
+            (LLMProvider.OPENAI, "gpt-4.1"),
+            (LLMProvider.ANTHROPIC, "claude-test"),
+        ]
+        assert breaker.snapshot()["openai"]["consecutive_failures"] == 1
+
+    def test_client_errors_do_not_fail_over(self):
+        """
+        A bad request would fail on every provider and should be raised as is
+        """
+        calls = []
+
+        async def generate_on_provider(self, model, messages, max_tokens, tools):
+            calls.append(self.llm_provider)
+            raise GoogleAPIError(400, {"error": {"message": "bad request"}})
+
+        with patch.dict(os.environ, FAILOVER_ENV), patch(
+            "services.llm_client.LLM_CIRCUIT_BREAKER", LLMCircuitBreaker()
+        ), patch.object(LLMClient, "_generate_on_provider", generate_on_provider):
+            with pytest.raises(GoogleAPIError):
+                asyncio.run(LLMClient().generate("gpt-4.1", []))
+
+        assert calls == [LLMProvider.OPENAI]
+
+    def test_open_circuit_skips_provider(self):
+        """
+        A provider with an open circuit should not be called at all
+        """
+        calls = []
+
+        async def generate_on_provider(self, model, messages, max_tokens, tools):
+            calls.append(self.llm_provider)
+            return "ok"
+
+        breaker = LLMCircuitBreaker()
+        with patch.dict(
+            os.environ, {**FAILOVER_ENV, "LLM_CIRCUIT_BREAKER_THRESHOLD": "1"}
+        ), patch("services.llm_client.LLM_CIRCUIT_BREAKER", breaker), patch.object(
+            LLMClient, "_generate_on_provider", generate_on_provider
+        ):
+            breaker.record_failure(LLMProvider.OPENAI)
+            asyncio.run(LLMClient().generate("gpt-4.1", []))
+
+        assert calls == [LLMProvider.ANTHROPIC]
+
+    def test_fallback_probe_is_kept_until_the_fallback_is_called(self):
+        """
+        A half open fallback should only use its probe when it is failed over to
+        """
+        calls = []
+        primary_fails = False
+
+        async def generate_on_provider(self, model, messages, max_tokens, tools):
+            calls.append(self.llm_provider)
+            if self.llm_provider == LLMProvider.OPENAI and primary_fails:
+                raise unavailable_error()
+            return "ok"
+
+        breaker = LLMCircuitBreaker()
+        env = {
+            **FAILOVER_ENV,
+            "LLM_CIRCUIT_BREAKER_THRESHOLD": "1",
+            "LLM_CIRCUIT_BREAKER_RESET_TIMEOUT": "0.2",
+        }
+        with patch.dict(os.environ, env), patch(
+            "services.llm_client.LLM_CIRCUIT_BREAKER", breaker
+        ), patch.object(LLMClient, "_generate_on_provider", generate_on_provider):
+            breaker.record_failure(LLMProvider.ANTHROPIC)
+            asyncio.run(asyncio.sleep(0.25))
+
+            asyncio.run(LLMClient().generate("gpt-4.1", []))
+            assert calls == [LLMProvider.OPENAI]
+            assert breaker.get_breaker(LLMProvider.ANTHROPIC).state == "open"
+
+            primary_fails = True
+            asyncio.run(LLMClient().generate("gpt-4.1", []))
+
+        assert calls == [LLMProvider.OPENAI, LLMProvider.OPENAI, LLMProvider.ANTHROPIC]
+        assert breaker.get_breaker(LLMProvider.ANTHROPIC).state == "closed"
+
+    def test_error_is_raised_when_fallbacks_are_open(self):
+        calls = []
+
+        async def generate_on_provider(self, model, messages, max_tokens, tools):
+            calls.append(self.llm_provider)
+            raise unavailable_error()
+
+        breaker = LLMCircuitBreaker()
+        with patch.dict(
+            os.environ, {**FAILOVER_ENV, "LLM_CIRCUIT_BREAKER_THRESHOLD": "1"}
+        ), patch("services.llm_client.LLM_CIRCUIT_BREAKER", breaker), patch.object(
+            LLMClient, "_generate_on_provider", generate_on_provider
+        ):
+            breaker.record_failure(LLMProvider.ANTHROPIC)
+            with pytest.raises(GoogleAPIError):
+                asyncio.run(LLMClient().generate("gpt-4.1", []))
+
+        assert calls == [LLMProvider.OPENAI]
+
+    def test_stream_fails_over_before_first_chunk(self):
+        async def failing_stream():
+            raise unavailable_error()
+            yield
+
+        async def working_stream():
+            yield "a"
+            yield "b"
+
+        def stream_on_provider(self, model, messages, max_tokens, tools):
+            if self.llm_provider == LLMProvider.OPENAI:
+                return failing_stream()
+            return working_stream()
+
+        async def collect(stream):
+            return [chunk async for chunk in stream]
+
+        with patch.dict(os.environ, FAILOVER_ENV), patch(
+            "services.llm_client.LLM_CIRCUIT_BREAKER", LLMCircuitBreaker()
+        ), patch.object(LLMClient, "_stream_on_provider", stream_on_provider):
+            chunks = asyncio.run(collect(LLMClient().stream("gpt-4.1", [])))
+
+        assert chunks == ["a", "b"]
@@ -0,0 +1,102 @@
+import asyncio
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from models.llm_message import LLMSystemMessage, LLMUserMessage
+from services.llm_client import LLMClient
+from services.llm_usage_tracker import LLMUsageTracker
+
+
+def get_messages(outline: str):
+    return [
+        LLMSystemMessage(content="Generate structured slide"),
+        LLMUserMessage(content=outline),
+    ]
+
+
+class FakeAnthropicMessages:
+    def __init__(self):
+        self.kwargs = None
+
+    async def create(self, **kwargs):
+        self.kwargs = kwargs
+        return SimpleNamespace(
+            content=[
+                SimpleNamespace(
+                    type="tool_use",
+                    id="1",
+                    name="ResponseSchema",
+                    input={"title": "Hello"},
+                )
+            ],
+            usage=SimpleNamespace(
+                input_tokens=100,
+                output_tokens=20,
+                cache_read_input_tokens=900,
+                cache_creation_input_tokens=0,
+            ),
+        )
+
+
+class TestPromptCaching:
+    """
+    Testing provider side prompt caching of stable prompt prefixes
+    """
+
+    def test_openai_prompt_cache_key_follows_system_prompt(self):
+        """
+        Slides sharing a system prompt should share a prompt cache key
+        """
+        with patch.dict(os.environ, {"LLM": "openai", "OPENAI_API_KEY": "key"}):
+            client = LLMClient()
+            first = client._get_openai_prompt_cache_kwargs(get_messages("Slide 1"))
+            second = client._get_openai_prompt_cache_kwargs(get_messages("Slide 2"))
+            assert first["prompt_cache_key"] == second["prompt_cache_key"]
+
+            with patch.dict(os.environ, {"LLM_PROMPT_CACHING": "false"}):
+                assert client._get_openai_prompt_cache_kwargs(get_messages("")) == {}
+
+    def test_prompt_cache_key_is_openai_only(self):
+        """
+        OpenAI compatible servers may reject unknown parameters
+        """
+        with patch.dict(
+            os.environ, {"LLM": "custom", "CUSTOM_LLM_URL": "http://localhost:1234"}
+        ):
+            client = LLMClient()
+            assert client._get_openai_prompt_cache_kwargs(get_messages("")) == {}
+            assert client._get_openai_stream_kwargs(get_messages("")) == {}
+
+    def test_anthropic_marks_system_prompt_and_reports_cached_tokens(self):
+        """
+        The system prompt should carry cache_control and cache reads be reported
+        """
+        tracker = LLMUsageTracker()
+        with patch.dict(
+            os.environ, {"LLM": "anthropic", "ANTHROPIC_API_KEY": "key"}
+        ), patch("services.llm_client.LLM_USAGE_TRACKER", tracker):
+            client = LLMClient()
+            messages = FakeAnthropicMessages()
+            client._client = SimpleNamespace(messages=messages)
+
+            content = asyncio.run(
+                client._generate_anthropic_structured(
+                    model="claude",
+                    messages=get_messages("Slide 1"),
+                    response_format={"type": "object"},
+                )
+            )
+
+        assert content == {"title": "Hello"}
+        assert messages.kwargs["system"] == [
+            {
+                "type": "text",
+                "text": "Generate structured slide",
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        usage = tracker.snapshot()["anthropic:claude"]
+        assert usage["input_tokens"] == 1000
+        assert usage["cached_input_tokens"] == 900
+        assert usage["cache_hit_rate"] == 0.9
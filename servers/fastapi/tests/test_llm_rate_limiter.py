@@ -0,0 +1,137 @@
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from google.genai.errors import APIError as GoogleAPIError
+
+from enums.llm_provider import LLMProvider
+from services.llm_rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    LLMRateLimiter,
+    TokenBucket,
+    get_llm_rate_limit_config,
+)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """
+    Testing the AIMD concurrency limiter
+    """
+
+    def test_limits_in_flight_calls(self):
+        """
+        No more than limit calls should be in flight at once
+        """
+        limiter = AdaptiveConcurrencyLimiter(max_limit=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        async def run():
+            await asyncio.gather(*[call() for _ in range(6)])
+
+        asyncio.run(run())
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+    def test_overload_halves_limit_once_per_cooldown(self):
+        """
+        A burst of 429s should only back off once, successes ramp back up
+        """
+        limiter = AdaptiveConcurrencyLimiter(max_limit=8)
+        limiter.on_overload()
+        limiter.on_overload()
+        assert int(limiter.limit) == 4
+
+        for _ in range(30):
+            limiter.on_success()
+        assert int(limiter.limit) == 8
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        """
+        Cancelling a waiting call should leave the limiter usable
+        """
+        limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+
+        async def run():
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            limiter.release()
+            await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+        asyncio.run(run())
+
+
+class TestTokenBucket:
+    """
+    Testing the per minute token bucket
+    """
+
+    def test_waits_when_bucket_is_empty(self):
+        """
+        Acquiring beyond capacity should wait for the bucket to refill
+        """
+        bucket = TokenBucket(per_minute=600)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            await bucket.acquire(600)
+            started = loop.time()
+            await bucket.acquire(5)
+            return loop.time() - started
+
+        assert asyncio.run(run()) >= 0.4
+
+
+class TestLLMRateLimiter:
+    """
+    Testing the provider and model keyed scheduler
+    """
+
+    def test_rate_limit_error_reduces_concurrency(self):
+        """
+        A 429 from the provider should be recorded as an overload
+        """
+        rate_limiter = LLMRateLimiter()
+
+        async def run():
+            with pytest.raises(GoogleAPIError):
+                async with rate_limiter.limit(LLMProvider.GOOGLE, "gemini", 10):
+                    raise GoogleAPIError(429, {"error": {"message": "quota"}})
+
+        with patch.dict(os.environ, {"LLM_MAX_CONCURRENCY": "10"}):
+            asyncio.run(run())
+
+        snapshot = rate_limiter.snapshot()["google:gemini"]
+        assert snapshot["overloads"] == 1
+        assert snapshot["concurrency_limit"] == 5
+        assert snapshot["in_flight"] == 0
+
+    def test_model_overrides(self):
+        """
+        LLM_RATE_LIMITS should override global limits by provider and model
+        """
+        with patch.dict(
+            os.environ,
+            {
+                "LLM_REQUESTS_PER_MINUTE": "100",
+                "LLM_RATE_LIMITS": '{"openai": {"max_concurrency": 4}, '
+                '"openai:gpt-4.1": {"requests_per_minute": 500}}',
+            },
+        ):
+            config = get_llm_rate_limit_config("openai", "gpt-4.1")
+            assert config.requests_per_minute == 500
+            assert config.max_concurrency == 4
+
+            config = get_llm_rate_limit_config("anthropic", "claude")
+            assert config.requests_per_minute == 100
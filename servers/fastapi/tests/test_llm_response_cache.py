@@ -0,0 +1,143 @@
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from models.llm_message import LLMSystemMessage, LLMUserMessage
+from services.llm_client import LLMClient
+from services.llm_response_cache import LLMResponseCache
+
+
+class TestLLMResponseCache:
+    """
+    Testing the structured LLM response cache
+    """
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return LLMResponseCache(db_path=str(tmp_path / "llm_response_cache.db"))
+
+    @pytest.fixture
+    def messages(self):
+        return [
+            LLMSystemMessage(content="Generate structured slide"),
+            LLMUserMessage(content="Slide about growth"),
+        ]
+
+    def test_key_depends_on_every_input(self, cache, messages):
+        """
+        Changing model, messages, schema, strict flag or max tokens should change
+        the key
+        """
+        key = cache.get_key("openai", "gpt-4.1", messages, {"type": "object"}, False, None)
+        assert key == cache.get_key(
+            "openai", "gpt-4.1", messages, {"type": "object"}, False, None
+        )
+        assert key != cache.get_key(
+            "openai", "gpt-4.1-mini", messages, {"type": "object"}, False, None
+        )
+        assert key != cache.get_key(
+            "openai", "gpt-4.1", messages[:1], {"type": "object"}, False, None
+        )
+        assert key != cache.get_key(
+            "openai", "gpt-4.1", messages, {"type": "array"}, False, None
+        )
+        assert key != cache.get_key(
+            "openai", "gpt-4.1", messages, {"type": "object"}, True, None
+        )
+        assert key != cache.get_key(
+            "openai", "gpt-4.1", messages, {"type": "object"}, False, 1000
+        )
+
+    def test_memory_and_disk_hits(self, cache):
+        """
+        Values should be served from memory, then from disk once memory is cleared
+        """
+
+        async def run():
+            assert await cache.get("key") is None
+            await cache.set("key", {"title": "Growth"})
+            assert await cache.get("key") == {"title": "Growth"}
+
+            cache._memory.clear()
+            assert await cache.get("key") == {"title": "Growth"}
+
+        asyncio.run(run())
+        assert cache.misses == 1
+        assert cache.memory_hits == 1
+        assert cache.disk_hits == 1
+
+    def test_returned_values_are_copies(self, cache):
+        """
+        Callers mutate slide content, so cached values must not be shared
+        """
+
+        async def run():
+            await cache.set("key", {"items": []})
+            first = await cache.get("key")
+            first["items"].append("mutated")
+            assert await cache.get("key") == {"items": []}
+
+        asyncio.run(run())
+
+    def test_expired_entries_are_ignored(self, cache):
+        """
+        Entries older than the TTL should be treated as misses
+        """
+
+        async def run():
+            with patch.dict(os.environ, {"LLM_RESPONSE_CACHE_TTL": "10"}):
+                await cache.set("key", {"title": "Old"})
+                with patch("time.time", return_value=time.time() + 60):
+                    assert await cache.get("key") is None
+
+        asyncio.run(run())
+
+    def test_memory_is_bounded(self, cache):
+        """
+        The in-memory tier should evict the least recently used entries
+        """
+
+        async def run():
+            with patch.dict(os.environ, {"LLM_RESPONSE_CACHE_MAX_ENTRIES": "2"}):
+                await cache.set("a", {"v": 1})
+                await cache.set("b", {"v": 2})
+                await cache.get("a")
+                await cache.set("c", {"v": 3})
+                assert list(cache._memory.keys()) == ["a", "c"]
+
+        asyncio.run(run())
+
+    def test_responses_are_cached_per_max_tokens(self, cache, messages):
+        """
+        A response truncated by a low max tokens shouldn't serve a higher limit
+        """
+        calls = []
+
+        async def generate_structured(self, model, messages, max_tokens, **kwargs):
+            calls.append(max_tokens)
+            return {"max_tokens": max_tokens}
+
+        async def run():
+            client = LLMClient()
+            return [
+                await client.generate_structured(
+                    "gpt-4.1", messages, {"type": "object"}, max_tokens=max_tokens
+                )
+                for max_tokens in (100, 4000, 100)
+            ]
+
+        env = {"LLM": "openai", "OPENAI_API_KEY": "key", "LLM_RESPONSE_CACHE": "true"}
+        with patch.dict(os.environ, env), patch(
+            "services.llm_client.LLM_RESPONSE_CACHE", cache
+        ), patch.object(LLMClient, "_generate_structured", generate_structured):
+            responses = asyncio.run(run())
+
+        assert calls == [100, 4000]
+        assert responses == [
+            {"max_tokens": 100},
+            {"max_tokens": 4000},
+            {"max_tokens": 100},
+        ]
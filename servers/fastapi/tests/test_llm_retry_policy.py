@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from google.genai.errors import APIError as GoogleAPIError
+
+from services.llm_retry_policy import LLMLatencyTracker, LLMRetryPolicy, run_hedged
+
+
+class TestLLMRetryPolicy:
+    """
+    Testing retries of transient LLM errors
+    """
+
+    def test_retries_transient_errors(self):
+        """
+        A 503 should be retried until the call succeeds
+        """
+        policy = LLMRetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.01)
+        attempts = 0
+
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            if attempts < 3:
+                raise GoogleAPIError(503, {"error": {"message": "overloaded"}})
+            return "ok"
+
+        assert asyncio.run(policy.run(call)) == "ok"
+        assert attempts == 3
+
+    def test_does_not_retry_client_errors(self):
+        """
+        A 400 should fail immediately
+        """
+        policy = LLMRetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.01)
+        attempts = 0
+
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            raise GoogleAPIError(400, {"error": {"message": "bad request"}})
+
+        with pytest.raises(GoogleAPIError):
+            asyncio.run(policy.run(call))
+        assert attempts == 1
+
+    def test_gives_up_after_max_retries(self):
+        """
+        The last error should be raised once retries are exhausted
+        """
+        policy = LLMRetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01)
+        attempts = 0
+
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            raise asyncio.TimeoutError()
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(policy.run(call))
+        assert attempts == 3
+
+    def test_delay_respects_bounds(self):
+        """
+        Full jitter should stay between zero and the capped exponential delay
+        """
+        policy = LLMRetryPolicy(base_delay=1, max_delay=5)
+        for attempt in range(6):
+            assert 0 <= policy.get_delay(attempt) <= min(5, 2**attempt)
+
+
+class TestHedging:
+    """
+    Testing hedged requests
+    """
+
+    def test_hedged_request_wins_over_slow_call(self):
+        """
+        A slow first call should be beaten by its duplicate
+        """
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(1 if calls == 1 else 0.01)
+            return calls
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await run_hedged(call, hedge_after=0.05)
+            return result, loop.time() - started
+
+        result, elapsed = asyncio.run(run())
+        assert result == 2
+        assert elapsed < 0.5
+
+    def test_fast_call_is_not_hedged(self):
+        """
+        No duplicate should be sent when the call finishes in time
+        """
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            return "ok"
+
+        assert asyncio.run(run_hedged(call, hedge_after=0.5)) == "ok"
+        assert calls == 1
+
+    def test_latency_percentile_needs_min_samples(self):
+        tracker = LLMLatencyTracker(window_size=10)
+        for latency in range(1, 11):
+            tracker.record("openai:gpt", latency)
+        assert tracker.get_percentile("openai:gpt", 0.9, min_samples=20) is None
+        assert tracker.get_percentile("openai:gpt", 0.9, min_samples=5) == 10
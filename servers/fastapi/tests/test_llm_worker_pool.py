@@ -0,0 +1,78 @@
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from enums.llm_provider import LLMProvider
+from services.llm_rate_limiter import LLMRateLimiter
+from services.llm_worker_pool import LLMWorkerPool, get_llm_worker_pool_size
+
+
+class TestLLMWorkerPool:
+    """
+    Testing bounded concurrency slide generation
+    """
+
+    def test_results_are_in_item_order_and_bounded(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def work(index):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01 * (5 - index % 5))
+            in_flight -= 1
+            return index * 2
+
+        results = asyncio.run(LLMWorkerPool(3).map(work, range(10)))
+
+        assert results == [index * 2 for index in range(10)]
+        assert max_in_flight == 3
+
+    def test_slow_item_does_not_stall_other_slots(self):
+        """
+        Free workers should keep taking jobs while one job is slow
+        """
+
+        async def work(index):
+            await asyncio.sleep(0.3 if index == 0 else 0.02)
+
+        started_at = time.perf_counter()
+        asyncio.run(LLMWorkerPool(2).map(work, range(11)))
+        elapsed = time.perf_counter() - started_at
+
+        # Batches of 2 would wait 0.3 + 5 * 0.02, the pool overlaps the fast jobs
+        assert elapsed < 0.38
+
+    def test_failure_cancels_other_workers(self):
+        cancelled = []
+
+        async def work(index):
+            if index == 1:
+                raise RuntimeError("slide failed")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(index)
+                raise
+
+        async def run():
+            await LLMWorkerPool(2).map(work, range(5))
+            await asyncio.sleep(0)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+        assert cancelled == [0]
+
+    def test_pool_size_follows_provider_concurrency_limit(self):
+        limiter = LLMRateLimiter()
+        with patch.dict(
+            os.environ, {"LLM": "openai", "LLM_MAX_CONCURRENCY": "6"}
+        ), patch("services.llm_worker_pool.LLM_RATE_LIMITER", limiter):
+            assert get_llm_worker_pool_size() == 6
+
+            limiter.get_limiter(LLMProvider.OPENAI, "gpt-4.1").on_overload()
+            assert get_llm_worker_pool_size() == 3
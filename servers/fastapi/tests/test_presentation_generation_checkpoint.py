@@ -0,0 +1,294 @@
+import asyncio
+import os
+from unittest.mock import patch
+import uuid
+
+import dirtyjson
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+from models.presentation_outline_model import (
+    PresentationOutlineModel,
+    SlideOutlineModel,
+)
+from models.presentation_structure_model import PresentationStructureModel
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from models.sql.image_asset import ImageAsset
+from models.sql.presentation import PresentationModel
+from models.sql.slide import SlideModel
+from services.presentation_generation_checkpoint import (
+    PresentationGenerationCheckpoint,
+)
+
+OUTLINES = PresentationOutlineModel(
+    slides=[SlideOutlineModel(content="Intro"), SlideOutlineModel(content="Growth")]
+)
+
+
+@pytest.fixture
+def session_maker(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/checkpoint.db")
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                lambda sync_conn: SQLModel.metadata.create_all(
+                    sync_conn,
+                    tables=[
+                        AsyncPresentationGenerationTaskModel.__table__,
+                        ImageAsset.__table__,
+                        PresentationModel.__table__,
+                        SlideModel.__table__,
+                    ],
+                )
+            )
+
+    asyncio.run(create_tables())
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+class TestPresentationGenerationCheckpoint:
+    """
+    Testing saving and restoring completed generation stages
+    """
+
+    def test_restores_saved_stages_from_task(self, session_maker):
+        """
+        A new attempt should see every stage saved by the previous one
+        """
+        asset = ImageAsset(
+            path="/app_data/images/chart.png", extras={"prompt": "chart"}
+        )
+
+        async def run():
+            async with session_maker() as session:
+                task = AsyncPresentationGenerationTaskModel(status="processing")
+                session.add(task)
+                await session.commit()
+
+            checkpoint = PresentationGenerationCheckpoint(task, session_maker)
+            await checkpoint.save_outlines(OUTLINES, 2)
+            await checkpoint.save_structure(
+                PresentationStructureModel(slides=[0, 3]), OUTLINES
+            )
+            await asyncio.gather(
+                checkpoint.save_slide_content(0, 0, {"title": "Intro"}),
+                checkpoint.save_slide_content(1, 3, {"title": "Growth"}),
+            )
+            await checkpoint.save_slide_assets(
+                1, {"title": "Growth", "__image_url__": asset.path}, [asset]
+            )
+            await checkpoint.flush()
+
+            async with session_maker() as session:
+                return await session.get(AsyncPresentationGenerationTaskModel, task.id)
+
+        task = asyncio.run(run())
+        checkpoint = PresentationGenerationCheckpoint(task, session_maker)
+
+        assert checkpoint.get_outlines() == (OUTLINES, 2)
+        assert checkpoint.get_structure() == (
+            PresentationStructureModel(slides=[0, 3]),
+            OUTLINES,
+        )
+        assert checkpoint.get_slide_content(0) == (0, {"title": "Intro"})
+        assert checkpoint.get_slide_content(1) == (3, {"title": "Growth"})
+        assert checkpoint.get_slide_assets(0) is None
+
+        content, assets = checkpoint.get_slide_assets(1)
+        assert content["__image_url__"] == asset.path
+        assert assets[0].id == asset.id
+        assert assets[0].extras == {"prompt": "chart"}
+        assert not checkpoint.is_presentation_saved
+        assert checkpoint.get_completed_stages() == [
+            "outlines",
+            "structure",
+            "2 slide contents",
+            "1 slide assets",
+        ]
+
+    def test_slide_saves_are_coalesced(self, session_maker):
+        """
+        Slides finishing together should be written once, not once each
+        """
+        updates = []
+
+        def record_update(conn, cursor, statement, *args):
+            if statement.startswith("UPDATE"):
+                updates.append(statement)
+
+        event.listen(
+            session_maker.kw["bind"].sync_engine, "before_cursor_execute", record_update
+        )
+
+        async def run():
+            async with session_maker() as session:
+                task = AsyncPresentationGenerationTaskModel(status="processing")
+                session.add(task)
+                await session.commit()
+
+            checkpoint = PresentationGenerationCheckpoint(task, session_maker)
+            await checkpoint.save_outlines(OUTLINES, 2)
+            await asyncio.gather(
+                *(
+                    checkpoint.save_slide_content(index, 0, {"title": str(index)})
+                    for index in range(10)
+                )
+            )
+            await checkpoint.save_slide_assets(0, {"title": "0"}, [])
+            assert len(updates) == 1
+
+            await asyncio.sleep(0.1)
+            assert len(updates) == 2
+            # Nothing changed since the last write
+            await checkpoint.flush()
+            assert len(updates) == 2
+
+            async with session_maker() as session:
+                return await session.get(AsyncPresentationGenerationTaskModel, task.id)
+
+        with patch.dict(os.environ, {"PRESENTATION_CHECKPOINT_SAVE_INTERVAL": "0.05"}):
+            task = asyncio.run(run())
+
+        checkpoint = PresentationGenerationCheckpoint(task, session_maker)
+        assert checkpoint.get_completed_stages() == [
+            "outlines",
+            "10 slide contents",
+            "1 slide assets",
+        ]
+
+    def test_restored_content_is_a_copy(self, session_maker):
+        checkpoint = PresentationGenerationCheckpoint(None, session_maker)
+        asyncio.run(checkpoint.save_slide_content(0, 1, {"items": ["a"]}))
+
+        _, content = checkpoint.get_slide_content(0)
+        content["items"].append("b")
+        assert checkpoint.get_slide_content(0) == (1, {"items": ["a"]})
+
+    def test_saves_content_parsed_by_dirtyjson(self, session_maker):
+        """
+        LLM responses are parsed with dirtyjson, which returns AttributedDicts
+        """
+        content = dict(dirtyjson.loads('{"title": "Intro", "image": {"a": [1]}}'))
+        checkpoint = PresentationGenerationCheckpoint(None, session_maker)
+        asyncio.run(checkpoint.save_slide_content(0, 1, content))
+        asyncio.run(checkpoint.save_slide_assets(0, content, []))
+
+        assert checkpoint.get_slide_content(0) == (
+            1,
+            {"title": "Intro", "image": {"a": [1]}},
+        )
+
+    def test_without_task_nothing_is_saved(self, session_maker):
+        """
+        Sync generation has no task to save checkpoints to
+        """
+
+        def fail():
+            raise AssertionError("Checkpoint should not open a session")
+
+        checkpoint = PresentationGenerationCheckpoint(None, fail)
+        asyncio.run(checkpoint.save_outlines(OUTLINES, 2))
+        assert checkpoint.get_outlines() == (OUTLINES, 2)
+
+    def test_presentation_is_committed_with_its_mark(self, session_maker):
+        """
+        A retry must never see a saved presentation without the mark, or the
+        mark without the presentation
+        """
+        saved_asset = ImageAsset(path="/app_data/images/saved.png")
+
+        async def save(asset: ImageAsset):
+            async with session_maker() as session:
+                task = AsyncPresentationGenerationTaskModel(status="processing")
+                session.add(task)
+                await session.commit()
+
+                checkpoint = PresentationGenerationCheckpoint(task, session_maker)
+                session.add(asset)
+                try:
+                    await checkpoint.commit_presentation(session)
+                except IntegrityError:
+                    await session.rollback()
+            async with session_maker() as session:
+                task = await session.get(
+                    AsyncPresentationGenerationTaskModel, checkpoint.task_id
+                )
+                return checkpoint, PresentationGenerationCheckpoint(task)
+
+        checkpoint, saved = asyncio.run(save(saved_asset))
+        assert checkpoint.is_presentation_saved
+        assert saved.is_presentation_saved
+
+        # Fails on the asset id saved above
+        checkpoint, saved = asyncio.run(
+            save(ImageAsset(id=saved_asset.id, path="/app_data/images/other.png"))
+        )
+        assert not checkpoint.is_presentation_saved
+        assert not saved.is_presentation_saved
+
+    def test_resumed_task_removes_rows_of_unsaved_presentation(self, session_maker):
+        """
+        Rows of a presentation that isn't marked saved should be removed before
+        generating again, also for resumed tasks whose attempts start over
+        """
+        from api.v1.ppt.endpoints import presentation
+
+        presentation_id = uuid.uuid4()
+        asset = ImageAsset(path="/app_data/images/chart.png")
+        handled = []
+
+        async def handler(request, presentation_id, async_status, sql_session):
+            handled.append(presentation_id)
+
+        async def run():
+            async with session_maker() as session:
+                task = AsyncPresentationGenerationTaskModel(
+                    status="processing",
+                    presentation_id=presentation_id,
+                    request={"content": "Solar energy"},
+                    attempts=1,
+                )
+                session.add(task)
+                session.add(
+                    PresentationModel(
+                        id=presentation_id,
+                        content="Solar energy",
+                        n_slides=1,
+                        language="English",
+                    )
+                )
+                session.add(
+                    SlideModel(
+                        presentation=presentation_id,
+                        layout_group="general",
+                        layout="general:intro",
+                        index=0,
+                        content={},
+                    )
+                )
+                session.add(asset)
+                await session.commit()
+
+            checkpoint = PresentationGenerationCheckpoint(task, session_maker)
+            await checkpoint.save_slide_assets(0, {}, [asset])
+            await checkpoint.flush()
+
+            async with session_maker() as session:
+                task = await session.get(AsyncPresentationGenerationTaskModel, task.id)
+                await presentation.run_queued_presentation_generation(task, session)
+                return [
+                    (await session.scalars(select(model))).all()
+                    for model in (PresentationModel, SlideModel, ImageAsset)
+                ]
+
+        with patch.object(presentation, "generate_presentation_handler", handler):
+            rows = asyncio.run(run())
+
+        assert handled == [presentation_id]
+        assert rows == [[], [], []]
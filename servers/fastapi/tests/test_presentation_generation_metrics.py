@@ -0,0 +1,81 @@
+import asyncio
+
+from services.presentation_generation_metrics import (
+    PresentationGenerationMetrics,
+    PresentationGenerationStageTracker,
+    count_in_generation_stage,
+    generation_stage,
+)
+
+
+async def generate_slide(index: int):
+    with generation_stage("slide_content"):
+        await asyncio.sleep(0.02)
+        count_in_generation_stage(slides=1, input_tokens=100, output_tokens=10)
+    with generation_stage("slide_assets"):
+        count_in_generation_stage(images=index)
+
+
+class TestPresentationGenerationMetrics:
+    """
+    Testing per stage metrics of presentation generation
+    """
+
+    def test_records_stages_of_concurrent_slides(self):
+        """
+        Slides generated in their own tasks should be recorded against their own stages
+        """
+
+        async def run():
+            metrics = PresentationGenerationMetrics()
+            with metrics.measure():
+                with generation_stage("outlines"):
+                    count_in_generation_stage(llm_requests=1, output_tokens=50)
+                    # Started while outlines stream, like the pipeline does
+                    slides = [asyncio.create_task(generate_slide(i)) for i in range(3)]
+                await asyncio.gather(*slides)
+                count_in_generation_stage(llm_cache_hits=1)
+            return metrics
+
+        metrics = asyncio.run(run())
+        stages = metrics.to_dict()["stages"]
+
+        assert stages["outlines"]["output_tokens"] == 50
+        assert stages["slide_content"]["runs"] == 3
+        assert stages["slide_content"]["slides"] == 3
+        assert stages["slide_content"]["input_tokens"] == 300
+        assert stages["slide_assets"]["images"] == 3
+        assert stages["other"]["llm_cache_hits"] == 1
+
+        # Slides overlap, so the stage took about as long as one of them
+        slide_content = metrics.stages["slide_content"]
+        assert slide_content.duration < slide_content.run_duration
+        assert slide_content.duration >= 0.02
+
+    def test_without_metrics_nothing_is_recorded(self):
+        async def run():
+            await generate_slide(1)
+
+        asyncio.run(run())
+
+        metrics = PresentationGenerationMetrics()
+        assert metrics.to_dict()["stages"] == {}
+
+    def test_tracker_adds_up_presentations(self):
+        tracker = PresentationGenerationStageTracker()
+
+        async def run():
+            metrics = PresentationGenerationMetrics()
+            with metrics.measure():
+                await generate_slide(2)
+            return metrics
+
+        tracker.record(asyncio.run(run()))
+        tracker.record(asyncio.run(run()), failed=True)
+        snapshot = tracker.snapshot()
+
+        assert snapshot["presentations"] == 2
+        assert snapshot["failed_presentations"] == 1
+        assert snapshot["stages"]["slide_content"]["slides"] == 2
+        assert snapshot["stages"]["slide_assets"]["images"] == 4
+        assert snapshot["stages"]["slide_content"]["max_duration"] >= 0.02
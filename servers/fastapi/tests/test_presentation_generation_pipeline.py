@@ -0,0 +1,198 @@
+import asyncio
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from models.presentation_layout import PresentationLayoutModel, SlideLayoutModel
+from models.presentation_outline_model import SlideOutlineModel
+from services.presentation_generation_checkpoint import (
+    PresentationGenerationCheckpoint,
+)
+from services.presentation_generation_pipeline import (
+    PresentationGenerationPipeline,
+    is_presentation_pipeline_enabled,
+)
+
+LAYOUT_MODEL = PresentationLayoutModel(
+    name="general",
+    slides=[
+        SlideLayoutModel(id=f"layout-{i}", json_schema={"type": "object"})
+        for i in range(3)
+    ],
+)
+
+
+async def no_assets(image_generation_service, slide):
+    return []
+
+
+def create_pipeline(select_layout, generate_content, window=2, checkpoint=None):
+    return PresentationGenerationPipeline(
+        presentation_id=uuid.uuid4(),
+        layout_model=LAYOUT_MODEL,
+        image_generation_service=None,
+        select_layout=select_layout,
+        generate_content=generate_content,
+        window=window,
+        checkpoint=checkpoint,
+    )
+
+
+class TestPresentationGenerationPipeline:
+    """
+    Testing per-slide pipelined generation
+    """
+
+    def test_pipeline_is_opt_in(self):
+        """
+        Per slide layout selection changes token usage, so it must be asked for
+        """
+        with patch.dict(os.environ, {"PRESENTATION_PIPELINE": ""}):
+            assert not is_presentation_pipeline_enabled()
+        with patch.dict(os.environ, {"PRESENTATION_PIPELINE": "true"}):
+            assert is_presentation_pipeline_enabled()
+
+    def test_slides_are_bounded_by_window_and_ordered(self):
+        """
+        At most window slides should be generated at once, results come back in slide order
+        """
+        in_flight = 0
+        max_in_flight = 0
+
+        async def select_layout(index, outline):
+            return index % 3
+
+        async def generate_content(slide_layout, outline):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"title": outline.content, "__speaker_note__": "note"}
+
+        async def run():
+            pipeline = create_pipeline(select_layout, generate_content)
+            for index in reversed(range(5)):
+                pipeline.add_outline(index, SlideOutlineModel(content=f"slide {index}"))
+            # Adding an outline twice is a no-op
+            pipeline.add_outline(0, SlideOutlineModel(content="duplicate"))
+            return await pipeline.finish()
+
+        with patch(
+            "services.presentation_generation_pipeline.process_slide_and_fetch_assets",
+            no_assets,
+        ):
+            layout_indices, slides, assets = asyncio.run(run())
+
+        assert max_in_flight == 2
+        assert layout_indices == [0, 1, 2, 0, 1]
+        assert [slide.index for slide in slides] == list(range(5))
+        assert [slide.content["title"] for slide in slides] == [
+            f"slide {i}" for i in range(5)
+        ]
+        assert slides[1].layout == "layout-1"
+        assert slides[0].speaker_note == "note"
+        assert assets == []
+
+    def test_out_of_range_layout_falls_back(self):
+        async def select_layout(index, outline):
+            return 42
+
+        async def generate_content(slide_layout, outline):
+            return {}
+
+        async def run():
+            pipeline = create_pipeline(select_layout, generate_content)
+            pipeline.add_outline(0, SlideOutlineModel(content="slide"))
+            return await pipeline.finish()
+
+        with patch(
+            "services.presentation_generation_pipeline.process_slide_and_fetch_assets",
+            no_assets,
+        ):
+            layout_indices, slides, _ = asyncio.run(run())
+
+        assert 0 <= layout_indices[0] < len(LAYOUT_MODEL.slides)
+        assert slides[0].layout == LAYOUT_MODEL.slides[layout_indices[0]].id
+
+    def test_failed_slide_cancels_the_rest(self):
+        """
+        A failing slide should cancel the slides still in flight
+        """
+        cancelled = []
+
+        async def select_layout(index, outline):
+            return 0
+
+        async def generate_content(slide_layout, outline):
+            if outline.content == "fail":
+                raise RuntimeError("generation failed")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(outline.content)
+                raise
+            return {}
+
+        async def run():
+            pipeline = create_pipeline(select_layout, generate_content, window=3)
+            pipeline.add_outline(0, SlideOutlineModel(content="slow"))
+            pipeline.add_outline(1, SlideOutlineModel(content="fail"))
+            await pipeline.finish()
+
+        with patch(
+            "services.presentation_generation_pipeline.process_slide_and_fetch_assets",
+            no_assets,
+        ), pytest.raises(RuntimeError):
+            asyncio.run(run())
+
+        assert cancelled == ["slow"]
+
+    def test_resumes_from_checkpoint(self):
+        """
+        Slides with saved content or assets should not be generated again
+        """
+        generated = []
+        fetched = []
+
+        async def select_layout(index, outline):
+            return 0
+
+        async def generate_content(slide_layout, outline):
+            generated.append(outline.content)
+            return {"title": outline.content}
+
+        async def fetch_assets(image_generation_service, slide):
+            fetched.append(slide.index)
+            slide.content["__image_url__"] = f"/images/{slide.index}.png"
+            return []
+
+        async def run():
+            checkpoint = PresentationGenerationCheckpoint(None)
+            await checkpoint.save_slide_content(0, 2, {"title": "saved"})
+            await checkpoint.save_slide_assets(
+                0, {"title": "saved", "__image_url__": "/images/saved.png"}, []
+            )
+            await checkpoint.save_slide_content(1, 1, {"title": "saved content"})
+
+            pipeline = create_pipeline(
+                select_layout, generate_content, checkpoint=checkpoint
+            )
+            for index in range(3):
+                pipeline.add_outline(index, SlideOutlineModel(content=f"slide {index}"))
+            return await pipeline.finish(), checkpoint
+
+        with patch(
+            "services.presentation_generation_pipeline.process_slide_and_fetch_assets",
+            fetch_assets,
+        ):
+            (layout_indices, slides, _), checkpoint = asyncio.run(run())
+
+        assert generated == ["slide 2"]
+        assert fetched == [1, 2]
+        assert layout_indices == [2, 1, 0]
+        assert slides[0].content["__image_url__"] == "/images/saved.png"
+        assert slides[1].content["title"] == "saved content"
+        assert checkpoint.get_slide_assets(2)[0]["__image_url__"] == "/images/2.png"
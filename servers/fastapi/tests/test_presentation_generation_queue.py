@@ -0,0 +1,559 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import os
+from unittest.mock import patch
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, inspect, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from models.generate_presentation_request import GeneratePresentationRequest
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from services.database import add_missing_columns
+from services.presentation_generation_checkpoint import (
+    PresentationGenerationCheckpoint,
+)
+from services.presentation_generation_queue import (
+    PresentationGenerationQueue,
+    PresentationGenerationWaiting,
+)
+
+QUEUE_ENV = {
+    "PRESENTATION_QUEUE_POLL_INTERVAL": "0.01",
+    "PRESENTATION_QUEUE_VISIBILITY_TIMEOUT": "0.05",
+}
+
+
+@pytest.fixture
+def session_maker(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/queue.db")
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                lambda sync_conn: SQLModel.metadata.create_all(
+                    sync_conn, tables=[AsyncPresentationGenerationTaskModel.__table__]
+                )
+            )
+
+    asyncio.run(create_tables())
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def enqueue(queue: PresentationGenerationQueue, priority: int = 0) -> str:
+    async with queue.session_maker() as session:
+        task = await queue.enqueue(
+            session,
+            uuid.uuid4(),
+            GeneratePresentationRequest(content="Solar energy"),
+            priority,
+        )
+        return task.id
+
+
+async def get_task(queue: PresentationGenerationQueue, task_id: str):
+    async with queue.session_maker() as session:
+        return await session.get(AsyncPresentationGenerationTaskModel, task_id)
+
+
+class StubBatchService:
+    poll_interval = 0.01
+
+    def __init__(self):
+        self.done_batches = set()
+        self.cancelled_batches = []
+
+    async def is_batch_done(self, batch_request: dict) -> bool:
+        return batch_request["batch_id"] in self.done_batches
+
+    async def cancel_batch(self, batch_request: dict):
+        self.cancelled_batches.append(batch_request["batch_id"])
+
+
+async def wait_for_batches(session_maker, task_id: str, batch_ids: list):
+    async with session_maker() as session:
+        task = await session.get(AsyncPresentationGenerationTaskModel, task_id)
+        task.status = "waiting"
+        session.add(task)
+        await session.commit()
+        await PresentationGenerationCheckpoint(task, session_maker).save_batch_requests(
+            {
+                index: {"batch_id": batch_id, "custom_id": str(index)}
+                for index, batch_id in enumerate(batch_ids)
+            }
+        )
+
+
+class TestPresentationGenerationQueue:
+    """
+    Testing the database backed async generation queue
+    """
+
+    def test_leases_by_priority_then_age(self, session_maker):
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            first = await enqueue(queue)
+            second = await enqueue(queue)
+            urgent = await enqueue(queue, priority=5)
+
+            assert await queue.lease(2) == [urgent, first]
+            assert await queue.lease(2) == [second]
+            assert await queue.lease(2) == []
+
+            task = await get_task(queue, urgent)
+            assert task.status == "processing"
+            assert task.attempts == 1
+            assert task.leased_by == queue.worker_id
+
+        asyncio.run(run())
+
+    def test_expired_lease_is_leased_again(self, session_maker):
+        """
+        A job whose worker stopped renewing its lease should run again
+        """
+
+        async def run():
+            crashed_worker = PresentationGenerationQueue(session_maker)
+            other_worker = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(crashed_worker)
+
+            assert await crashed_worker.lease(1) == [task_id]
+            assert await other_worker.lease(1) == []
+
+            await asyncio.sleep(0.1)
+            assert await other_worker.lease(1) == [task_id]
+            task = await get_task(other_worker, task_id)
+            assert task.attempts == 2
+            assert task.leased_by == other_worker.worker_id
+
+        with patch.dict(os.environ, QUEUE_ENV):
+            asyncio.run(run())
+
+    def test_uploaded_files_outlive_the_upload_temp_dir(self, session_maker, tmp_path):
+        """
+        Workers on other nodes or after a restart can't read upload temp dirs
+        """
+        uploads = []
+        for name in ("first", "second"):
+            (tmp_path / name).mkdir()
+            upload = tmp_path / name / "report.pdf"
+            upload.write_bytes(name.encode())
+            uploads.append(str(upload))
+
+        async def run():
+            queue = PresentationGenerationQueue(
+                session_maker, str(tmp_path / "queued_files")
+            )
+            async with session_maker() as session:
+                task = await queue.enqueue(
+                    session,
+                    uuid.uuid4(),
+                    GeneratePresentationRequest(content="Solar energy", files=uploads),
+                )
+            for upload in uploads:
+                os.remove(upload)
+
+            files = GeneratePresentationRequest(**task.request).files
+            contents = []
+            for each in files:
+                with open(each, "rb") as file:
+                    contents.append(file.read())
+
+            await queue.lease(1)
+            async with session_maker() as session:
+                task = await session.get(AsyncPresentationGenerationTaskModel, task.id)
+                task.status = "completed"
+                await queue.save_final_status(session, task)
+            return files, contents
+
+        files, contents = asyncio.run(run())
+
+        assert contents == [b"first", b"second"]
+        assert all(each.startswith(str(tmp_path / "queued_files")) for each in files)
+        assert all(os.path.basename(each) == "report.pdf" for each in files)
+        # Deleted once the task completes
+        assert not any(os.path.exists(each) for each in files)
+
+    def test_leases_expire_in_utc(self, session_maker):
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(queue)
+            await queue.lease(1)
+            return await get_task(queue, task_id)
+
+        with patch.dict(os.environ, {"PRESENTATION_QUEUE_VISIBILITY_TIMEOUT": "60"}):
+            task = asyncio.run(run())
+
+        expires_in = task.lease_expires_at - datetime.now(timezone.utc).replace(
+            tzinfo=None
+        )
+        assert timedelta(seconds=50) < expires_in <= timedelta(seconds=60)
+
+    def test_job_stops_when_its_lease_is_taken_over(self, session_maker):
+        """
+        A worker that lost its lease mustn't keep generating or save a status
+        """
+        started = asyncio.Event()
+        cancelled = []
+
+        async def handler(async_status, sql_session):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(async_status.id)
+                raise
+
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(queue)
+            queue.start(handler)
+            await asyncio.wait_for(started.wait(), 1)
+
+            # Leased by another worker after this one's lease expired
+            async with session_maker() as session:
+                await session.execute(
+                    update(AsyncPresentationGenerationTaskModel)
+                    .where(AsyncPresentationGenerationTaskModel.id == task_id)
+                    .values(leased_by="other-worker", attempts=2)
+                )
+                await session.commit()
+
+            for _ in range(100):
+                if not queue.running:
+                    break
+                await asyncio.sleep(0.01)
+            assert queue.running == 0
+            await queue.stop()
+            return task_id, await get_task(queue, task_id)
+
+        with patch.dict(os.environ, QUEUE_ENV):
+            task_id, task = asyncio.run(run())
+
+        assert cancelled == [task_id]
+        assert task.status == "processing"
+        assert task.leased_by == "other-worker"
+        assert task.attempts == 2
+
+    def test_final_status_is_only_saved_by_the_lease_holder(self, session_maker):
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(queue)
+            await queue.lease(1)
+
+            stale_task = await get_task(queue, task_id)
+            task = await get_task(queue, task_id)
+            async with session_maker() as session:
+                await session.execute(
+                    update(AsyncPresentationGenerationTaskModel)
+                    .where(AsyncPresentationGenerationTaskModel.id == task_id)
+                    .values(leased_by="other-worker")
+                )
+                await session.commit()
+
+            async with session_maker() as session:
+                session.add(stale_task)
+                stale_task.status = "completed"
+                stale_task.message = "Completed by a stale worker"
+                assert not await queue.save_final_status(session, stale_task)
+                assert stale_task.status == "processing"
+
+            async with session_maker() as session:
+                await session.execute(
+                    update(AsyncPresentationGenerationTaskModel)
+                    .where(AsyncPresentationGenerationTaskModel.id == task_id)
+                    .values(leased_by=queue.worker_id)
+                )
+                await session.commit()
+                session.add(task)
+                task.status = "completed"
+                assert await queue.save_final_status(session, task)
+
+            return await get_task(queue, task_id)
+
+        task = asyncio.run(run())
+        assert task.status == "completed"
+        assert task.message == "Queued for generation"
+
+    def test_fails_job_after_max_attempts(self, session_maker):
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(queue)
+
+            assert await queue.lease(1) == [task_id]
+            await asyncio.sleep(0.1)
+            assert await queue.lease(1) == []
+
+            task = await get_task(queue, task_id)
+            assert task.status == "error"
+            assert task.leased_by is None
+
+        with patch.dict(
+            os.environ, {**QUEUE_ENV, "PRESENTATION_QUEUE_MAX_ATTEMPTS": "1"}
+        ), patch("services.presentation_generation_queue.CONCURRENT_SERVICE"):
+            asyncio.run(run())
+
+    def test_runs_jobs_up_to_max_concurrency(self, session_maker):
+        """
+        Queued jobs should all run, never more than max concurrency at once
+        """
+        in_flight = 0
+        max_in_flight = 0
+
+        async def handler(async_status, sql_session):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            async_status.status = "completed"
+            sql_session.add(async_status)
+            await sql_session.commit()
+
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_ids = [await enqueue(queue) for _ in range(5)]
+            queue.start(handler)
+            try:
+                for _ in range(200):
+                    tasks = [await get_task(queue, each) for each in task_ids]
+                    if all(task.status == "completed" for task in tasks):
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await queue.stop()
+            return [await get_task(queue, each) for each in task_ids]
+
+        env = {
+            **QUEUE_ENV,
+            "PRESENTATION_QUEUE_VISIBILITY_TIMEOUT": "60",
+            "PRESENTATION_QUEUE_MAX_CONCURRENCY": "2",
+        }
+        with patch.dict(os.environ, env):
+            tasks = asyncio.run(run())
+
+        assert [task.status for task in tasks] == ["completed"] * 5
+        assert all(task.leased_by is None for task in tasks)
+        assert max_in_flight == 2
+
+    def test_stop_hands_running_jobs_back(self, session_maker):
+        started = asyncio.Event()
+
+        async def handler(async_status, sql_session):
+            started.set()
+            await asyncio.sleep(10)
+
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(queue)
+            queue.start(handler)
+            await asyncio.wait_for(started.wait(), 1)
+            await queue.stop()
+            return await get_task(queue, task_id)
+
+        with patch.dict(os.environ, QUEUE_ENV):
+            task = asyncio.run(run())
+
+        assert task.status == "pending"
+        assert task.attempts == 0
+        assert task.leased_by is None
+
+    def test_cancels_pending_task(self, session_maker):
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(queue)
+            async with session_maker() as session:
+                task = await session.get(AsyncPresentationGenerationTaskModel, task_id)
+                assert await queue.cancel(session, task)
+                assert task.status == "cancelled"
+                # Already finished
+                assert not await queue.cancel(session, task)
+            assert await queue.lease(1) == []
+
+        asyncio.run(run())
+
+    def test_cancels_running_job(self, session_maker):
+        """
+        A running job should be cancelled at once and not be queued again
+        """
+        cancelled = asyncio.Event()
+
+        async def handler(async_status, sql_session):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(queue)
+            queue.start(handler)
+            try:
+                while not queue.running:
+                    await asyncio.sleep(0.01)
+                async with session_maker() as session:
+                    task = await session.get(
+                        AsyncPresentationGenerationTaskModel, task_id
+                    )
+                    assert await queue.cancel(session, task)
+                await asyncio.wait_for(cancelled.wait(), 1)
+                while queue.running:
+                    await asyncio.sleep(0.01)
+            finally:
+                await queue.stop()
+            return await get_task(queue, task_id)
+
+        env = {**QUEUE_ENV, "PRESENTATION_QUEUE_VISIBILITY_TIMEOUT": "60"}
+        with patch.dict(os.environ, env):
+            task = asyncio.run(run())
+
+        assert task.status == "cancelled"
+        assert not task.cancel_requested
+        assert task.leased_by is None
+
+    def test_cancels_job_requested_through_another_worker(self, session_maker):
+        """
+        The worker running a job should pick up a cancel request made elsewhere
+        """
+
+        async def handler(async_status, sql_session):
+            await asyncio.sleep(10)
+
+        async def run():
+            worker = PresentationGenerationQueue(session_maker)
+            api = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(api)
+            worker.start(handler)
+            try:
+                while not worker.running:
+                    await asyncio.sleep(0.01)
+                async with session_maker() as session:
+                    task = await session.get(
+                        AsyncPresentationGenerationTaskModel, task_id
+                    )
+                    assert await api.cancel(session, task)
+                    assert task.cancel_requested
+                for _ in range(100):
+                    if not worker.running:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await worker.stop()
+            return await get_task(worker, task_id)
+
+        env = {**QUEUE_ENV, "PRESENTATION_QUEUE_VISIBILITY_TIMEOUT": "60"}
+        with patch.dict(os.environ, env):
+            task = asyncio.run(run())
+
+        assert task.status == "cancelled"
+
+    def test_job_waiting_for_batches_gives_up_its_lease(self, session_maker):
+        """
+        A job should not hold a worker while its batch runs, and should run
+        again once the batch has ended
+        """
+        batch_service = StubBatchService()
+        runs = []
+
+        async def handler(async_status, sql_session):
+            runs.append(async_status.attempts)
+            if len(runs) == 1:
+                await PresentationGenerationCheckpoint(
+                    async_status, session_maker
+                ).save_batch_requests({0: {"batch_id": "batch-1", "custom_id": "0"}})
+                raise PresentationGenerationWaiting("Waiting for slides from batch API")
+            async_status.status = "completed"
+            sql_session.add(async_status)
+            await sql_session.commit()
+
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            task_id = await enqueue(queue)
+            queue.start(handler)
+            try:
+                while not runs or queue.running:
+                    await asyncio.sleep(0.01)
+                # Polled without running the job again
+                await asyncio.sleep(0.1)
+                waiting = await get_task(queue, task_id)
+
+                batch_service.done_batches.add("batch-1")
+                for _ in range(100):
+                    task = await get_task(queue, task_id)
+                    if task.status == "completed":
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await queue.stop()
+            return waiting, task
+
+        with patch.dict(os.environ, QUEUE_ENV), patch(
+            "services.presentation_generation_queue.LLM_BATCH_SERVICE", batch_service
+        ):
+            waiting, task = asyncio.run(run())
+
+        assert waiting.status == "waiting"
+        assert waiting.message == "Waiting for slides from batch API"
+        assert waiting.leased_by is None
+        # Waiting doesn't use up an attempt
+        assert waiting.attempts == 0
+        assert runs == [1, 1]
+        assert task.status == "completed"
+        assert task.checkpoint["batch_requests"]["0"]["batch_id"] == "batch-1"
+
+    def test_cancelling_waiting_task_cancels_unused_batches(self, session_maker):
+        """
+        A batch should only be cancelled once no unfinished task waits on it
+        """
+        batch_service = StubBatchService()
+
+        async def run():
+            queue = PresentationGenerationQueue(session_maker)
+            cancelled_id = await enqueue(queue)
+            other_id = await enqueue(queue)
+            await wait_for_batches(session_maker, cancelled_id, ["batch-1", "batch-2"])
+            await wait_for_batches(session_maker, other_id, ["batch-2"])
+
+            async with session_maker() as session:
+                task = await session.get(
+                    AsyncPresentationGenerationTaskModel, cancelled_id
+                )
+                assert await queue.cancel(session, task)
+                assert task.status == "cancelled"
+            # Waiting tasks aren't leased until their batches end
+            assert await queue.lease(2) == []
+
+        with patch(
+            "services.presentation_generation_queue.LLM_BATCH_SERVICE", batch_service
+        ):
+            asyncio.run(run())
+
+        assert batch_service.cancelled_batches == ["batch-1"]
+
+    def test_adds_queue_columns_to_existing_table(self, tmp_path):
+        """
+        Databases created before the queue should get its columns on startup
+        """
+        engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE async_presentation_generation_tasks "
+                    "(id VARCHAR PRIMARY KEY, status VARCHAR, message VARCHAR, "
+                    "error JSON, created_at DATETIME, updated_at DATETIME, data JSON)"
+                )
+            )
+            add_missing_columns(conn, [AsyncPresentationGenerationTaskModel.__table__])
+
+        columns = {
+            column["name"]
+            for column in inspect(engine).get_columns(
+                "async_presentation_generation_tasks"
+            )
+        }
+        assert {"request", "priority", "attempts", "lease_expires_at"} <= columns
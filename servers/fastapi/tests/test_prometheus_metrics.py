@@ -0,0 +1,139 @@
+import asyncio
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from api.metrics import get_prometheus_metrics
+from api.middlewares import PrometheusMetricsMiddleware
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from services.llm_usage_tracker import LLMUsage
+from services.prometheus_metrics import PrometheusMetrics
+
+
+def get_sample(metrics: PrometheusMetrics, name: str, labels: dict) -> float:
+    return metrics.registry.get_sample_value(name, labels) or 0
+
+
+class TestPrometheusMetrics:
+    """
+    Testing Prometheus metrics of the server
+    """
+
+    def test_times_calls_by_status(self):
+        metrics = PrometheusMetrics(enabled=True)
+
+        async def run():
+            with metrics.time_llm_request("openai", "gpt-4.1"):
+                await asyncio.sleep(0)
+            with pytest.raises(RuntimeError), metrics.time_llm_request(
+                "openai", "gpt-4.1"
+            ):
+                raise RuntimeError("rate limited")
+
+            async def slow_image():
+                with metrics.time_image_generation("dall-e-3"):
+                    await asyncio.sleep(10)
+
+            task = asyncio.create_task(slow_image())
+            await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(run())
+        metrics.record_llm_tokens(
+            "openai", "gpt-4.1", LLMUsage(input_tokens=120, output_tokens=30)
+        )
+
+        llm_duration = "presenton_llm_request_duration_seconds_count"
+        for status in ("success", "error"):
+            labels = {"provider": "openai", "model": "gpt-4.1", "status": status}
+            assert get_sample(metrics, llm_duration, labels) == 1
+        assert (
+            get_sample(
+                metrics,
+                "presenton_image_generation_duration_seconds_count",
+                {"provider": "dall-e-3", "status": "cancelled"},
+            )
+            == 1
+        )
+        assert (
+            get_sample(
+                metrics,
+                "presenton_llm_tokens_total",
+                {"provider": "openai", "model": "gpt-4.1", "type": "input"},
+            )
+            == 120
+        )
+
+    def test_disabled_metrics_do_nothing(self):
+        metrics = PrometheusMetrics(enabled=False)
+        with metrics.time_export("pptx"), metrics.track_generation():
+            metrics.record_generation_task("queued")
+        assert not hasattr(metrics, "registry")
+
+    def test_records_requests_by_route(self):
+        """
+        Requests should be labelled with their route, not the requested path
+        """
+        metrics = PrometheusMetrics(enabled=True)
+        app = FastAPI()
+
+        @app.get("/presentation/{id}")
+        async def get_presentation(id: str):
+            return {"id": id}
+
+        app.add_middleware(PrometheusMetricsMiddleware)
+        with patch("api.middlewares.PROMETHEUS_METRICS", metrics):
+            client = TestClient(app)
+            client.get("/presentation/first")
+            client.get("/presentation/second")
+            client.get("/missing")
+
+        count = "presenton_http_request_duration_seconds_count"
+        assert (
+            get_sample(
+                metrics,
+                count,
+                {"method": "GET", "route": "/presentation/{id}", "status": "200"},
+            )
+            == 2
+        )
+        assert (
+            get_sample(
+                metrics, count, {"method": "GET", "route": "unmatched", "status": "404"}
+            )
+            == 1
+        )
+
+    def test_exposes_queue_depth(self, tmp_path):
+        metrics = PrometheusMetrics(enabled=True)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/metrics.db")
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def run():
+            async with engine.begin() as conn:
+                await conn.run_sync(
+                    lambda sync_conn: SQLModel.metadata.create_all(
+                        sync_conn,
+                        tables=[AsyncPresentationGenerationTaskModel.__table__],
+                    )
+                )
+            async with session_maker() as session:
+                for status in ("pending", "pending", "processing", "completed"):
+                    session.add(AsyncPresentationGenerationTaskModel(status=status))
+                await session.commit()
+                return await get_prometheus_metrics(session)
+
+        with patch("api.metrics.PROMETHEUS_METRICS", metrics):
+            response = asyncio.run(run())
+
+        body = response.body.decode()
+        queue_depth = "presenton_presentation_generation_queue_depth"
+        assert f'{queue_depth}{{status="pending"}} 2.0' in body
+        assert f'{queue_depth}{{status="processing"}} 1.0' in body
@@ -0,0 +1,165 @@
+import asyncio
+import os
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+from models.image_prompt import ImagePrompt
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from models.sql.image_asset import ImageAsset
+from services.image_generation_service import ImageGenerationService
+from services.presentation_generation_checkpoint import (
+    PresentationGenerationCheckpoint,
+)
+from utils.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """
+    Testing that identical work in flight is done once and shared
+    """
+
+    def test_callers_of_a_key_in_flight_share_the_call(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def work(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return object()
+
+        async def run():
+            results = await asyncio.gather(
+                single_flight.run("a", lambda: work("a")),
+                single_flight.run("a", lambda: work("a")),
+                single_flight.run("b", lambda: work("b")),
+            )
+            # Finished calls aren't remembered
+            later = await single_flight.run("a", lambda: work("a"))
+            return results, later
+
+        results, later = asyncio.run(run())
+
+        assert calls == ["a", "b", "a"]
+        assert results[0] is results[1]
+        assert later is not results[0]
+        assert single_flight.coalesced == 1
+        assert single_flight._calls == {}
+
+    def test_call_is_cancelled_only_with_its_last_caller(self):
+        single_flight = SingleFlight()
+        started = []
+        cancelled = []
+
+        async def work():
+            started.append(True)
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            first = asyncio.create_task(single_flight.run("a", work))
+            second = asyncio.create_task(single_flight.run("a", work))
+            await asyncio.sleep(0.01)
+
+            first.cancel()
+            await asyncio.sleep(0.01)
+            assert cancelled == []
+            assert not second.done()
+
+            second.cancel()
+            await asyncio.sleep(0.01)
+            assert cancelled == [True]
+
+        asyncio.run(run())
+        assert started == [True]
+
+    def generate_images(self, tmp_path, prompts):
+        calls = []
+
+        async def generate_image_openai(prompt, output_directory, model, quality):
+            calls.append(prompt)
+            await asyncio.sleep(0.01)
+            image_path = os.path.join(output_directory, f"{prompt}.png")
+            with open(image_path, "wb") as file:
+                file.write(prompt.encode())
+            return image_path
+
+        async def run():
+            service = ImageGenerationService(str(tmp_path))
+            with patch.object(service, "generate_image_openai", generate_image_openai):
+                return await asyncio.gather(
+                    *(service.generate_image(prompt) for prompt in prompts)
+                )
+
+        with patch.dict(
+            os.environ, {"IMAGE_PROVIDER": "dall-e-3", "IMAGE_CACHE": "false"}
+        ):
+            return asyncio.run(run()), calls
+
+    def test_identical_image_prompts_in_a_deck_are_generated_once(self, tmp_path):
+        images, calls = self.generate_images(
+            tmp_path,
+            [
+                ImagePrompt(prompt="Team meeting", theme_prompt="flat"),
+                ImagePrompt(prompt="Team meeting", theme_prompt="flat"),
+                ImagePrompt(prompt="Team meeting", theme_prompt="dark"),
+            ],
+        )
+
+        assert sorted(calls) == ["Team meeting, dark", "Team meeting, flat"]
+        # Every slide gets its own asset and file, with the same image
+        assert len({image.id for image in images}) == 3
+        assert len({image.path for image in images}) == 3
+        with open(images[1].path, "rb") as file:
+            assert file.read() == b"Team meeting, flat"
+
+    def test_resumed_deck_with_shared_image_saves_every_asset(self, tmp_path):
+        """
+        Assets restored from the checkpoint are saved again when a task resumes
+        """
+        images, _ = self.generate_images(
+            tmp_path, [ImagePrompt(prompt="Team meeting", theme_prompt="flat")] * 2
+        )
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/resume.db")
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def run():
+            async with engine.begin() as conn:
+                await conn.run_sync(
+                    lambda sync_conn: SQLModel.metadata.create_all(
+                        sync_conn,
+                        tables=[
+                            AsyncPresentationGenerationTaskModel.__table__,
+                            ImageAsset.__table__,
+                        ],
+                    )
+                )
+            async with session_maker() as session:
+                task = AsyncPresentationGenerationTaskModel(status="processing")
+                session.add(task)
+                await session.commit()
+
+            checkpoint = PresentationGenerationCheckpoint(task, session_maker)
+            for index, image in enumerate(images):
+                await checkpoint.save_slide_assets(
+                    index, {"__image_url__": image.path}, [image]
+                )
+            await checkpoint.flush()
+
+            async with session_maker() as session:
+                task = await session.get(AsyncPresentationGenerationTaskModel, task.id)
+                resumed = PresentationGenerationCheckpoint(task, session_maker)
+                for index in range(len(images)):
+                    _, assets = resumed.get_slide_assets(index)
+                    session.add_all(assets)
+                await session.commit()
+                return (await session.scalars(select(ImageAsset))).all()
+
+        saved = asyncio.run(run())
+        assert {asset.id for asset in saved} == {image.id for image in images}
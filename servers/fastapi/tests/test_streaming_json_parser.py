@@ -0,0 +1,76 @@
+import json
+
+from utils.streaming_json_parser import ANY, StreamingJSONParser
+
+OUTLINES = {
+    "slides": [
+        {"content": "# Title\nWelcome"},
+        {"content": 'Quote: "hello, world" {not json}'},
+        {"content": "Numbers", "count": 12, "ratio": -1.5e2, "done": True},
+    ]
+}
+
+
+def feed_in_chunks(parser: StreamingJSONParser, text: str, size: int):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.append(parser.feed(text[start : start + size]))
+    return completed
+
+
+class TestStreamingJSONParser:
+    """
+    Testing incremental parsing of streamed structured output
+    """
+
+    def test_emits_each_slide_once_it_closes(self):
+        """
+        Every slide should be emitted in the chunk that completes it
+        """
+        text = json.dumps(OUTLINES)
+        parser = StreamingJSONParser(paths=[("slides", ANY)])
+        completed = feed_in_chunks(parser, text, 7)
+
+        slides = [each for chunk in completed for each in chunk]
+        assert slides == [
+            (("slides", index), slide)
+            for index, slide in enumerate(OUTLINES["slides"])
+        ]
+        # The first slide is ready long before the stream ends
+        first_ready = next(i for i, chunk in enumerate(completed) if chunk)
+        assert first_ready < len(completed) // 2
+        assert parser.is_complete
+        assert parser.get_value() == OUTLINES
+
+    def test_emits_nested_fields(self):
+        parser = StreamingJSONParser(paths=[("slides", ANY, "count")])
+        completed = parser.feed(json.dumps(OUTLINES))
+        assert completed == [(("slides", 2, "count"), 12)]
+
+    def test_ignores_text_around_document(self):
+        parser = StreamingJSONParser()
+        parser.feed('```json\n{"slides": []}\n```')
+        assert parser.get_value() == {"slides": []}
+
+    def test_partial_document_closes_open_values(self):
+        """
+        Partial fields should be readable while they are still streaming
+        """
+        parser = StreamingJSONParser()
+        parser.feed('{"slides": [{"content": "Intro"}, {"content": "Half wr')
+        assert parser.get_partial() == {
+            "slides": [{"content": "Intro"}, {"content": "Half wr"}]
+        }
+
+    def test_partial_document_drops_dangling_keys(self):
+        parser = StreamingJSONParser()
+        parser.feed('{"title": "Deck", "count": 1')
+        assert parser.get_partial() == {"title": "Deck"}
+
+        parser = StreamingJSONParser()
+        parser.feed('{"title": "Deck", "sli')
+        assert parser.get_partial() == {"title": "Deck"}
+
+        parser = StreamingJSONParser()
+        parser.feed('{"title": "Deck", "slides":')
+        assert parser.get_partial() == {"title": "Deck"}
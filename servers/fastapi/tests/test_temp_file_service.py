@@ -0,0 +1,53 @@
+import os
+import socket
+from unittest.mock import patch
+
+from services.temp_file_service import TempFileService
+
+# Above the highest process id Linux hands out
+STOPPED_PID = 2**22 + 1
+
+
+class TestTempFileService:
+    """
+    Testing per process temp directories in the shared temp directory
+    """
+
+    def test_old_temp_files_are_moved_aside_and_deleted_later(self, tmp_path):
+        with patch.dict(os.environ, {"TEMP_DIRECTORY": str(tmp_path)}):
+            service = TempFileService()
+        base_dir = tmp_path / os.path.basename(service.base_dir)
+        (base_dir / "export").mkdir(parents=True)
+        (base_dir / "export" / "deck.pptx").write_bytes(b"pptx")
+
+        service.move_aside_base_dir()
+        assert list(base_dir.iterdir()) == []
+        old_dirs = list(tmp_path.glob(f"{base_dir.name}.old-*"))
+        assert len(old_dirs) == 1
+        assert (old_dirs[0] / "export" / "deck.pptx").exists()
+
+        service.cleanup_old_base_dirs()
+        assert list(tmp_path.iterdir()) == [base_dir]
+
+    def test_only_temp_files_of_stopped_processes_are_deleted(self, tmp_path):
+        """
+        Worker processes and the Next.js server share the temp directory
+        """
+        hostname = socket.gethostname()
+        running = tmp_path / f"process-{hostname}-{os.getppid()}" / "export"
+        stopped = tmp_path / f"process-{hostname}-{STOPPED_PID}" / "export"
+        other_host = tmp_path / f"process-other-{hostname}-{STOPPED_PID}" / "export"
+        screenshots = tmp_path / "screenshots"
+        for each in (running, stopped, other_host, screenshots):
+            each.mkdir(parents=True)
+
+        with patch.dict(os.environ, {"TEMP_DIRECTORY": str(tmp_path)}):
+            service = TempFileService()
+        service.move_aside_base_dir()
+        service.cleanup_old_base_dirs()
+
+        assert running.exists()
+        assert not stopped.parent.exists()
+        assert other_host.exists()
+        assert screenshots.exists()
+        assert os.path.isdir(service.base_dir)
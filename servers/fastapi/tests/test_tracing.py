@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from api.middlewares import TracingMiddleware
+from services.presentation_generation_metrics import generation_stage
+from services.tracing import Tracing
+
+
+def read_spans(path) -> list[dict]:
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+@pytest.fixture
+def tracing(tmp_path):
+    traces_path = tmp_path / "traces.jsonl"
+    tracing = Tracing()
+    with patch.dict(
+        os.environ, {"TRACING_EXPORTER": "file", "TRACING_FILE": str(traces_path)}
+    ):
+        tracing.setup("presenton-test")
+    yield tracing, traces_path
+    tracing.shutdown()
+
+
+class TestTracing:
+    """
+    Testing OpenTelemetry tracing of presentation generation
+    """
+
+    def test_spans_follow_stages_and_calls(self, tracing):
+        tracing, traces_path = tracing
+
+        async def generate_slide():
+            with generation_stage("slide_content"):
+                with tracing.span("llm.generate", kind="client", model="gpt-4.1"):
+                    await asyncio.sleep(0)
+
+        async def run():
+            with patch("services.presentation_generation_metrics.TRACING", tracing):
+                with tracing.span("presentation.generate"):
+                    await asyncio.gather(
+                        asyncio.create_task(generate_slide()), generate_slide()
+                    )
+                    with pytest.raises(RuntimeError), tracing.span("export.pptx"):
+                        raise RuntimeError("Next.js is not running")
+
+        asyncio.run(run())
+        tracing.shutdown()
+
+        spans = read_spans(traces_path)
+        by_id = {span["context"]["span_id"]: span for span in spans}
+        root = next(span for span in spans if span["name"] == "presentation.generate")
+
+        assert len({span["context"]["trace_id"] for span in spans}) == 1
+        llm_calls = [span for span in spans if span["name"] == "llm.generate"]
+        assert len(llm_calls) == 2
+        for llm_call in llm_calls:
+            stage = by_id[llm_call["parent_id"]]
+            assert stage["name"] == "presentation.slide_content"
+            assert stage["parent_id"] == root["context"]["span_id"]
+            assert llm_call["kind"] == "SpanKind.CLIENT"
+
+        export = next(span for span in spans if span["name"] == "export.pptx")
+        assert export["status"]["status_code"] == "ERROR"
+        assert root["status"]["status_code"] == "UNSET"
+        assert root["resource"]["attributes"]["service.name"] == "presenton-test"
+
+    def test_propagates_trace_to_and_from_other_services(self, tracing):
+        tracing, traces_path = tracing
+        app = FastAPI()
+
+        @app.get("/presentation/{id}")
+        async def get_presentation(id: str):
+            # Like the calls to Next.js during export
+            with tracing.span("nextjs.export_as_pdf", kind="client"):
+                return tracing.get_propagation_headers()
+
+        app.add_middleware(TracingMiddleware)
+        caller_trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        with patch("api.middlewares.TRACING", tracing):
+            response = TestClient(app).get(
+                "/presentation/first",
+                headers={"traceparent": f"00-{caller_trace_id}-00f067aa0ba902b7-01"},
+            )
+        tracing.shutdown()
+
+        spans = {span["name"]: span for span in read_spans(traces_path)}
+        server = spans["GET /presentation/{id}"]
+        client = spans["nextjs.export_as_pdf"]
+
+        assert server["context"]["trace_id"] == f"0x{caller_trace_id}"
+        assert server["parent_id"] == "0x00f067aa0ba902b7"
+        assert server["attributes"]["http.status_code"] == 200
+        assert client["parent_id"] == server["context"]["span_id"]
+
+        # Next.js receives the span of the call as its parent
+        traceparent = response.json()["traceparent"]
+        assert traceparent.split("-")[1] == caller_trace_id
+        assert traceparent.split("-")[2] == client["context"]["span_id"][2:]
+
+    def test_stream_spans_are_not_current(self, tracing):
+        tracing, traces_path = tracing
+
+        async def stream():
+            with tracing.span("llm.stream", current=False):
+                for chunk in ("a", "b"):
+                    yield chunk
+
+        async def run():
+            with tracing.span("presentation.outlines"):
+                async for _ in stream():
+                    # The caller between chunks is still in its own span
+                    with tracing.span("parse_chunk"):
+                        pass
+
+        asyncio.run(run())
+        tracing.shutdown()
+
+        spans = read_spans(traces_path)
+        outlines = next(s for s in spans if s["name"] == "presentation.outlines")
+        for span in spans:
+            if span["name"] != "presentation.outlines":
+                assert span["parent_id"] == outlines["context"]["span_id"]
+
+    def test_disabled_tracing_does_nothing(self):
+        tracing = Tracing()
+        with patch.dict(os.environ, {"TRACING_EXPORTER": ""}):
+            tracing.setup()
+
+        assert not tracing.enabled
+        with tracing.span("presentation.generate") as span:
+            assert span is None
+        assert tracing.get_propagation_headers() == {}
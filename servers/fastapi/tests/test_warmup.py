@@ -0,0 +1,102 @@
+import asyncio
+import os
+import threading
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.health import HEALTH_ROUTER
+from services.database import get_async_session
+from services.warmup import Warmup
+
+
+class FakeSession:
+    async def execute(self, _):
+        return None
+
+
+class TestWarmup:
+    """
+    Testing background warm-up of slow subsystems and the readiness endpoint
+    """
+
+    def test_subsystems_warm_up_in_the_background(self):
+        warmup = Warmup()
+        loaded = threading.Event()
+        release = threading.Event()
+
+        def load_icons():
+            loaded.set()
+            release.wait(5)
+
+        def load_documents():
+            raise ImportError("No module named 'docling'")
+
+        warmup.register("icon_search", load_icons)
+        warmup.register("document_parsing", load_documents)
+
+        async def run():
+            warmup.start()
+            await asyncio.to_thread(loaded.wait, 5)
+            snapshot = warmup.snapshot()
+            release.set()
+            await warmup._task
+            return snapshot
+
+        with patch.dict(os.environ, {"WARMUP_ON_STARTUP": "true"}):
+            while_warming = asyncio.run(run())
+            finished = warmup.snapshot()
+
+        assert while_warming["ready"] is False
+        assert while_warming["subsystems"]["icon_search"]["status"] == "warming"
+        assert while_warming["subsystems"]["document_parsing"]["status"] == "cold"
+
+        assert finished["ready"] is True
+        assert finished["subsystems"]["icon_search"]["status"] == "warm"
+        assert finished["subsystems"]["icon_search"]["duration"] >= 0
+        documents = finished["subsystems"]["document_parsing"]
+        assert documents["status"] == "failed"
+        assert "docling" in documents["error"]
+
+    def test_disabled_warmup_leaves_subsystems_to_first_use(self):
+        warmup = Warmup()
+        warmup.register("icon_search", lambda: None)
+
+        async def run():
+            warmup.start()
+            await warmup.stop()
+
+        with patch.dict(os.environ, {"WARMUP_ON_STARTUP": "false"}):
+            asyncio.run(run())
+            snapshot = warmup.snapshot()
+
+        assert snapshot["ready"] is True
+        assert snapshot["subsystems"]["icon_search"]["status"] == "cold"
+
+    def test_readiness_endpoint(self):
+        app = FastAPI()
+        app.include_router(HEALTH_ROUTER)
+
+        async def get_fake_session():
+            yield FakeSession()
+
+        app.dependency_overrides[get_async_session] = get_fake_session
+        warmup = Warmup()
+        warmup.register("icon_search", lambda: None)
+
+        with patch("api.health.WARMUP", warmup), patch.dict(
+            os.environ, {"WARMUP_ON_STARTUP": "true"}
+        ):
+            client = TestClient(app)
+            assert client.get("/health").json() == {"status": "ok"}
+
+            response = client.get("/health/ready")
+            assert response.status_code == 503
+            assert response.json()["subsystems"]["icon_search"]["status"] == "cold"
+
+            asyncio.run(warmup._warm_up())
+            response = client.get("/health/ready")
+            assert response.status_code == 200
+            assert response.json()["database"] == "ok"
+            assert response.json()["subsystems"]["icon_search"]["status"] == "warm"
@@ -0,0 +1,178 @@
+import asyncio
+from contextlib import ExitStack
+import os
+import signal
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+import uuid
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from models.generate_presentation_request import GeneratePresentationRequest
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+
+FASTAPI_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs worker.py with a job handler that completes tasks without generating
+WORKER_SCRIPT = """
+import worker
+from services.tracing import TRACING
+
+
+def setup(service_name):
+    print(f"Tracing {service_name}", flush=True)
+
+
+async def run_job(async_status, sql_session):
+    async_status.status = "completed"
+    async_status.message = "Completed by the test worker"
+    sql_session.add(async_status)
+    await sql_session.commit()
+
+
+TRACING.setup = setup
+worker.run_queued_job = run_job
+worker.run_worker_process(jobs=1)
+"""
+
+
+async def create_task(session_maker: async_sessionmaker) -> str:
+    async with session_maker() as session:
+        task = AsyncPresentationGenerationTaskModel(
+            status="pending",
+            presentation_id=uuid.uuid4(),
+            request=GeneratePresentationRequest(content="Solar energy").model_dump(
+                mode="json"
+            ),
+        )
+        session.add(task)
+        await session.commit()
+        return task.id
+
+
+async def create_tables(session_maker: async_sessionmaker):
+    async with session_maker.kw["bind"].begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: SQLModel.metadata.create_all(
+                sync_conn, tables=[AsyncPresentationGenerationTaskModel.__table__]
+            )
+        )
+
+
+async def get_task(session_maker: async_sessionmaker, task_id: str):
+    async with session_maker() as session:
+        return await session.get(AsyncPresentationGenerationTaskModel, task_id)
+
+
+class TestWorker:
+    """
+    Testing the standalone worker process for queued presentation generation
+    """
+
+    def test_worker_runs_queued_task_and_stops_on_sigterm(self, tmp_path):
+        database_path = tmp_path / "fastapi.db"
+        session_maker = async_sessionmaker(
+            create_async_engine(f"sqlite+aiosqlite:///{database_path}"),
+            expire_on_commit=False,
+        )
+        asyncio.run(create_tables(session_maker))
+        task_id = asyncio.run(create_task(session_maker))
+
+        env = {
+            **os.environ,
+            "APP_DATA_DIRECTORY": str(tmp_path),
+            "TEMP_DIRECTORY": str(tmp_path / "temp"),
+            "DATABASE_URL": f"sqlite:///{database_path}",
+            "PRESENTATION_QUEUE_POLL_INTERVAL": "0.1",
+            "PROMETHEUS_METRICS": "false",
+        }
+        process = subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT],
+            cwd=FASTAPI_DIRECTORY,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        try:
+            deadline = time.monotonic() + 30
+            task = asyncio.run(get_task(session_maker, task_id))
+            while task.status != "completed" and process.poll() is None:
+                assert time.monotonic() < deadline, "Worker didn't run the task"
+                time.sleep(0.1)
+                task = asyncio.run(get_task(session_maker, task_id))
+
+            process.send_signal(signal.SIGTERM)
+            output, _ = process.communicate(timeout=30)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.communicate()
+
+        assert process.returncode == 0, output
+        assert "Tracing presenton-worker" in output
+        assert "running up to 1 presentation jobs" in output
+        assert f"Running presentation generation task: {task_id}" in output
+        assert "stopping" in output
+
+        task = asyncio.run(get_task(session_maker, task_id))
+        assert task.status == "completed"
+        assert task.message == "Completed by the test worker"
+        assert task.attempts == 1
+        # The lease is handed back when the job ends
+        assert task.leased_by is None
+
+    def test_api_leaves_queued_tasks_to_workers_when_disabled(self, tmp_path):
+        from api import lifespan
+
+        async def do_nothing():
+            pass
+
+        async def run():
+            async with lifespan.app_lifespan(FastAPI()):
+                pass
+
+        for disabled, started in (("true", False), ("false", True)):
+            queue_starts = []
+            cleanups = []
+            env = {
+                "APP_DATA_DIRECTORY": str(tmp_path),
+                "DISABLE_API_GENERATION_WORKER": disabled,
+                "WARMUP_ON_STARTUP": "false",
+            }
+            with ExitStack() as stack:
+                stack.enter_context(patch.dict(os.environ, env))
+                for target, attribute, value in (
+                    (lifespan, "create_db_and_tables", do_nothing),
+                    (
+                        lifespan,
+                        "check_llm_and_image_provider_api_or_model_availability",
+                        do_nothing,
+                    ),
+                    (lifespan.TEMP_FILE_SERVICE, "move_aside_base_dir", lambda: None),
+                    (
+                        lifespan.TEMP_FILE_SERVICE,
+                        "cleanup_old_base_dirs_in_background",
+                        lambda: cleanups.append(True),
+                    ),
+                    (lifespan.WARMUP, "start", lambda: None),
+                    (lifespan.WARMUP, "stop", do_nothing),
+                    (
+                        lifespan.PRESENTATION_GENERATION_QUEUE,
+                        "start",
+                        queue_starts.append,
+                    ),
+                    (lifespan.PRESENTATION_GENERATION_QUEUE, "stop", do_nothing),
+                ):
+                    stack.enter_context(patch.object(target, attribute, value))
+                asyncio.run(run())
+
+            assert bool(queue_starts) == started
+            # Old temp files are deleted without warm-up too
+            assert cleanups == [True]
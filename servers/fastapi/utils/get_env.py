@@ -117,3 +117,202 @@ def get_dall_e_3_quality_env():
 # Gpt Image 1.5 Quality
 def get_gpt_image_1_5_quality_env():
     return os.getenv("GPT_IMAGE_1_5_QUALITY")
+
+
+# LLM client connection pool
+def get_llm_max_connections_env():
+    return os.getenv("LLM_MAX_CONNECTIONS")
+
+
+def get_llm_max_keepalive_connections_env():
+    return os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS")
+
+
+def get_llm_keepalive_expiry_env():
+    return os.getenv("LLM_KEEPALIVE_EXPIRY")
+
+
+# LLM response cache
+def get_llm_response_cache_env():
+    return os.getenv("LLM_RESPONSE_CACHE")
+
+
+def get_llm_response_cache_ttl_env():
+    return os.getenv("LLM_RESPONSE_CACHE_TTL")
+
+
+def get_llm_response_cache_max_entries_env():
+    return os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES")
+
+
+def get_llm_response_cache_max_disk_entries_env():
+    return os.getenv("LLM_RESPONSE_CACHE_MAX_DISK_ENTRIES")
+
+
+# Image generation cache
+def get_image_cache_env():
+    return os.getenv("IMAGE_CACHE")
+
+
+def get_image_cache_max_size_mb_env():
+    return os.getenv("IMAGE_CACHE_MAX_SIZE_MB")
+
+
+def get_image_cache_max_age_env():
+    return os.getenv("IMAGE_CACHE_MAX_AGE")
+
+
+# LLM rate limits
+def get_llm_requests_per_minute_env():
+    return os.getenv("LLM_REQUESTS_PER_MINUTE")
+
+
+def get_llm_tokens_per_minute_env():
+    return os.getenv("LLM_TOKENS_PER_MINUTE")
+
+
+def get_llm_max_concurrency_env():
+    return os.getenv("LLM_MAX_CONCURRENCY")
+
+
+def get_llm_min_concurrency_env():
+    return os.getenv("LLM_MIN_CONCURRENCY")
+
+
+def get_llm_rate_limits_env():
+    return os.getenv("LLM_RATE_LIMITS")
+
+
+# LLM retries and hedging
+def get_llm_max_retries_env():
+    return os.getenv("LLM_MAX_RETRIES")
+
+
+def get_llm_retry_base_delay_env():
+    return os.getenv("LLM_RETRY_BASE_DELAY")
+
+
+def get_llm_retry_max_delay_env():
+    return os.getenv("LLM_RETRY_MAX_DELAY")
+
+
+def get_llm_retry_deadline_env():
+    return os.getenv("LLM_RETRY_DEADLINE")
+
+
+def get_llm_hedge_requests_env():
+    return os.getenv("LLM_HEDGE_REQUESTS")
+
+
+def get_llm_hedge_percentile_env():
+    return os.getenv("LLM_HEDGE_PERCENTILE")
+
+
+def get_llm_hedge_min_samples_env():
+    return os.getenv("LLM_HEDGE_MIN_SAMPLES")
+
+
+# LLM provider failover
+def get_llm_fallback_providers_env():
+    return os.getenv("LLM_FALLBACK_PROVIDERS")
+
+
+def get_llm_circuit_breaker_threshold_env():
+    return os.getenv("LLM_CIRCUIT_BREAKER_THRESHOLD")
+
+
+def get_llm_circuit_breaker_reset_timeout_env():
+    return os.getenv("LLM_CIRCUIT_BREAKER_RESET_TIMEOUT")
+
+
+# Provider side prompt caching
+def get_llm_prompt_caching_env():
+    return os.getenv("LLM_PROMPT_CACHING")
+
+
+# Provider batch APIs
+def get_llm_batch_max_requests_env():
+    return os.getenv("LLM_BATCH_MAX_REQUESTS")
+
+
+def get_llm_batch_flush_interval_env():
+    return os.getenv("LLM_BATCH_FLUSH_INTERVAL")
+
+
+def get_llm_batch_poll_interval_env():
+    return os.getenv("LLM_BATCH_POLL_INTERVAL")
+
+
+def get_llm_batch_timeout_env():
+    return os.getenv("LLM_BATCH_TIMEOUT")
+
+
+# Pipelined presentation generation
+def get_presentation_pipeline_env():
+    return os.getenv("PRESENTATION_PIPELINE")
+
+
+def get_presentation_pipeline_window_env():
+    return os.getenv("PRESENTATION_PIPELINE_WINDOW")
+
+
+# Async generation job queue
+def get_presentation_queue_max_concurrency_env():
+    return os.getenv("PRESENTATION_QUEUE_MAX_CONCURRENCY")
+
+
+def get_presentation_queue_max_attempts_env():
+    return os.getenv("PRESENTATION_QUEUE_MAX_ATTEMPTS")
+
+
+def get_presentation_queue_visibility_timeout_env():
+    return os.getenv("PRESENTATION_QUEUE_VISIBILITY_TIMEOUT")
+
+
+def get_presentation_queue_poll_interval_env():
+    return os.getenv("PRESENTATION_QUEUE_POLL_INTERVAL")
+
+
+def get_disable_api_generation_worker_env():
+    return os.getenv("DISABLE_API_GENERATION_WORKER")
+
+
+# Generation checkpoints
+def get_presentation_checkpoint_save_interval_env():
+    return os.getenv("PRESENTATION_CHECKPOINT_SAVE_INTERVAL")
+
+
+# Prometheus metrics
+def get_prometheus_metrics_env():
+    return os.getenv("PROMETHEUS_METRICS")
+
+
+# Tracing
+def get_tracing_exporter_env():
+    return os.getenv("TRACING_EXPORTER")
+
+
+def get_tracing_file_env():
+    return os.getenv("TRACING_FILE")
+
+
+# Icon search
+def get_icon_search_batch_window_env():
+    return os.getenv("ICON_SEARCH_BATCH_WINDOW")
+
+
+def get_icon_search_max_batch_size_env():
+    return os.getenv("ICON_SEARCH_MAX_BATCH_SIZE")
+
+
+def get_icon_search_cache_max_entries_env():
+    return os.getenv("ICON_SEARCH_CACHE_MAX_ENTRIES")
+
+
+def get_icon_search_cache_ttl_env():
+    return os.getenv("ICON_SEARCH_CACHE_TTL")
+
+
+# Startup
+def get_warmup_on_startup_env():
+    return os.getenv("WARMUP_ON_STARTUP")
@@ -48,16 +48,16 @@ def get_messages(
 
                 **Trust your design instincts. Focus on creating the most effective presentation for the content and audience.**
 
-                {"# User Instruction:" if instructions else ""}
-                {instructions or ""}
-
                 User intruction should be taken into account while creating the presentation structure, except for number of slides.
-
-                Select layout index for each of the {n_slides} slides based on what will best serve the presentation's goals.
             """,
         ),
         LLMUserMessage(
             content=f"""
+                {"# User Instruction:" if instructions else ""}
+                {instructions or ""}
+
+                Select layout index for each of the {n_slides} slides based on what will best serve the presentation's goals.
+
                 {data}
             """,
         ),
@@ -75,20 +75,20 @@ def get_messages_for_slides_markdown(
             content=f"""
                 You're a professional presentation designer with creative freedom to design engaging presentations.
 
-                {"# User Instruction:" if instructions else ""}
-                {instructions or ""}
-
                 {presentation_layout.to_string()}
 
                 Select layout that best matches the content of the slides.
 
                 User intruction should be taken into account while creating the presentation structure, except for number of slides.
-
-                Select layout index for each of the {n_slides} slides based on what will best serve the presentation's goals.
             """,
         ),
         LLMUserMessage(
             content=f"""
+                {"# User Instruction:" if instructions else ""}
+                {instructions or ""}
+
+                Select layout index for each of the {n_slides} slides based on what will best serve the presentation's goals.
+
                 {data}
             """,
         ),
@@ -100,6 +100,7 @@ async def generate_presentation_structure(
     presentation_layout: PresentationLayoutModel,
     instructions: Optional[str] = None,
     using_slides_markdown: bool = False,
+    use_cache: bool = True,
 ) -> PresentationStructureModel:
 
     client = LLMClient()
@@ -128,6 +129,7 @@ async def generate_presentation_structure(
             ),
             response_format=response_model.model_json_schema(),
             strict=True,
+            use_cache=use_cache,
         )
         return PresentationStructureModel(**response)
     except Exception as e:
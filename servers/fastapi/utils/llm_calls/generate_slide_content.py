@@ -3,6 +3,7 @@ from typing import Optional
 from models.llm_message import LLMSystemMessage, LLMUserMessage
 from models.presentation_layout import SlideLayoutModel
 from models.presentation_outline_model import SlideOutlineModel
+from services.llm_batch_service import LLM_BATCH_SERVICE, LLMBatchError
 from services.llm_client import LLMClient
 from utils.llm_client_error_handler import handle_llm_client_exceptions
 from utils.llm_provider import get_model
@@ -66,8 +67,8 @@ def get_system_prompt(
 
 def get_user_prompt(outline: str, language: str):
     return f"""
-        ## Current Date and Time
-        {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        ## Current Date
+        {datetime.now().strftime("%Y-%m-%d")}
 
         ## Icon Query And Image Prompt Language
         English
@@ -98,21 +99,11 @@ def get_messages(
     ]
 
 
-async def get_slide_content_from_type_and_outline(
-    slide_layout: SlideLayoutModel,
-    outline: SlideOutlineModel,
-    language: str,
-    tone: Optional[str] = None,
-    verbosity: Optional[str] = None,
-    instructions: Optional[str] = None,
-):
-    client = LLMClient()
-    model = get_model()
-
+def get_response_schema(slide_layout: SlideLayoutModel) -> dict:
     response_schema = remove_fields_from_schema(
         slide_layout.json_schema, ["__image_url__", "__icon_url__"]
     )
-    response_schema = add_field_in_schema(
+    return add_field_in_schema(
         response_schema,
         {
             "__speaker_note__": {
@@ -125,18 +116,71 @@ async def get_slide_content_from_type_and_outline(
         True,
     )
 
+
+async def submit_slide_content_to_batch_api(
+    slide_layout: SlideLayoutModel,
+    outline: SlideOutlineModel,
+    language: str,
+    tone: Optional[str] = None,
+    verbosity: Optional[str] = None,
+    instructions: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Submits the slide content request to the provider batch API and returns
+    its batch request, or None if it can't be batched.
+    """
     try:
-        response = await client.generate_structured(
-            model=model,
+        return await LLM_BATCH_SERVICE.submit(
+            model=get_model(),
             messages=get_messages(
-                outline.content,
-                language,
-                tone,
-                verbosity,
-                instructions,
+                outline.content, language, tone, verbosity, instructions
             ),
+            response_format=get_response_schema(slide_layout),
+        )
+    except LLMBatchError as e:
+        print(f"Slide can't be generated with the batch API: {e}")
+        return None
+
+
+async def get_slide_content_from_type_and_outline(
+    slide_layout: SlideLayoutModel,
+    outline: SlideOutlineModel,
+    language: str,
+    tone: Optional[str] = None,
+    verbosity: Optional[str] = None,
+    instructions: Optional[str] = None,
+    use_cache: bool = True,
+    batch_request: Optional[dict] = None,
+):
+    client = LLMClient()
+    model = get_model()
+
+    response_schema = get_response_schema(slide_layout)
+
+    messages = get_messages(
+        outline.content,
+        language,
+        tone,
+        verbosity,
+        instructions,
+    )
+
+    try:
+        # Submitted to the batch API by an earlier run of the job
+        if batch_request:
+            return await LLM_BATCH_SERVICE.get_result(
+                batch_request,
+                messages=messages,
+                response_format=response_schema,
+            )
+
+        response = await client.generate_structured(
+            model=model,
+            messages=messages,
             response_format=response_schema,
             strict=False,
+            use_cache=use_cache,
+            hedge=True,
         )
         return response
 
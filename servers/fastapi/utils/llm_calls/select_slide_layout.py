@@ -0,0 +1,79 @@
+from typing import Optional
+from models.llm_message import LLMSystemMessage, LLMUserMessage
+from models.presentation_layout import PresentationLayoutModel
+from models.presentation_outline_model import SlideOutlineModel
+from models.slide_layout_index import SlideLayoutIndex
+from services.llm_client import LLMClient
+from utils.llm_client_error_handler import handle_llm_client_exceptions
+from utils.llm_provider import get_model
+
+
+def get_messages(
+    presentation_layout: PresentationLayoutModel,
+    outline: SlideOutlineModel,
+    slide_index: int,
+    n_slides: int,
+    instructions: Optional[str] = None,
+):
+    return [
+        LLMSystemMessage(
+            content=f"""
+                You're a professional presentation designer selecting the layout for one slide of a presentation.
+
+                {presentation_layout.to_string()}
+
+                # Layout Selection Guidelines
+                - Let the slide's purpose guide layout selection
+                - Opening/closing → Title layouts
+                - Processes/workflows → Visual process layouts
+                - Comparisons/contrasts → Side-by-side layouts
+                - Data/metrics → Chart/graph layouts
+                - Concepts/ideas → Image + text layouts
+                - Key insights → Emphasis layouts
+                - Prefer visual variety, middle slides should rarely use title layouts
+
+                User intruction should be taken into account while selecting the layout.
+            """,
+        ),
+        LLMUserMessage(
+            content=f"""
+                {"# User Instruction:" if instructions else ""}
+                {instructions or ""}
+
+                Select layout index for slide {slide_index + 1} of {n_slides}.
+
+                ## Slide Content
+                {outline.content}
+            """,
+        ),
+    ]
+
+
+async def select_slide_layout(
+    presentation_layout: PresentationLayoutModel,
+    outline: SlideOutlineModel,
+    slide_index: int,
+    n_slides: int,
+    instructions: Optional[str] = None,
+    use_cache: bool = True,
+) -> int:
+    client = LLMClient()
+    model = get_model()
+
+    try:
+        response = await client.generate_structured(
+            model=model,
+            messages=get_messages(
+                presentation_layout,
+                outline,
+                slide_index,
+                n_slides,
+                instructions,
+            ),
+            response_format=SlideLayoutIndex.model_json_schema(),
+            strict=True,
+            use_cache=use_cache,
+        )
+        return SlideLayoutIndex(**response).index
+    except Exception as e:
+        raise handle_llm_client_exceptions(e)
@@ -1,10 +1,60 @@
+import asyncio
+from typing import Optional
 from fastapi import HTTPException
+import httpx
+from anthropic import APIConnectionError as AnthropicAPIConnectionError
 from anthropic import APIError as AnthropicAPIError
+from openai import APIConnectionError as OpenAIAPIConnectionError
 from openai import APIError as OpenAIAPIError
 from google.genai.errors import APIError as GoogleAPIError
 import traceback
 
 
+# 429 is rate limited, 529 is Anthropic's overloaded
+LLM_RATE_LIMIT_STATUS_CODES = {429, 529}
+LLM_RETRYABLE_STATUS_CODES = {408, 409, 500, 502, 503, 504, *LLM_RATE_LIMIT_STATUS_CODES}
+
+
+def get_llm_error_status_code(e: Exception) -> Optional[int]:
+    if isinstance(e, (OpenAIAPIError, AnthropicAPIError)):
+        return getattr(e, "status_code", None)
+    if isinstance(e, GoogleAPIError):
+        return e.code
+    return None
+
+
+def is_llm_rate_limit_error(e: Exception) -> bool:
+    return get_llm_error_status_code(e) in LLM_RATE_LIMIT_STATUS_CODES
+
+
+def is_llm_retryable_error(e: Exception) -> bool:
+    """Transient errors worth retrying: timeouts, dropped connections, 429 and 5xx."""
+    # Connection errors include the SDK timeout errors
+    if isinstance(
+        e,
+        (
+            OpenAIAPIConnectionError,
+            AnthropicAPIConnectionError,
+            httpx.TransportError,
+            asyncio.TimeoutError,
+        ),
+    ):
+        return True
+    return get_llm_error_status_code(e) in LLM_RETRYABLE_STATUS_CODES
+
+
+def get_llm_error_retry_after(e: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, from the Retry-After header."""
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
 def handle_llm_client_exceptions(e: Exception) -> HTTPException:
     traceback.print_exc()
     if isinstance(e, OpenAIAPIError):
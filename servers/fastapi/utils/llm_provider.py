@@ -1,3 +1,4 @@
+from typing import List, Optional
 from fastapi import HTTPException
 
 from constants.llm import (
@@ -10,6 +11,7 @@ from utils.get_env import (
     get_anthropic_model_env,
     get_custom_model_env,
     get_google_model_env,
+    get_llm_fallback_providers_env,
     get_llm_provider_env,
     get_ollama_model_env,
     get_openai_model_env,
@@ -47,19 +49,43 @@ def is_custom_llm_selected():
 
 
 def get_model():
-    selected_llm = get_llm_provider()
-    if selected_llm == LLMProvider.OPENAI:
+    return get_model_for_provider(get_llm_provider())
+
+
+def get_model_for_provider(llm_provider: LLMProvider) -> Optional[str]:
+    if llm_provider == LLMProvider.OPENAI:
         return get_openai_model_env() or DEFAULT_OPENAI_MODEL
-    elif selected_llm == LLMProvider.GOOGLE:
+    elif llm_provider == LLMProvider.GOOGLE:
         return get_google_model_env() or DEFAULT_GOOGLE_MODEL
-    elif selected_llm == LLMProvider.ANTHROPIC:
+    elif llm_provider == LLMProvider.ANTHROPIC:
         return get_anthropic_model_env() or DEFAULT_ANTHROPIC_MODEL
-    elif selected_llm == LLMProvider.OLLAMA:
+    elif llm_provider == LLMProvider.OLLAMA:
         return get_ollama_model_env()
-    elif selected_llm == LLMProvider.CUSTOM:
+    elif llm_provider == LLMProvider.CUSTOM:
         return get_custom_model_env()
     else:
         raise HTTPException(
             status_code=500,
             detail=f"Invalid LLM provider. Please select one of: openai, google, anthropic, ollama, custom",
         )
+
+
+def get_fallback_llm_providers() -> List[LLMProvider]:
+    """
+    Providers to fail over to, in order, from LLM_FALLBACK_PROVIDERS.
+    The selected provider is never its own fallback.
+    """
+    selected_llm = get_llm_provider()
+    fallback_providers = []
+    for each in (get_llm_fallback_providers_env() or "").split(","):
+        each = each.strip().lower()
+        if not each:
+            continue
+        try:
+            llm_provider = LLMProvider(each)
+        except ValueError:
+            print(f"Ignoring invalid fallback LLM provider: {each}")
+            continue
+        if llm_provider != selected_llm and llm_provider not in fallback_providers:
+            fallback_providers.append(llm_provider)
+    return fallback_providers
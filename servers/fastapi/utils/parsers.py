@@ -2,3 +2,21 @@ def parse_bool_or_none(value: str | None) -> bool | None:
     if value is None:
         return None
     return value.lower() == "true"
+
+
+def parse_int_or_none(value: str | None) -> int | None:
+    if value is None or value.strip() == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def parse_float_or_none(value: str | None) -> float | None:
+    if value is None or value.strip() == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -5,6 +5,7 @@ from models.sql.image_asset import ImageAsset
 from models.sql.slide import SlideModel
 from services.icon_finder_service import ICON_FINDER_SERVICE
 from services.image_generation_service import ImageGenerationService
+from services.presentation_generation_metrics import count_in_generation_stage
 from utils.asset_directory_utils import get_images_directory
 from utils.dict_utils import get_dict_at_path, get_dict_paths_with_key, set_dict_at_path
 
@@ -18,6 +19,7 @@ async def process_slide_and_fetch_assets(
 
     image_paths = get_dict_paths_with_key(slide.content, "__image_prompt__")
     icon_paths = get_dict_paths_with_key(slide.content, "__icon_query__")
+    count_in_generation_stage(images=len(image_paths), icons=len(icon_paths))
 
     for image_path in image_paths:
         __image_prompt__parent = get_dict_at_path(slide.content, image_path)
@@ -29,13 +31,15 @@ async def process_slide_and_fetch_assets(
             )
         )
 
-    for icon_path in icon_paths:
-        __icon_query__parent = get_dict_at_path(slide.content, icon_path)
-        async_tasks.append(
-            ICON_FINDER_SERVICE.search_icons(__icon_query__parent["__icon_query__"])
-        )
+    # All icons of the slide are searched in one batch
+    icon_queries = [
+        get_dict_at_path(slide.content, icon_path)["__icon_query__"]
+        for icon_path in icon_paths
+    ]
+    async_tasks.append(ICON_FINDER_SERVICE.search_icons_batch(icon_queries))
 
     results = await asyncio.gather(*async_tasks)
+    icon_results = results.pop()
     results.reverse()
 
     return_assets = []
@@ -49,9 +53,8 @@ async def process_slide_and_fetch_assets(
             image_dict["__image_url__"] = result
         set_dict_at_path(slide.content, image_path, image_dict)
 
-    for icon_path in icon_paths:
+    for icon_path, icon_result in zip(icon_paths, icon_results):
         icon_dict = get_dict_at_path(slide.content, icon_path)
-        icon_result = results.pop()
         if icon_result and len(icon_result) > 0:
             icon_dict["__icon_url__"] = icon_result[0]
         else:
@@ -105,8 +108,8 @@ async def process_old_and_new_slides_and_fetch_assets(
     async_image_fetch_tasks = []
     new_images_fetch_status = []
 
-    # Creates async tasks for fetching new icons
-    async_icon_fetch_tasks = []
+    # Queries of new icons, searched in one batch
+    new_icon_queries = []
     new_icons_fetch_status = []
 
     # Creates async tasks for fetching new images
@@ -129,7 +132,6 @@ async def process_old_and_new_slides_and_fetch_assets(
         )
         new_images_fetch_status.append(True)
 
-    # Creates async tasks for fetching new icons
     # Use old icon url if query is same
     for new_icon in new_icon_dicts:
         if new_icon["__icon_query__"] in old_icon_queries:
@@ -140,13 +142,11 @@ async def process_old_and_new_slides_and_fetch_assets(
             new_icons_fetch_status.append(False)
             continue
 
-        async_icon_fetch_tasks.append(
-            ICON_FINDER_SERVICE.search_icons(new_icon["__icon_query__"])
-        )
+        new_icon_queries.append(new_icon["__icon_query__"])
         new_icons_fetch_status.append(True)
 
     new_images = await asyncio.gather(*async_image_fetch_tasks)
-    new_icons = await asyncio.gather(*async_icon_fetch_tasks)
+    new_icons = await ICON_FINDER_SERVICE.search_icons_batch(new_icon_queries)
 
     # list of new assets
     new_assets = []
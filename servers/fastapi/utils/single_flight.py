@@ -0,0 +1,41 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time. Callers of a key that is already in flight
+    wait for its result instead of starting the same work again.
+    The call is only cancelled when every caller waiting on it is.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, list] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            # [task, callers waiting on it]
+            call = [asyncio.ensure_future(func()), 0]
+            self._calls[key] = call
+            call[0].add_done_callback(lambda _: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        call[1] += 1
+        try:
+            return await asyncio.shield(call[0])
+        except asyncio.CancelledError:
+            call[1] -= 1
+            if call[1] == 0:
+                call[0].cancel()
+            raise
+
+    def _forget(self, key: Hashable, call: list):
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,187 @@
+import json
+from typing import Any, List, Optional, Sequence
+
+import dirtyjson
+
+
+JSONPath = tuple[str | int, ...]
+
+# Matches any key or index in a path pattern, e.g. ("slides", ANY)
+ANY = "*"
+
+
+class _Frame:
+    def __init__(self, container_type: str, start: int, path: JSONPath):
+        self.type = container_type
+        self.start = start
+        self.path = path
+        self.key: Optional[str] = None
+        self.key_start: Optional[int] = None
+        self.index = 0
+        self.has_value = False
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for JSON streamed by an LLM.
+    feed() returns the values that were completed by a chunk as (path, value)
+    pairs, so e.g. each slide of an outline is available as soon as it closes.
+    Text before the first { or [ (like a markdown fence) is ignored.
+    """
+
+    def __init__(self, paths: Optional[Sequence[JSONPath]] = None):
+        self.paths = paths
+        self.text = ""
+        self._stack: List[_Frame] = []
+        self._root_start: Optional[int] = None
+        self._root_end: Optional[int] = None
+        self._in_string = False
+        self._is_key = False
+        self._escape = False
+        self._string_start: Optional[int] = None
+        self._primitive_start: Optional[int] = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self._root_end is not None
+
+    def feed(self, chunk: str) -> List[tuple[JSONPath, Any]]:
+        start = len(self.text)
+        self.text += chunk
+        completed = []
+        for offset in range(start, len(self.text)):
+            if self.is_complete:
+                break
+            self._consume(offset, self.text[offset], completed)
+        return completed
+
+    def get_value(self) -> Any:
+        """The complete document, parsed leniently."""
+        if self._root_start is None:
+            return None
+        return self._parse(self.text[self._root_start : self._root_end])
+
+    def get_partial(self) -> Any:
+        """
+        The document so far with open strings and containers closed.
+        Dangling keys and unfinished numbers or literals are left out.
+        """
+        if self.is_complete or not self._stack:
+            return self.get_value()
+
+        text = self.text
+        top = self._stack[-1]
+        if self._in_string and not self._is_key:
+            text = (text[:-1] if self._escape else text) + '"'
+        elif self._in_string or self._primitive_start is not None:
+            cut_at = (
+                top.key_start
+                if top.type == "object" and top.key_start is not None
+                else (self._primitive_start or self._string_start)
+            )
+            text = text[:cut_at]
+        elif top.type == "object" and top.key is not None and not top.has_value:
+            text = text[: top.key_start]
+
+        text = text[self._root_start :].rstrip().rstrip(",")
+        for frame in reversed(self._stack):
+            text += "}" if frame.type == "object" else "]"
+        return self._parse(text)
+
+    def _consume(self, offset: int, char: str, completed: list):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._is_key:
+                    self._stack[-1].key = self._parse(
+                        self.text[self._string_start : offset + 1]
+                    )
+                else:
+                    self._complete(self._string_start, offset + 1, completed)
+            return
+
+        if self._primitive_start is not None:
+            if char not in ",]}" and not char.isspace():
+                return
+            self._complete(self._primitive_start, offset, completed)
+            self._primitive_start = None
+
+        if self._root_start is None:
+            if char not in "{[":
+                return
+            self._root_start = offset
+
+        if char == '"':
+            self._in_string = True
+            self._string_start = offset
+            top = self._stack[-1] if self._stack else None
+            self._is_key = bool(top and top.type == "object" and top.key is None)
+            if self._is_key:
+                top.key_start = offset
+            else:
+                self._start_value()
+        elif char in "{[":
+            path = self._get_current_path()
+            self._start_value()
+            self._stack.append(
+                _Frame("object" if char == "{" else "array", offset, path)
+            )
+        elif char in "}]":
+            frame = self._stack.pop()
+            self._emit(frame.path, frame.start, offset + 1, completed)
+            if not self._stack:
+                self._root_end = offset + 1
+        elif char == ",":
+            top = self._stack[-1]
+            top.key = None
+            top.key_start = None
+            top.has_value = False
+            top.index += 1
+        elif char != ":" and not char.isspace() and self._stack:
+            self._start_value()
+            self._primitive_start = offset
+
+    def _start_value(self):
+        if self._stack:
+            self._stack[-1].has_value = True
+
+    def _get_current_path(self) -> JSONPath:
+        if not self._stack:
+            return ()
+        top = self._stack[-1]
+        return (*top.path, top.key if top.type == "object" else top.index)
+
+    def _complete(self, start: int, end: int, completed: list):
+        self._emit(self._get_current_path(), start, end, completed)
+
+    def _emit(self, path: JSONPath, start: int, end: int, completed: list):
+        if not self._matches(path):
+            return
+        value = self._parse(self.text[start:end])
+        if value is not None:
+            completed.append((path, value))
+
+    def _matches(self, path: JSONPath) -> bool:
+        if self.paths is None:
+            return True
+        for pattern in self.paths:
+            if len(pattern) == len(path) and all(
+                each == ANY or each == part for each, part in zip(pattern, path)
+            ):
+                return True
+        return False
+
+    def _parse(self, text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+        try:
+            # dirtyjson returns its own dict/list subclasses
+            return json.loads(json.dumps(dirtyjson.loads(text)))
+        except Exception:
+            return None
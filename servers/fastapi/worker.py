@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+from typing import Optional
+
+# Application modules are imported inside the worker processes,
+# the supervising process only prepares the database
+
+
+async def run_queued_job(async_status, sql_session):
+    from api.v1.ppt.endpoints.presentation import run_queued_presentation_generation
+    from services.llm_client import LLM_CLIENT_REGISTRY
+    from utils.get_env import get_can_change_keys_env
+    from utils.user_config import update_env_with_user_config
+
+    # Keys saved from the UI after this worker started
+    if get_can_change_keys_env() != "false":
+        update_env_with_user_config()
+        LLM_CLIENT_REGISTRY.invalidate_stale()
+
+    await run_queued_presentation_generation(async_status, sql_session)
+
+
+async def prepare_database():
+    from services.database import create_db_and_tables
+    from utils.get_env import get_app_data_directory_env
+
+    os.makedirs(get_app_data_directory_env(), exist_ok=True)
+    await create_db_and_tables()
+
+
+async def run_worker(metrics_port: Optional[int]):
+    from services.database import sql_engine
+    from services.presentation_generation_queue import PRESENTATION_GENERATION_QUEUE
+    from services.prometheus_metrics import PROMETHEUS_METRICS
+    from services.temp_file_service import TEMP_FILE_SERVICE
+    from services.tracing import TRACING
+
+    await prepare_database()
+    TEMP_FILE_SERVICE.move_aside_base_dir()
+    TEMP_FILE_SERVICE.cleanup_old_base_dirs_in_background()
+    TRACING.setup("presenton-worker")
+
+    if metrics_port and PROMETHEUS_METRICS.enabled:
+        PROMETHEUS_METRICS.instrument_engine(sql_engine)
+        PROMETHEUS_METRICS.start_http_server(metrics_port)
+        print(f"Serving Prometheus metrics on port {metrics_port}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for each in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(each, stop.set)
+
+    PRESENTATION_GENERATION_QUEUE.start(run_queued_job)
+    print(
+        f"Worker {PRESENTATION_GENERATION_QUEUE.worker_id} running up to "
+        f"{PRESENTATION_GENERATION_QUEUE.max_concurrency} presentation jobs"
+    )
+    await stop.wait()
+
+    print(f"Worker {PRESENTATION_GENERATION_QUEUE.worker_id} stopping")
+    await PRESENTATION_GENERATION_QUEUE.stop()
+    TRACING.shutdown()
+
+
+def run_worker_process(jobs: Optional[int], metrics_port: Optional[int] = None):
+    if jobs:
+        os.environ["PRESENTATION_QUEUE_MAX_CONCURRENCY"] = str(jobs)
+    asyncio.run(run_worker(metrics_port))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run presentation generation workers for the async job queue"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Presentations generated at once per process (default: PRESENTATION_QUEUE_MAX_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1, help="Worker processes to start"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics on this port, the next ones for further processes (needs PROMETHEUS_METRICS=true)",
+    )
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        run_worker_process(args.jobs, args.metrics_port)
+    else:
+        # Tables are created once, workers creating them together would collide
+        asyncio.run(prepare_database())
+
+        # Separate processes so slide parsing, image and pptx work use every core
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(
+                target=run_worker_process,
+                args=(args.jobs, args.metrics_port and args.metrics_port + index),
+            )
+            for index in range(args.processes)
+        ]
+        for each in processes:
+            each.start()
+
+        def stop_processes(*_):
+            for each in processes:
+                if each.is_alive():
+                    os.kill(each.pid, signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, stop_processes)
+        signal.signal(signal.SIGINT, stop_processes)
+        for each in processes:
+            each.join()